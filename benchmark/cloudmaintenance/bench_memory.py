@@ -0,0 +1,57 @@
+"""
+Report the memory retained by the inventory built from resource.yaml, in
+bytes per resource.
+
+Run with ``PYTHONPATH=./src python benchmark/cloudmaintenance/bench_memory.py``.
+"""
+
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from axolpy.cloudmaintenance import ResourceDataLoader
+from inventory import write_resource_yaml
+
+
+def count_resources(aws_regions) -> int:
+    """
+    Count every region, cluster, namespace, database and workload.
+    """
+
+    count = 0
+    for region in aws_regions.values():
+        count += 1 + len(region.rds_databases)
+        for cluster in region.ecs_clusters.values():
+            count += 1 + len(cluster.services)
+        for cluster in region.eks_clusters.values():
+            count += 1
+            for namespace in cluster.namespaces.values():
+                count += 1 + len(namespace.statefulsets) + \
+                    len(namespace.deployments)
+
+    return count
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = Path(tmpdir)
+        write_resource_yaml(data_path, "maintenance",
+                            regions=4, clusters=2, namespaces=50, workloads=25)
+
+        gc.collect()
+        tracemalloc.start()
+        aws_regions = ResourceDataLoader.load_from_file(
+            data_path=data_path, maintenance_id="maintenance")
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resources = count_resources(aws_regions)
+        print(f"resources: {resources}")
+        print(f"retained: {retained / 1024 / 1024:.1f} MiB")
+        print(f"bytes per resource: {retained / resources:.0f}")
+
+
+if __name__ == "__main__":
+    main()
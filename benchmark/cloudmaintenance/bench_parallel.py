@@ -0,0 +1,38 @@
+"""
+Show how loading resource.yaml in parallel scales with the number of regions.
+
+Run with ``PYTHONPATH=./src python benchmark/cloudmaintenance/bench_parallel.py``.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from axolpy.cloudmaintenance import ResourceDataLoader
+from inventory import write_resource_yaml
+
+
+def main() -> None:
+    workers = sorted({1, 2, 4, os.cpu_count() or 1})
+    print("regions " + " ".join(f"{f'workers={w}':>11}" for w in workers))
+    for regions in [1, 2, 4, 8, 16]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_path = Path(tmpdir)
+            write_resource_yaml(data_path, "maintenance",
+                                regions=regions, clusters=2, namespaces=10,
+                                workloads=25)
+
+            timings = list()
+            for max_workers in workers:
+                start = time.perf_counter()
+                ResourceDataLoader.load_from_file(data_path=data_path,
+                                                  maintenance_id="maintenance",
+                                                  max_workers=max_workers)
+                timings.append(time.perf_counter() - start)
+
+            print(f"{regions:>7} " + " ".join(f"{t:>10.3f}s" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
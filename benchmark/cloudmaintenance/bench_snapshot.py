@@ -0,0 +1,45 @@
+"""
+Compare a cold load of resource.yaml with a warm load from its snapshot.
+
+Run with ``PYTHONPATH=./src python benchmark/cloudmaintenance/bench_snapshot.py``.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from axolpy.cloudmaintenance import ResourceDataLoader
+from inventory import write_resource_yaml
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = Path(tmpdir)
+        write_resource_yaml(data_path, "maintenance",
+                            regions=4, clusters=2, namespaces=10, workloads=25)
+
+        start = time.perf_counter()
+        ResourceDataLoader.load_from_file(data_path=data_path,
+                                          maintenance_id="maintenance")
+        no_snapshot = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ResourceDataLoader.load_from_file(data_path=data_path,
+                                          maintenance_id="maintenance",
+                                          use_snapshot=True)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ResourceDataLoader.load_from_file(data_path=data_path,
+                                          maintenance_id="maintenance",
+                                          use_snapshot=True)
+        warm = time.perf_counter() - start
+
+        print(f"no snapshot: {no_snapshot:.3f}s")
+        print(f"cold (parse + write snapshot): {cold:.3f}s")
+        print(f"warm (read snapshot): {warm:.3f}s")
+        print(f"speedup: {no_snapshot / warm:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Time and memory-profile the cloudmaintenance loaders and every step's
+write_file over a synthetic maintenance, and write the results as JSON.
+
+Run with ``PYTHONPATH=./src python benchmark/cloudmaintenance/bench_suite.py``.
+Pass ``--baseline`` with the results of an earlier run to fail when a
+benchmark became slower than ``--threshold`` allows, e.g.::
+
+    PYTHONPATH=./src python benchmark/cloudmaintenance/bench_suite.py \\
+        --output new.json --baseline old.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from axolpy.cloudmaintenance import (Operator, OperatorDataLoader,
+                                     ResourceDataLoader)
+from axolpy.cloudmaintenance.steps import (DumpMysqlTableStatus, DumpPgstats,
+                                           ModifyDatabaseClassType,
+                                           ModifyDatabaseEngineVersion,
+                                           QueryDatabaseStatus,
+                                           QueryECSTaskStatus,
+                                           QueryK8sDeploymentStatus,
+                                           RestartECSService,
+                                           RestartK8sDeployment,
+                                           UpdateECSTaskCount,
+                                           UpdateK8sDeploymentReplicas,
+                                           UpdateK8sStatefulSetReplicas)
+from inventory import write_maintenance
+
+# The steps which can set the replicas or task count to zero are
+# measured in both modes
+_zeroinfy_step_classes = [UpdateECSTaskCount,
+                          UpdateK8sStatefulSetReplicas,
+                          UpdateK8sDeploymentReplicas]
+_step_classes = [DumpPgstats,
+                 DumpMysqlTableStatus,
+                 ModifyDatabaseEngineVersion,
+                 ModifyDatabaseClassType,
+                 QueryDatabaseStatus,
+                 RestartK8sDeployment,
+                 RestartECSService,
+                 QueryK8sDeploymentStatus,
+                 QueryECSTaskStatus]
+
+
+def measure(name: str, func: Callable[[], Any], rounds: int) -> Dict[str, Any]:
+    """
+    Time a function over a number of rounds, then run it once more under
+    tracemalloc to find its peak allocation.
+    """
+
+    timings = list()
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {"name": name,
+              "rounds": rounds,
+              "min_s": min(timings),
+              "median_s": statistics.median(timings),
+              "peak_bytes": peak}
+    print(f"{name:<60} {result['median_s'] * 1000:>10.2f} ms"
+          f" {peak / 1024:>12.1f} KiB")
+
+    return result
+
+
+def run(scale: Dict[str, int], rounds: int) -> List[Dict[str, Any]]:
+    results = list()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_path = Path(tmpdir)
+        write_maintenance(data_path, "maintenance", **scale)
+
+        def _load_resources() -> dict:
+            return ResourceDataLoader.load_from_file(data_path=data_path,
+                                                     maintenance_id="maintenance")
+
+        aws_regions = _load_resources()
+        results.append(measure("ResourceDataLoader.load_from_file",
+                               _load_resources, rounds))
+
+        def _load_operators() -> Dict[str, Operator]:
+            operators = dict()
+            for o in range(scale["operators"]):
+                operator = Operator(id=f"operator{o + 1}")
+                operator.data_loader.load_from_file(data_path=data_path,
+                                                    maintenance_id="maintenance",
+                                                    aws_regions=aws_regions)
+                operators[operator.id] = operator
+            return operators
+
+        operators = _load_operators()
+        results.append(measure("OperatorDataLoader.load_from_file",
+                               _load_operators, rounds))
+        results.append(measure("OperatorDataLoader.load_all_from_file",
+                               lambda: OperatorDataLoader.load_all_from_file(
+                                   data_path=data_path,
+                                   maintenance_id="maintenance",
+                                   aws_regions=aws_regions),
+                               rounds))
+
+        dist_path = data_path.joinpath("maintenance", "dist")
+        step_kwargs = [(step_class, {}) for step_class in _step_classes] + \
+            [(step_class, {"zeroinfy": zeroinfy})
+             for step_class in _zeroinfy_step_classes
+             for zeroinfy in (True, False)]
+        for step_class, kwargs in step_kwargs:
+            steps = [step_class(step_no=0,
+                                operator=operator,
+                                dist_path=dist_path,
+                                **kwargs)
+                     for operator in operators.values()]
+
+            def _write_files() -> None:
+                for step in steps:
+                    step.write_file()
+
+            name = f"{step_class.__name__}.write_file"
+            if kwargs.get("zeroinfy"):
+                name += "(zeroinfy)"
+            results.append(measure(name, _write_files, rounds))
+
+    return results
+
+
+def compare(results: List[Dict[str, Any]],
+            baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """
+    Find the benchmarks whose median time grew more than the threshold
+    compared with the baseline.
+    """
+
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = list()
+    for result in results:
+        previous = baseline_results.get(result["name"])
+        if previous and result["median_s"] > previous["median_s"] * (1 + threshold):
+            regressions.append(
+                f"{result['name']}: {previous['median_s'] * 1000:.2f} ms"
+                f" -> {result['median_s'] * 1000:.2f} ms")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--clusters", type=int, default=2)
+    parser.add_argument("--namespaces", type=int, default=10)
+    parser.add_argument("--workloads", type=int, default=25)
+    parser.add_argument("--operators", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", type=Path,
+                        default=Path("benchmark-results.json"))
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown of the median time, e.g. 0.2 for 20%%")
+    args = parser.parse_args()
+
+    scale = {"regions": args.regions,
+             "clusters": args.clusters,
+             "namespaces": args.namespaces,
+             "workloads": args.workloads,
+             "operators": args.operators}
+    results = run(scale, rounds=args.rounds)
+
+    args.output.write_text(json.dumps(
+        {"python": platform.python_version(),
+         "platform": platform.platform(),
+         "cpu_count": os.cpu_count(),
+         "scale": scale,
+         "results": results}, indent=2) + "\n")
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results,
+                              json.loads(args.baseline.read_text()),
+                              threshold=args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
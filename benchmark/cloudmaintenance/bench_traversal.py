@@ -0,0 +1,83 @@
+"""
+Time a fleet-wide traversal of a synthetic 100k-workload inventory through
+the collection properties of the models.
+
+Run with ``PYTHONPATH=./src python benchmark/cloudmaintenance/bench_traversal.py``.
+"""
+
+import time
+import tracemalloc
+
+from axolpy.aws import AWSRegion, ECSCluster, ECSService
+from axolpy.kubernetes import (AWSClusterRef, Cluster, Deployment, Namespace,
+                               StatefulSet)
+
+
+def build_inventory(regions: int = 4,
+                    clusters: int = 5,
+                    namespaces: int = 50,
+                    workloads: int = 50) -> dict:
+    """
+    Build 2 * regions * clusters * namespaces * workloads Kubernetes
+    workloads plus one ECS service per namespace.
+    """
+
+    aws_regions = dict()
+    for r in range(regions):
+        region = AWSRegion(name=f"region-{r}")
+        aws_regions[region.name] = region
+        for c in range(clusters):
+            ecs_cluster = ECSCluster(name=f"ecs-{c}", region=region)
+            cluster = Cluster(name=f"eks-{c}",
+                              platform_ref=AWSClusterRef(region=region))
+            for n in range(namespaces):
+                ECSService(name=f"svc-{n}", cluster=ecs_cluster, desired_count=1)
+                namespace = Namespace(name=f"ns-{n}", cluster=cluster)
+                for w in range(workloads):
+                    Deployment(name=f"dpm-{w}", namespace=namespace, replicas=1)
+                    StatefulSet(name=f"sts-{w}", namespace=namespace, replicas=1)
+
+    return aws_regions
+
+
+def traverse(aws_regions: dict) -> int:
+    """
+    Sum the replicas and desired counts of every workload.
+    """
+
+    total = 0
+    for region in aws_regions.values():
+        for ecs_cluster in region.ecs_clusters.values():
+            for service in ecs_cluster.services.values():
+                total += service.desired_count
+        for cluster in region.eks_clusters.values():
+            for namespace in cluster.namespaces.values():
+                for deployment in namespace.deployments.values():
+                    total += deployment.replicas
+                for statefulset in namespace.statefulsets.values():
+                    total += statefulset.replicas
+
+    return total
+
+
+def main() -> None:
+    aws_regions = build_inventory()
+
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        workloads = traverse(aws_regions)
+    elapsed = (time.perf_counter() - start) / rounds
+
+    tracemalloc.start()
+    traverse(aws_regions)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"workloads: {workloads}")
+    print(f"traversal: {elapsed * 1000:.1f} ms")
+    print(f"peak allocation during traversal: {peak / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+from pathlib import Path
+from typing import Tuple
+
+import yaml
+
+
+def build_resource_yaml(regions: int = 4,
+                        clusters: int = 2,
+                        namespaces: int = 10,
+                        workloads: int = 25) -> dict:
+    """
+    Build the content of a synthetic resource.yaml.
+
+    :param regions: Number of regions.
+    :type regions: int
+    :param clusters: Number of ECS clusters and EKS clusters per region.
+    :type clusters: int
+    :param namespaces: Number of namespaces per EKS cluster.
+    :type namespaces: int
+    :param workloads: Number of ECS services per ECS cluster, and number of
+        deployments and statefulsets per namespace.
+    :type workloads: int
+
+    :return: Content of resource.yaml.
+    :rtype: dict
+    """
+
+    regions_yaml = dict()
+    for r in range(regions):
+        region_name = f"region-{r}"
+        databases = list()
+        for d in range(workloads):
+            database = {"id": f"db-{r}-{d}",
+                        "type": "instance",
+                        "host": f"db-{r}-{d}.{region_name}.rds.amazonaws.com"}
+            if d % 2:
+                database["engine_type"] = "mysql"
+                database["engine_version"] = "5.7.37"
+                database["patch"] = {"engine_version": "8.0.30"}
+            else:
+                database["engine_version"] = "12.6"
+                database["patch"] = {"engine_version": "13.6",
+                                     "class_type": "db.m6g.large"}
+            databases.append(database)
+
+        ecs_clusters = dict()
+        eks_clusters = dict()
+        for c in range(clusters):
+            services = list()
+            for w in range(workloads):
+                service = {"name": f"svc-{w}", "desired_count": w % 5 + 1}
+                if w % 3 == 0:
+                    service["patch"] = {"desired_count": w % 5 + 2}
+                if w % 7 == 0:
+                    service["properties"] = {"restart_after_upgrade": True}
+                services.append(service)
+            ecs_clusters[f"ecs-{c}"] = {"services": services}
+
+            namespaces_yaml = dict()
+            for n in range(namespaces):
+                statefulsets = list()
+                deployments = list()
+                for w in range(workloads):
+                    statefulsets.append(
+                        {"name": f"sts-{w}", "replicas": w % 3 + 1})
+                    deployment = {"name": f"dpm-{w}", "replicas": w % 4 + 1}
+                    if w % 3 == 0:
+                        deployment["patch"] = {"replicas": w % 4 + 2}
+                    if w % 5 == 0:
+                        deployment["properties"] = {
+                            "restart_after_upgrade": True}
+                    deployments.append(deployment)
+                namespaces_yaml[f"ns-{n}"] = {"statefulsets": statefulsets,
+                                              "deployments": deployments}
+            eks_clusters[f"eks-{c}"] = {"namespaces": namespaces_yaml}
+
+        regions_yaml[region_name] = {"databases": databases,
+                                     "ecs": {"clusters": ecs_clusters},
+                                     "eks": {"clusters": eks_clusters}}
+
+    return {"regions": regions_yaml}
+
+
+def build_operator_yaml(resource_yaml: dict, operators: int = 3) -> dict:
+    """
+    Build the content of a synthetic operator.yaml which assigns every
+    database, ECS service and Kubernetes workload of a resource.yaml to
+    one of the operators in turn.
+
+    :param resource_yaml: Content of resource.yaml.
+    :type resource_yaml: dict
+    :param operators: Number of operators.
+    :type operators: int
+
+    :return: Content of operator.yaml.
+    :rtype: dict
+    """
+
+    operator_ids = [f"operator{o + 1}" for o in range(operators)]
+    operator_yaml = {operator_id: dict() for operator_id in operator_ids}
+    turn = 0
+
+    def _next_region(region_name: str) -> dict:
+        nonlocal turn
+        operator_id = operator_ids[turn % operators]
+        turn += 1
+        return operator_yaml[operator_id].setdefault(region_name, dict())
+
+    for region_name, region_yaml in resource_yaml["regions"].items():
+        for database in region_yaml["databases"]:
+            _next_region(region_name).setdefault("databases", list()).append(
+                {"id": database["id"]})
+
+        for cluster_name, cluster_yaml in region_yaml["ecs"]["clusters"].items():
+            for service in cluster_yaml["services"]:
+                _next_region(region_name).setdefault(
+                    "ecs", {"clusters": dict()})["clusters"].setdefault(
+                    cluster_name, {"services": list()})["services"].append(
+                    {"name": service["name"]})
+
+        for cluster_name, cluster_yaml in region_yaml["eks"]["clusters"].items():
+            for namespace_name, namespace_yaml in cluster_yaml["namespaces"].items():
+                for key in ("statefulsets", "deployments"):
+                    for workload in namespace_yaml[key]:
+                        _next_region(region_name).setdefault(
+                            "eks", {"clusters": dict()})["clusters"].setdefault(
+                            cluster_name, {"namespaces": dict()})["namespaces"].setdefault(
+                            namespace_name, dict()).setdefault(key, list()).append(
+                            {"name": workload["name"]})
+
+    return operator_yaml
+
+
+def _dump_yaml(content: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as f:
+        yaml.dump(content, f,
+                  Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                  sort_keys=False)
+
+
+def write_resource_yaml(data_path: Path,
+                        maintenance_id: str,
+                        **kwargs) -> Path:
+    """
+    Write a synthetic resource.yaml into a maintenance directory.
+
+    :param data_path: Base path storing data files.
+    :type data_path: :class:`Path`
+    :param maintenance_id: Maintenance ID.
+    :type maintenance_id: str
+
+    :return: Path of resource.yaml.
+    :rtype: :class:`Path`
+    """
+
+    resource_path = data_path.joinpath(maintenance_id, "resource.yaml")
+    _dump_yaml(build_resource_yaml(**kwargs), resource_path)
+
+    return resource_path
+
+
+def write_maintenance(data_path: Path,
+                      maintenance_id: str,
+                      operators: int = 3,
+                      **kwargs) -> Tuple[Path, Path]:
+    """
+    Write a synthetic resource.yaml and a matching operator.yaml into a
+    maintenance directory.
+
+    :param data_path: Base path storing data files.
+    :type data_path: :class:`Path`
+    :param maintenance_id: Maintenance ID.
+    :type maintenance_id: str
+    :param operators: Number of operators.
+    :type operators: int
+
+    :return: Paths of resource.yaml and operator.yaml.
+    :rtype: Tuple[:class:`Path`, :class:`Path`]
+    """
+
+    resource_yaml = build_resource_yaml(**kwargs)
+    resource_path = data_path.joinpath(maintenance_id, "resource.yaml")
+    operator_path = data_path.joinpath(maintenance_id, "operator.yaml")
+    _dump_yaml(resource_yaml, resource_path)
+    _dump_yaml(build_operator_yaml(resource_yaml, operators=operators),
+               operator_path)
+
+    return resource_path, operator_path
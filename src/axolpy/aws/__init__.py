@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
 
 from axolpy.kubernetes import Cluster
+from axolpy.util.helper.string import intern_string
+from axolpy.util.types import resource_changes
 
 
 class AWSRegion(object):
@@ -11,6 +14,9 @@ class AWSRegion(object):
     A region in AWS cloud platform.
     """
 
+    __slots__ = ("_name", "_eks_clusters", "_ecs_clusters", "_rds_databases",
+                 "__weakref__")
+
     def __init__(self, name: str) -> None:
         """
         Initialize an object for a region in AWS cloud platform.
@@ -19,7 +25,7 @@ class AWSRegion(object):
         :type name: str
         """
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._eks_clusters: Dict[str, Cluster] = dict()
         self._ecs_clusters: Dict[str, ECSCluster] = dict()
         self._rds_databases: Dict[str, RDSDatabase] = dict()
@@ -29,8 +35,8 @@ class AWSRegion(object):
         return self._name
 
     @property
-    def eks_clusters(self) -> Dict[str, Cluster]:
-        return self._eks_clusters.copy()
+    def eks_clusters(self) -> Mapping[str, Cluster]:
+        return MappingProxyType(self._eks_clusters)
 
     def eks_cluster(self, name: str) -> Cluster:
         return self._eks_clusters[name]
@@ -46,8 +52,8 @@ class AWSRegion(object):
         self._eks_clusters[cluster.name] = cluster
 
     @property
-    def ecs_clusters(self) -> Dict[str, ECSCluster]:
-        return self._ecs_clusters.copy()
+    def ecs_clusters(self) -> Mapping[str, ECSCluster]:
+        return MappingProxyType(self._ecs_clusters)
 
     def ecs_cluster(self, name: str) -> ECSCluster:
         return self._ecs_clusters[name]
@@ -63,8 +69,8 @@ class AWSRegion(object):
         self._ecs_clusters[cluster.name] = cluster
 
     @property
-    def rds_databases(self) -> Dict[str, RDSDatabase]:
-        return self._rds_databases.copy()
+    def rds_databases(self) -> Mapping[str, RDSDatabase]:
+        return MappingProxyType(self._rds_databases)
 
     def rds_database(self, id: str) -> RDSDatabase:
         return self._rds_databases[id]
@@ -85,6 +91,8 @@ class AWSRegion(object):
 
 
 class ECSCluster(object):
+    __slots__ = ("_name", "_region", "_services")
+
     def __init__(
             self,
             name: str,
@@ -98,7 +106,7 @@ class ECSCluster(object):
         :param region: :class:`AWSRegion`
         """
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._region: AWSRegion = region
         self._services: Dict[str, ECSService] = dict()
 
@@ -113,8 +121,8 @@ class ECSCluster(object):
         return self._region
 
     @property
-    def services(self) -> Dict[str, ECSService]:
-        return self._services.copy()
+    def services(self) -> Mapping[str, ECSService]:
+        return MappingProxyType(self._services)
 
     def service(self, name: str) -> ECSService:
         return self._services[name]
@@ -127,6 +135,8 @@ class ECSCluster(object):
 
 
 class AbstractECSServicePatchable(ABC):
+    __slots__ = ("_desired_count",)
+
     def __init__(self, desired_count: int) -> None:
         self._desired_count: int = desired_count
 
@@ -136,6 +146,8 @@ class AbstractECSServicePatchable(ABC):
 
 
 class ECSServicePatch(AbstractECSServicePatchable):
+    __slots__ = ()
+
     def __init__(self, desired_count: int = -1) -> None:
         # If desired_count is -1, then no patch is needed.
         super().__init__(desired_count=desired_count)
@@ -145,6 +157,8 @@ class ECSServicePatch(AbstractECSServicePatchable):
 
 
 class ECSService(AbstractECSServicePatchable):
+    __slots__ = ("_name", "_cluster", "_patch", "_properties")
+
     def __init__(self,
                  name: str,
                  cluster: ECSCluster,
@@ -162,15 +176,17 @@ class ECSService(AbstractECSServicePatchable):
         :type patch: :class:`ECSServicePatch`
         """
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._cluster: Cluster = cluster
         self._desired_count: int = desired_count
         self._patch: ECSServicePatch = patch
         # Properties is used to store the properties of this ECS Service
-        # which are not the standard attributes of it.
-        self._properties: dict = dict()
-        for k, v in kwargs.items():
-            self.add_property(name=k, value=v)
+        # which are not the standard attributes of it. It is created when
+        # the first property is added.
+        self._properties: dict = None
+        if kwargs:
+            self._properties = {intern_string(k): intern_string(v)
+                                for k, v in kwargs.items()}
 
         self._cluster.add_service(service=self)
 
@@ -189,25 +205,35 @@ class ECSService(AbstractECSServicePatchable):
     @patch.setter
     def patch(self, patch: ECSServicePatch) -> None:
         self._patch = patch
+        resource_changes.increase()
 
     def add_property(self, name: str, value: Any) -> None:
-        self._properties[name] = value
+        if self._properties is None:
+            self._properties = dict()
+        self._properties[intern_string(name)] = intern_string(value)
+        resource_changes.increase()
+
+    @property
+    def properties(self) -> Mapping[str, Any]:
+        return MappingProxyType(self._properties if self._properties else {})
 
     def property(self, name) -> Any:
-        return self._properties.get(name, None)
+        return self._properties.get(name, None) if self._properties else None
 
     def __str__(self) -> str:
         return f"{__class__.__name__}(name: {self._name}, desired_count: {self._desired_count}" + \
-            f", {len(self._properties)} properties)"
+            f", {len(self._properties) if self._properties else 0} properties)"
 
 
 class AbstractRDSDatabasePatchable(ABC):
+    __slots__ = ("_engine_version", "_class_type")
+
     def __init__(
             self,
             engine_version: str,
             class_type: str) -> None:
-        self._engine_version: str = engine_version
-        self._class_type: str = class_type
+        self._engine_version: str = intern_string(engine_version)
+        self._class_type: str = intern_string(class_type)
 
     @property
     def engine_version(self) -> str:
@@ -219,6 +245,8 @@ class AbstractRDSDatabasePatchable(ABC):
 
 
 class RDSDatabasePatch(AbstractRDSDatabasePatchable):
+    __slots__ = ()
+
     def __init__(
             self,
             engine_version: str = None,
@@ -238,6 +266,9 @@ class RDSDatabase(AbstractRDSDatabasePatchable):
     A database Amazon Relational Databases Service.
     """
 
+    __slots__ = ("_id", "_region", "_type", "_host", "_port", "_engine_type",
+                 "_dbname", "_patch")
+
     def __init__(self,
                  id: str,
                  region: AWSRegion,
@@ -283,11 +314,11 @@ class RDSDatabase(AbstractRDSDatabasePatchable):
 
         self._id: str = id
         self._region: AWSRegion = region
-        self._type: str = type
+        self._type: str = intern_string(type)
         self._host: str = host
         self._port: int = port if port != -1 else \
             {'postgresql': 5432, 'mysql': 3306}[engine_type]
-        self._engine_type: str = engine_type
+        self._engine_type: str = intern_string(engine_type)
         self._dbname: str = dbname if dbname else id
         self._patch: RDSDatabasePatch = patch
 
@@ -328,6 +359,7 @@ class RDSDatabase(AbstractRDSDatabasePatchable):
     @patch.setter
     def patch(self, patch: RDSDatabasePatch) -> None:
         self._patch = patch
+        resource_changes.increase()
 
     def is_postgresql(self) -> bool:
         """
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import pickle
+import re
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    Sequence, Tuple, Type, Union)
+from weakref import WeakKeyDictionary
 
 import yaml
 
@@ -9,6 +18,147 @@ from ..aws import (AWSRegion, ECSCluster, ECSService, ECSServicePatch,
                    RDSDatabase, RDSDatabasePatch)
 from ..kubernetes import (AWSClusterRef, Cluster, Deployment, DeploymentPatch,
                           Namespace, StatefulSet, StatefulSetPatch)
+from ..util.types import resource_changes
+from .inventory import (KIND_DEPLOYMENT, KIND_ECS_SERVICE, KIND_RDS_DATABASE,
+                        KIND_STATEFULSET, InventoryIndex)
+
+try:
+    # libyaml is an optional part of PyYAML and is several times faster
+    # than the pure-Python loader
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader as _YAMLLoader
+
+_yaml_anchor_pattern = re.compile(rb"(?:^|[\s\[{,:-])&\S")
+_yaml_regions_key_pattern = re.compile(rb"regions:[ \t]*(?:#.*)?$")
+_yaml_block_key_pattern = re.compile(rb"([^\s#\[{][^#]*?):[ \t]*(?:#.*)?$")
+
+# Digest of the content each region was built from, used to find the
+# regions that have to be rebuilt on reload. It is only recorded by the
+# loads which need it, i.e. with a snapshot and on reload.
+_region_digests: WeakKeyDictionary[AWSRegion, str] = WeakKeyDictionary()
+
+
+def _load_yaml(stream: Any) -> Any:
+    """
+    Parse a YAML document with the fastest safe loader available.
+
+    :param stream: A binary file object, bytes or str to parse.
+    :type stream: Any
+
+    :return: The parsed document.
+    :rtype: Any
+    """
+
+    return yaml.load(stream, Loader=_YAMLLoader)
+
+
+def _index_region_sections(content: bytes) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    Locate the section of every region of resource.yaml by byte offsets,
+    without parsing the file.
+
+    Only block style mappings are indexed. None is returned when the
+    regions cannot be located reliably, e.g. when flow style or anchors
+    are used, and the file has to be parsed as a whole instead.
+
+    :param content: Content of resource.yaml.
+    :type content: bytes
+
+    :return: The start and end offsets of each region keyed by region name.
+    :rtype: Dict[str, Tuple[int, int]]
+    """
+
+    # Anchors may be referenced across regions so that a region cannot be
+    # parsed on its own
+    if _yaml_anchor_pattern.search(content):
+        return None
+
+    sections: Dict[str, Tuple[int, int]] = dict()
+    in_regions = False
+    indent = None
+    region_name = None
+    start = offset = 0
+    for line in content.splitlines(keepends=True):
+        stripped = line.strip()
+        if stripped and not stripped.startswith(b"#"):
+            line_indent = len(line) - len(line.lstrip(b" "))
+            if line_indent == 0:
+                if in_regions:
+                    break
+                in_regions = _yaml_regions_key_pattern.match(stripped) is not None
+            elif in_regions:
+                if indent is None:
+                    indent = line_indent
+                if line_indent < indent:
+                    return None
+                if line_indent == indent:
+                    key_match = _yaml_block_key_pattern.match(stripped)
+                    if key_match is None:
+                        return None
+                    if region_name is not None:
+                        sections[region_name] = (start, offset)
+                    region_name = _load_yaml(key_match.group(1))
+                    if not isinstance(region_name, str) or region_name in sections:
+                        return None
+                    start = offset
+        offset += len(line)
+    if region_name is not None:
+        sections[region_name] = (start, offset)
+
+    return sections if sections else None
+
+
+def _region_digest(region_yaml: dict) -> str:
+    """
+    Calculate the digest of the parsed content of a region, which does
+    not depend on the order of keys.
+
+    :param region_yaml: Parsed content of the region in resource.yaml.
+    :type region_yaml: dict
+
+    :return: SHA-256 digest in hex.
+    :rtype: str
+    """
+
+    return hashlib.sha256(
+        json.dumps(region_yaml,
+                   sort_keys=True,
+                   separators=(",", ":"),
+                   default=str).encode()).hexdigest()
+
+
+def _source_digest(source: Union[bytes, dict]) -> str:
+    """
+    Calculate the digest of the source a region is built from.
+
+    :param source: The raw section of resource.yaml holding the region,
+        or the parsed content of the region.
+    :type source: Union[bytes, dict]
+
+    :return: SHA-256 digest in hex.
+    :rtype: str
+    """
+
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+
+    return _region_digest(source)
+
+
+def _load_yaml_file(path: Path) -> Any:
+    """
+    Parse a YAML file as a stream instead of reading it into memory first.
+
+    :param path: Path of the YAML file.
+    :type path: :class:`Path`
+
+    :return: The parsed document.
+    :rtype: Any
+    """
+
+    with path.open("rb") as f:
+        return _load_yaml(f)
 
 
 class ResourceDataLoader(object):
@@ -16,10 +166,32 @@ class ResourceDataLoader(object):
     Load a collectiom of cloud resources from a file.
     """
 
+    # Version of the object graph produced by this loader. Bump it
+    # whenever the model classes change so that stale snapshots are
+    # rebuilt instead of being unpickled.
+    SNAPSHOT_VERSION: int = 3
+    SNAPSHOT_FILENAME: str = ".resource.snapshot"
+    _snapshot_magic: bytes = b"axolpy-resource-snapshot"
+
+    _database_optional_attrs = ["port",
+                                "engine_type",
+                                "engine_version",
+                                "class_type",
+                                "dbname"]
+    _database_patch_optional_attrs = ["engine_version", "class_type"]
+    _ecs_service_optional_props = ["restart_after_upgrade"]
+    _ecs_service_patch_optional_attrs = ["desired_count"]
+    _eks_statefulset_optional_props = ["restart_after_upgrade"]
+    _eks_statefulset_patch_optional_attrs = ["replicas"]
+    _eks_deployment_optional_props = ["restart_after_upgrade"]
+    _eks_deployment_patch_optional_attrs = ["replicas"]
+
     @classmethod
     def load_from_file(cls,
                        data_path: Path,
-                       maintenance_id: str) -> Dict[str, AWSRegion]:
+                       maintenance_id: str,
+                       use_snapshot: bool = False,
+                       max_workers: Optional[int] = 1) -> Dict[str, AWSRegion]:
         """
         Load the resources from a file.
 
@@ -27,135 +199,532 @@ class ResourceDataLoader(object):
         :type data_path: :class:`Path`
         :param maintenance_id: Maintenance ID.
         :type maintenance_id: str
+        :param use_snapshot: Whether to reuse a binary snapshot of the
+            resources kept in the maintenance directory. The snapshot is
+            keyed by the content hash of resource.yaml and the loader
+            version, and is rebuilt when either changes.
+        :type use_snapshot: bool
+        :param max_workers: Number of processes building the regions in
+            parallel. 1 builds them in the current process and None uses
+            as many processes as CPUs.
+        :type max_workers: int
 
         :return: A dictionary of AWSRegions.
         :rtype: Dict[str, :class:`AWSRegion`]
         """
 
-        database_optional_attrs = ["port",
-                                   "engine_type",
-                                   "engine_version",
-                                   "class_type",
-                                   "dbname"]
-        database_patch_optional_attrs = ["engine_version", "class_type"]
-        ecs_service_optional_props = ["restart_after_upgrade"]
-        ecs_service_patch_optional_attrs = ["desired_count"]
-        eks_statefulset_optional_props = ["restart_after_upgrade"]
-        eks_statefulset_patch_optional_attrs = ["replicas"]
-        eks_deployment_optional_props = ["restart_after_upgrade"]
-        eks_deployment_patch_optional_attrs = ["replicas"]
+        resource_path = data_path.joinpath(maintenance_id, "resource.yaml")
+        if not use_snapshot and max_workers == 1:
+            return cls._load_regions(_load_yaml_file(resource_path))
 
-        aws_regions: Dict[str, AWSRegion] = dict()
+        content = resource_path.read_bytes()
+        if not use_snapshot:
+            return cls._load_regions_in_parallel(content=content,
+                                                 max_workers=max_workers)
+
+        digest = hashlib.sha256(content).hexdigest()
+        snapshot_path = data_path.joinpath(maintenance_id,
+                                           cls.SNAPSHOT_FILENAME)
+        aws_regions = cls._read_snapshot(snapshot_path=snapshot_path,
+                                         digest=digest)
+        if aws_regions is None:
+            # The digests of the regions are kept in the snapshot for
+            # reload_from_file
+            if max_workers == 1:
+                aws_regions = cls._load_regions(_load_yaml(content),
+                                                with_digests=True)
+            else:
+                aws_regions = cls._load_regions_in_parallel(
+                    content=content,
+                    max_workers=max_workers,
+                    with_digests=True)
+            cls._write_snapshot(snapshot_path=snapshot_path,
+                                digest=digest,
+                                aws_regions=aws_regions)
+
+        return aws_regions
+
+    @classmethod
+    def load_lazily_from_file(cls,
+                              data_path: Path,
+                              maintenance_id: str) -> LazyAWSRegions:
+        """
+        Load the resources from a file, building each region only when
+        it is accessed for the first time.
+
+        :param data_path: Base path storing data files.
+        :type data_path: :class:`Path`
+        :param maintenance_id: Maintenance ID.
+        :type maintenance_id: str
+
+        :return: A mapping of region name to AWSRegion.
+        :rtype: :class:`LazyAWSRegions`
+        """
+
+        resource_path = data_path.joinpath(maintenance_id, "resource.yaml")
+        content = resource_path.read_bytes()
+        sections = _index_region_sections(content)
+        if sections is None:
+            return LazyAWSRegions(
+                sources=_load_yaml(content)["regions"],
+                loader=cls)
+
+        # Only the byte offsets are kept until a region is accessed
+        return LazyAWSRegions(
+            sources={region_name: content[start:end]
+                     for region_name, (start, end) in sections.items()},
+            loader=cls)
+
+    @classmethod
+    def reload_from_file(cls,
+                         data_path: Path,
+                         maintenance_id: str,
+                         aws_regions: Mapping[str, AWSRegion]) -> Mapping[str, AWSRegion]:
+        """
+        Reload the resources from a changed file, rebuilding only the
+        regions whose content has changed since *aws_regions* was loaded.
+        Unchanged regions are reused as they are, so operators holding
+        resources of a rebuilt region have to be loaded again.
+
+        The content of a region is only known for the regions loaded with
+        a snapshot or by a reload, so the regions of any other load are
+        all rebuilt by their first reload. Regions loaded lazily are
+        compared by their sections of resource.yaml and are reloaded
+        lazily, without building the regions which have not been built.
+
+        :param data_path: Base path storing data files.
+        :type data_path: :class:`Path`
+        :param maintenance_id: Maintenance ID.
+        :type maintenance_id: str
+        :param aws_regions: The regions loaded previously by this loader.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+
+        :return: A dictionary of AWSRegions, or a
+            :class:`LazyAWSRegions` if *aws_regions* is one.
+        :rtype: Mapping[str, :class:`AWSRegion`]
+        """
+
+        resource_path = data_path.joinpath(maintenance_id, "resource.yaml")
+        if isinstance(aws_regions, LazyAWSRegions):
+            reloaded = cls.load_lazily_from_file(data_path=data_path,
+                                                 maintenance_id=maintenance_id)
+            reloaded._reuse(aws_regions)
+            return reloaded
+
+        resources_yaml = _load_yaml_file(resource_path)
 
-        resources_yaml = yaml.safe_load(
-            data_path.joinpath(maintenance_id, "resource.yaml").read_text())
+        reloaded_regions: Dict[str, AWSRegion] = dict()
         for region_name, region_yaml in resources_yaml["regions"].items():
-            region = AWSRegion(name=region_name)
-            aws_regions[region_name] = region
-
-            # Extract database resources
-            # Lookup attributes needed for database object
-            for database_yaml in region_yaml["databases"] if "databases" in region_yaml else []:
-                db_attr = {"id": database_yaml["id"],
-                           "region": region,
-                           "type": database_yaml["type"],
-                           "host": database_yaml["host"]}
-                for attr in database_optional_attrs:
-                    if attr in database_yaml:
-                        db_attr[attr] = database_yaml[attr]
+            digest = _region_digest(region_yaml)
+            region = aws_regions.get(region_name)
+            if region is None or _region_digests.get(region) != digest:
+                region = cls._load_region(region_name=region_name,
+                                          region_yaml=region_yaml,
+                                          digest=digest)
+            reloaded_regions[region_name] = region
+
+        return reloaded_regions
+
+    @classmethod
+    def _snapshot_header(cls, digest: str) -> bytes:
+        return b"%s %d %s\n" % (cls._snapshot_magic,
+                                cls.SNAPSHOT_VERSION,
+                                digest.encode())
+
+    @classmethod
+    def _read_snapshot(cls,
+                       snapshot_path: Path,
+                       digest: str) -> Optional[Dict[str, AWSRegion]]:
+        """
+        Read the resources from a snapshot if it matches *digest*.
+
+        :param snapshot_path: Path of the snapshot file.
+        :type snapshot_path: :class:`Path`
+        :param digest: SHA-256 digest of resource.yaml.
+        :type digest: str
+
+        :return: A dictionary of AWSRegions or None if the snapshot is
+            missing or stale.
+        :rtype: Dict[str, :class:`AWSRegion`]
+        """
+
+        try:
+            with snapshot_path.open("rb") as f:
+                if f.readline() != cls._snapshot_header(digest=digest):
+                    return None
+                aws_regions, region_digests = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # A snapshot written by an incompatible version of the
+            # model classes is treated as stale.
+            return None
+
+        for region_name, region in aws_regions.items():
+            _region_digests[region] = region_digests[region_name]
+
+        return aws_regions
+
+    @classmethod
+    def _write_snapshot(cls,
+                        snapshot_path: Path,
+                        digest: str,
+                        aws_regions: Dict[str, AWSRegion]) -> None:
+        """
+        Write the resources to a snapshot atomically.
+
+        :param snapshot_path: Path of the snapshot file.
+        :type snapshot_path: :class:`Path`
+        :param digest: SHA-256 digest of resource.yaml.
+        :type digest: str
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Dict[str, :class:`AWSRegion`]
+        """
+
+        tmp_path = snapshot_path.with_name(
+            f"{snapshot_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open("wb") as f:
+            f.write(cls._snapshot_header(digest=digest))
+            pickle.dump((aws_regions,
+                         {region_name: _region_digests[region]
+                          for region_name, region in aws_regions.items()}),
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+
+    @classmethod
+    def _load_regions(cls,
+                      resources_yaml: dict,
+                      with_digests: bool = False) -> Dict[str, AWSRegion]:
+        """
+        Build all regions from the parsed content of resource.yaml.
+
+        :param resources_yaml: Parsed content of resource.yaml.
+        :type resources_yaml: dict
+        :param with_digests: Record the digest of the content of every
+            region.
+        :type with_digests: bool
+
+        :return: A dictionary of AWSRegions.
+        :rtype: Dict[str, :class:`AWSRegion`]
+        """
+
+        aws_regions: Dict[str, AWSRegion] = dict()
+        for region_name, region_yaml in resources_yaml["regions"].items():
+            aws_regions[region_name] = cls._load_region(
+                region_name=region_name,
+                region_yaml=region_yaml,
+                digest=_region_digest(region_yaml) if with_digests else None)
+
+        return aws_regions
+
+    @classmethod
+    def _load_regions_in_parallel(cls,
+                                  content: bytes,
+                                  max_workers: Optional[int],
+                                  with_digests: bool = False) -> Dict[str, AWSRegion]:
+        """
+        Build all regions in a pool of processes, one region per task.
+
+        When the regions of resource.yaml can be located by byte offsets,
+        each process also parses its own region, otherwise the file is
+        parsed here and only the building of objects is parallel.
+
+        :param content: Content of resource.yaml.
+        :type content: bytes
+        :param max_workers: Number of processes.
+        :type max_workers: int
+        :param with_digests: Record the digest of the content of every
+            region.
+        :type with_digests: bool
+
+        :return: A dictionary of AWSRegions.
+        :rtype: Dict[str, :class:`AWSRegion`]
+        """
+
+        sections = _index_region_sections(content)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            if sections is None:
+                sources = _load_yaml(content)["regions"]
+            else:
+                sources = {region_name: content[start:end]
+                           for region_name, (start, end) in sections.items()}
+            futures = {
+                region_name: executor.submit(cls._load_region_in_worker,
+                                             region_name,
+                                             source,
+                                             with_digests)
+                for region_name, source in sources.items()}
+
+            aws_regions: Dict[str, AWSRegion] = dict()
+            for region_name, future in futures.items():
+                region, digest = future.result()
+                # Digests recorded in the worker are not sent back with
+                # the region
+                if digest is not None:
+                    _region_digests[region] = digest
+                aws_regions[region_name] = region
+
+            return aws_regions
+
+    @classmethod
+    def _load_region_in_worker(cls,
+                               region_name: str,
+                               source: Union[bytes, dict],
+                               with_digest: bool = False) -> Tuple[AWSRegion, Optional[str]]:
+        """
+        Build a region in a worker process.
+
+        :param region_name: Region name.
+        :type region_name: str
+        :param source: The raw section or parsed content of the region.
+        :type source: Union[bytes, dict]
+        :param with_digest: Calculate the digest of the content.
+        :type with_digest: bool
+
+        :return: The region and the digest of its content, or None.
+        :rtype: Tuple[:class:`AWSRegion`, str]
+        """
+
+        region_yaml = _load_yaml(source)[region_name] if isinstance(source, bytes) else source
+        digest = _region_digest(region_yaml) if with_digest else None
+
+        return cls._load_region(region_name=region_name,
+                                region_yaml=region_yaml,
+                                digest=digest), digest
+
+    @classmethod
+    def _load_region_source(cls,
+                            region_name: str,
+                            source: Union[bytes, dict]) -> AWSRegion:
+        """
+        Build a region from either its own section of resource.yaml or
+        its parsed content.
+
+        :param region_name: Region name.
+        :type region_name: str
+        :param source: The lines of resource.yaml holding the region, or
+            the parsed content of the region.
+        :type source: Union[bytes, dict]
+
+        :return: The region.
+        :rtype: :class:`AWSRegion`
+        """
+
+        if isinstance(source, bytes):
+            source = _load_yaml(source)[region_name]
+
+        return cls._load_region(region_name=region_name, region_yaml=source)
+
+    @classmethod
+    def _load_region(cls,
+                     region_name: str,
+                     region_yaml: dict,
+                     digest: str = None) -> AWSRegion:
+        """
+        Build a region and all of its resources.
+
+        :param region_name: Region name.
+        :type region_name: str
+        :param region_yaml: Parsed content of the region in resource.yaml.
+        :type region_yaml: dict
+        :param digest: Digest of *region_yaml* to record for reloading, or
+            None to record nothing.
+        :type digest: str
+
+        :return: The region.
+        :rtype: :class:`AWSRegion`
+        """
+
+        region = AWSRegion(name=region_name)
+        if digest is not None:
+            _region_digests[region] = digest
+
+        # Extract database resources
+        # Lookup attributes needed for database object
+        for database_yaml in region_yaml["databases"] if "databases" in region_yaml else []:
+            db_attr = {"id": database_yaml["id"],
+                       "region": region,
+                       "type": database_yaml["type"],
+                       "host": database_yaml["host"]}
+            for attr in cls._database_optional_attrs:
+                if attr in database_yaml:
+                    db_attr[attr] = database_yaml[attr]
+
+            # Lookup attributes needed for patching
+            if "patch" in database_yaml:
+                patch_attr = dict()
+                for attr in cls._database_patch_optional_attrs:
+                    if attr in database_yaml["patch"]:
+                        patch_attr[attr] = database_yaml["patch"][attr]
+                db_attr["patch"] = RDSDatabasePatch(**patch_attr)
+
+            region.add_rds_database(database=RDSDatabase(**db_attr))
+
+        # Extract ecs cluster resources
+        for cluster_name, cluster_yaml in region_yaml["ecs"]["clusters"].items() \
+                if "ecs" in region_yaml and "clusters" in region_yaml["ecs"] else []:
+            cluster = ECSCluster(
+                name=cluster_name,
+                region=region)
+
+            for service_yaml in cluster_yaml["services"] if "services" in cluster_yaml else []:
+                svc_attr = {"name": service_yaml["name"],
+                            "cluster": cluster,
+                            "desired_count": service_yaml["desired_count"]}
 
                 # Lookup attributes needed for patching
-                if "patch" in database_yaml:
+                if "patch" in service_yaml:
                     patch_attr = dict()
-                    for attr in database_patch_optional_attrs:
-                        if attr in database_yaml["patch"]:
-                            patch_attr[attr] = database_yaml["patch"][attr]
-                    db_attr["patch"] = RDSDatabasePatch(**patch_attr)
+                    for attr in cls._ecs_service_patch_optional_attrs:
+                        if attr in service_yaml["patch"]:
+                            patch_attr[attr] = service_yaml["patch"][attr]
+                    svc_attr["patch"] = ECSServicePatch(
+                        **patch_attr)
+                for prop in cls._ecs_service_optional_props if "properties" in service_yaml else []:
+                    if prop in service_yaml["properties"]:
+                        svc_attr[prop] = service_yaml["properties"][prop]
+                cluster.add_service(service=ECSService(**svc_attr))
 
-                region.add_rds_database(database=RDSDatabase(**db_attr))
+        # Extract eks resources
+        for cluster_name, cluster_yaml in region_yaml["eks"]["clusters"].items() \
+                if "eks" in region_yaml and "clusters" in region_yaml["eks"] else []:
+            cluster = Cluster(
+                name=cluster_name,
+                platform_ref=AWSClusterRef(region=region))
 
-            # Extract ecs cluster resources
-            for cluster_name, cluster_yaml in region_yaml["ecs"]["clusters"].items() \
-                    if "ecs" in region_yaml and "clusters" in region_yaml["ecs"] else []:
-                cluster = ECSCluster(
-                    name=cluster_name,
-                    region=region)
+            for namespace_name, namespace_yaml in cluster_yaml["namespaces"].items():
+                namespace = Namespace(
+                    name=namespace_name,
+                    cluster=cluster)
 
-                for service_yaml in cluster_yaml["services"] if "services" in cluster_yaml else []:
-                    svc_attr = {"name": service_yaml["name"],
-                                "cluster": cluster,
-                                "desired_count": service_yaml["desired_count"]}
+                # Extract StatefulSets
+                for sts_yaml in namespace_yaml["statefulsets"] if "statefulsets" in namespace_yaml else []:
+                    sts_attr = {"name": sts_yaml["name"],
+                                "namespace": namespace,
+                                "replicas": sts_yaml["replicas"]}
 
                     # Lookup attributes needed for patching
-                    if "patch" in service_yaml:
+                    if "patch" in sts_yaml:
                         patch_attr = dict()
-                        for attr in ecs_service_patch_optional_attrs:
-                            if attr in service_yaml["patch"]:
-                                patch_attr[attr] = service_yaml["patch"][attr]
-                        svc_attr["patch"] = ECSServicePatch(
+                        for attr in cls._eks_statefulset_patch_optional_attrs:
+                            if attr in sts_yaml["patch"]:
+                                patch_attr[attr] = sts_yaml["patch"][attr]
+                        sts_attr["patch"] = StatefulSetPatch(
                             **patch_attr)
-                    for prop in ecs_service_optional_props if "properties" in service_yaml else []:
-                        if prop in service_yaml["properties"]:
-                            svc_attr[prop] = service_yaml["properties"][prop]
-                    cluster.add_service(service=ECSService(**svc_attr))
-
-            # Extract eks resources
-            for cluster_name, cluster_yaml in region_yaml["eks"]["clusters"].items() \
-                    if "eks" in region_yaml and "clusters" in region_yaml["eks"] else []:
-                cluster = Cluster(
-                    name=cluster_name,
-                    platform_ref=AWSClusterRef(region=region))
-
-                for namespace_name, namespace_yaml in cluster_yaml["namespaces"].items():
-                    namespace = Namespace(
-                        name=namespace_name,
-                        cluster=cluster)
-
-                    # Extract StatefulSets
-                    for sts_yaml in namespace_yaml["statefulsets"] if "statefulsets" in namespace_yaml else []:
-                        sts_attr = {"name": sts_yaml["name"],
-                                    "namespace": namespace,
-                                    "replicas": sts_yaml["replicas"]}
-
-                        # Lookup attributes needed for patching
-                        if "patch" in sts_yaml:
-                            patch_attr = dict()
-                            for attr in eks_statefulset_patch_optional_attrs:
-                                if attr in sts_yaml["patch"]:
-                                    patch_attr[attr] = sts_yaml["patch"][attr]
-                            sts_attr["patch"] = StatefulSetPatch(
-                                **patch_attr)
-                        for prop in eks_statefulset_optional_props if "properties" in sts_yaml else []:
-                            if prop in sts_yaml["properties"]:
-                                sts_attr[prop] = sts_yaml["properties"][prop]
-
-                        namespace.add_statefulset(
-                            statefulset=StatefulSet(**sts_attr))
-
-                    # Extract deployments
-                    for dpm_yml in namespace_yaml["deployments"] \
-                            if "deployments" in namespace_yaml else []:
-                        dpm_attr = {"name": dpm_yml["name"],
-                                    "namespace": namespace,
-                                    "replicas": dpm_yml["replicas"]}
-
-                        # Lookup attributes needed for patching
-                        if "patch" in dpm_yml:
-                            patch_attr = dict()
-                            for attr in eks_deployment_patch_optional_attrs:
-                                if attr in dpm_yml["patch"]:
-                                    patch_attr[attr] = dpm_yml["patch"][attr]
-                            dpm_attr["patch"] = DeploymentPatch(
-                                **patch_attr)
-                        for prop in eks_deployment_optional_props \
-                                if "properties" in dpm_yml else []:
-                            if prop in dpm_yml["properties"]:
-                                dpm_attr[prop] = dpm_yml["properties"][prop]
-
-                        namespace.add_deployment(
-                            deployment=Deployment(**dpm_attr))
+                    for prop in cls._eks_statefulset_optional_props if "properties" in sts_yaml else []:
+                        if prop in sts_yaml["properties"]:
+                            sts_attr[prop] = sts_yaml["properties"][prop]
 
-        return aws_regions
+                    namespace.add_statefulset(
+                        statefulset=StatefulSet(**sts_attr))
+
+                # Extract deployments
+                for dpm_yml in namespace_yaml["deployments"] \
+                        if "deployments" in namespace_yaml else []:
+                    dpm_attr = {"name": dpm_yml["name"],
+                                "namespace": namespace,
+                                "replicas": dpm_yml["replicas"]}
+
+                    # Lookup attributes needed for patching
+                    if "patch" in dpm_yml:
+                        patch_attr = dict()
+                        for attr in cls._eks_deployment_patch_optional_attrs:
+                            if attr in dpm_yml["patch"]:
+                                patch_attr[attr] = dpm_yml["patch"][attr]
+                        dpm_attr["patch"] = DeploymentPatch(
+                            **patch_attr)
+                    for prop in cls._eks_deployment_optional_props \
+                            if "properties" in dpm_yml else []:
+                        if prop in dpm_yml["properties"]:
+                            dpm_attr[prop] = dpm_yml["properties"][prop]
+
+                    namespace.add_deployment(
+                        deployment=Deployment(**dpm_attr))
+
+        return region
+
+
+class LazyAWSRegions(Mapping):
+    """
+    A read-only mapping of region name to AWSRegion which builds a region
+    and its clusters, namespaces and databases on first access.
+    """
+
+    def __init__(self,
+                 sources: Dict[str, Union[bytes, dict]],
+                 loader: Type[ResourceDataLoader] = ResourceDataLoader) -> None:
+        """
+        Initialize the mapping.
+
+        :param sources: Either the raw section of resource.yaml or the
+            parsed content of each region, keyed by region name.
+        :type sources: Dict[str, Union[bytes, dict]]
+        :param loader: The loader used to build a region.
+        :type loader: Type[:class:`ResourceDataLoader`]
+        """
+
+        self._sources: Dict[str, Union[bytes, dict]] = sources
+        self._loader: Type[ResourceDataLoader] = loader
+        self._region_names: List[str] = list(sources.keys())
+        self._regions: Dict[str, AWSRegion] = dict()
+        # Digest of the source of every built region, for reloading
+        self._digests: Dict[str, str] = dict()
+
+    def __getitem__(self, name: str) -> AWSRegion:
+        if name in self._regions:
+            return self._regions[name]
+
+        source = self._sources[name]
+        region = self._loader._load_region_source(region_name=name,
+                                                  source=source)
+        self._regions[name] = region
+        self._digests[name] = _source_digest(source)
+        del self._sources[name]
+
+        return region
+
+    def _reuse(self, previous: LazyAWSRegions) -> None:
+        """
+        Take the regions which *previous* has built from the same source
+        as this mapping, instead of building them again.
+
+        :param previous: The mapping loaded from an earlier content.
+        :type previous: :class:`LazyAWSRegions`
+        """
+
+        for name, region in previous._regions.items():
+            source = self._sources.get(name)
+            if source is not None and _source_digest(source) == previous._digests[name]:
+                self._regions[name] = region
+                self._digests[name] = previous._digests[name]
+                del self._sources[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._region_names)
+
+    def __len__(self) -> int:
+        return len(self._region_names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._regions or name in self._sources
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Check if a region has been built.
+
+        :param name: Region name.
+        :type name: str
+
+        :return: True if the region has been built.
+        :rtype: bool
+        """
+
+        return name in self._regions
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._region_names)} regions" + \
+            f", {len(self._regions)} loaded)"
 
 
 class Operator(object):
@@ -178,6 +747,22 @@ class Operator(object):
         self._eks_deployments: List[Deployment] = list()
         self._eks_statefulsets: List[StatefulSet] = list()
 
+        # Resources by the categories the steps work on, kept as the
+        # resources are added. They are filed again on the next read after
+        # the patch or the properties of any resource have changed.
+        self._postgresql_databases: List[RDSDatabase] = list()
+        self._mysql_databases: List[RDSDatabase] = list()
+        self._patched_databases: List[RDSDatabase] = list()
+        self._engine_version_patched_databases: List[RDSDatabase] = list()
+        self._class_type_patched_databases: List[RDSDatabase] = list()
+        self._ecs_services_by_restart: Dict[bool, List[ECSService]] = {
+            True: list(), False: list()}
+        self._eks_deployments_by_restart: Dict[bool, List[Deployment]] = {
+            True: list(), False: list()}
+        self._eks_statefulsets_by_restart: Dict[bool, List[StatefulSet]] = {
+            True: list(), False: list()}
+        self._filed_changes: int = resource_changes.value
+
         self._data_loader: OperatorDataLoader = OperatorDataLoader(self)
 
     @property
@@ -200,21 +785,195 @@ class Operator(object):
     def rds_databases(self) -> Iterable[RDSDatabase]:
         return self._rds_databases
 
+    @property
+    def postgresql_databases(self) -> Sequence[RDSDatabase]:
+        self._refile()
+        return self._postgresql_databases
+
+    @property
+    def mysql_databases(self) -> Sequence[RDSDatabase]:
+        self._refile()
+        return self._mysql_databases
+
+    @property
+    def patched_databases(self) -> Sequence[RDSDatabase]:
+        self._refile()
+        return self._patched_databases
+
+    @property
+    def engine_version_patched_databases(self) -> Sequence[RDSDatabase]:
+        self._refile()
+        return self._engine_version_patched_databases
+
+    @property
+    def class_type_patched_databases(self) -> Sequence[RDSDatabase]:
+        self._refile()
+        return self._class_type_patched_databases
+
+    def ecs_services_by_restart_after_upgrade(
+            self, restart_after_upgrade: bool = True) -> Sequence[ECSService]:
+        """
+        Get the ECS services by whether they have the restart_after_upgrade
+        property set.
+
+        :param restart_after_upgrade: Value of the property.
+        :type restart_after_upgrade: bool
+
+        :return: The ECS services in the order they are added.
+        :rtype: Sequence[:class:`ECSService`]
+        """
+
+        self._refile()
+        return self._ecs_services_by_restart[bool(restart_after_upgrade)]
+
+    def eks_deployments_by_restart_after_upgrade(
+            self, restart_after_upgrade: bool = True) -> Sequence[Deployment]:
+        """
+        Get the Deployments by whether they have the restart_after_upgrade
+        property set.
+
+        :param restart_after_upgrade: Value of the property.
+        :type restart_after_upgrade: bool
+
+        :return: The Deployments in the order they are added.
+        :rtype: Sequence[:class:`Deployment`]
+        """
+
+        self._refile()
+        return self._eks_deployments_by_restart[bool(restart_after_upgrade)]
+
+    def eks_statefulsets_by_restart_after_upgrade(
+            self, restart_after_upgrade: bool = True) -> Sequence[StatefulSet]:
+        """
+        Get the StatefulSets by whether they have the restart_after_upgrade
+        property set.
+
+        :param restart_after_upgrade: Value of the property.
+        :type restart_after_upgrade: bool
+
+        :return: The StatefulSets in the order they are added.
+        :rtype: Sequence[:class:`StatefulSet`]
+        """
+
+        self._refile()
+        return self._eks_statefulsets_by_restart[bool(restart_after_upgrade)]
+
     @property
     def data_loader(self) -> OperatorDataLoader:
         return self._data_loader
 
+    def _refile(self) -> None:
+        """
+        File the resources into the categories again if the patch or the
+        properties of any resource have changed since they were filed.
+        """
+
+        changes = resource_changes.value
+        if changes == self._filed_changes:
+            return
+
+        for category in (self._postgresql_databases,
+                         self._mysql_databases,
+                         self._patched_databases,
+                         self._engine_version_patched_databases,
+                         self._class_type_patched_databases,
+                         *self._ecs_services_by_restart.values(),
+                         *self._eks_deployments_by_restart.values(),
+                         *self._eks_statefulsets_by_restart.values()):
+            category.clear()
+        for deployment in self._eks_deployments:
+            self._file_eks_deployment(deployment)
+        for statefulset in self._eks_statefulsets:
+            self._file_eks_statefulset(statefulset)
+        for service in self._ecs_services:
+            self._file_ecs_service(service)
+        for database in self._rds_databases:
+            self._file_rds_database(database)
+        self._filed_changes = changes
+
+    def _file_eks_deployment(self, deployment: Deployment) -> None:
+        self._eks_deployments_by_restart[
+            bool(deployment.property("restart_after_upgrade"))].append(deployment)
+
+    def _file_eks_statefulset(self, statefulset: StatefulSet) -> None:
+        self._eks_statefulsets_by_restart[
+            bool(statefulset.property("restart_after_upgrade"))].append(statefulset)
+
+    def _file_ecs_service(self, service: ECSService) -> None:
+        self._ecs_services_by_restart[
+            bool(service.property("restart_after_upgrade"))].append(service)
+
+    def _file_rds_database(self, database: RDSDatabase) -> None:
+        if database.is_postgresql():
+            self._postgresql_databases.append(database)
+        elif database.is_mysql():
+            self._mysql_databases.append(database)
+        if database.patch:
+            self._patched_databases.append(database)
+            if database.patch.engine_version:
+                self._engine_version_patched_databases.append(database)
+            if database.patch.class_type:
+                self._class_type_patched_databases.append(database)
+
     def add_eks_deployment(self, deployment: Deployment) -> None:
         self._eks_deployments.append(deployment)
+        self._file_eks_deployment(deployment)
 
     def add_eks_statefulset(self, statefulset: StatefulSet) -> None:
         self._eks_statefulsets.append(statefulset)
+        self._file_eks_statefulset(statefulset)
 
     def add_ecs_service(self, service: ECSService) -> None:
         self._ecs_services.append(service)
+        self._file_ecs_service(service)
 
     def add_rds_databases(self, database: RDSDatabase) -> None:
         self._rds_databases.append(database)
+        self._file_rds_database(database)
+
+
+class UnresolvedReferenceError(KeyError):
+    """
+    Raised when resources referenced by operators do not exist.
+    """
+
+    def __init__(self, references: List[Tuple[str, str]]) -> None:
+        """
+        Initialize the error.
+
+        :param references: The YAML path and the resource path of every
+            reference which cannot be resolved.
+        :type references: List[Tuple[str, str]]
+        """
+
+        super().__init__(references)
+        self.references: List[Tuple[str, str]] = references
+
+    def __str__(self) -> str:
+        return f"{len(self.references)} unresolved references:" + "".join(
+            f"\n  {yaml_path}: {path}" for yaml_path, path in self.references)
+
+
+class _Reference(NamedTuple):
+    """
+    A reference from operator.yaml to a resource.
+    """
+
+    yaml_path: str
+    kind: str
+    region: str
+    name: str
+    cluster: str = None
+    namespace: str = None
+
+    @property
+    def path(self) -> str:
+        if self.kind == KIND_RDS_DATABASE:
+            return f"{self.region}/rds/{self.name}"
+        elif self.kind == KIND_ECS_SERVICE:
+            return f"{self.region}/ecs/{self.cluster}/service/{self.name}"
+
+        return f"{self.region}/eks/{self.cluster}/{self.namespace}/{self.kind}/{self.name}"
 
 
 class OperatorDataLoader(object):
@@ -236,7 +995,8 @@ class OperatorDataLoader(object):
     def load_from_file(self,
                        data_path: Path,
                        maintenance_id: str,
-                       aws_regions: Dict[str, AWSRegion]) -> None:
+                       aws_regions: Mapping[str, AWSRegion],
+                       index: InventoryIndex = None) -> None:
         """
         Load the operator from a file.
 
@@ -245,40 +1005,232 @@ class OperatorDataLoader(object):
         :param maintenance_id: Maintenance ID.
         :type maintenance_id: str
         :param aws_regions: Data of all regions.
-        :type aws_regions: Dict[str, :class:`AWSRegion`]
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        :param index: Index of *aws_regions* to resolve the references
+            against. The regions are walked if it is not given.
+        :type index: :class:`InventoryIndex`
+
+        :raises UnresolvedReferenceError: If any referenced resource does
+            not exist. Nothing is added to the operator in that case.
+        """
+
+        operator_yaml = _load_yaml_file(
+            data_path.joinpath(maintenance_id, "operator.yaml"))
+
+        self.load_from_yaml(regions_yaml=operator_yaml[self._operator.id],
+                            aws_regions=aws_regions,
+                            index=index)
+
+    @classmethod
+    def load_all_from_file(cls,
+                           data_path: Path,
+                           maintenance_id: str,
+                           aws_regions: Mapping[str, AWSRegion],
+                           index: InventoryIndex = None) -> Dict[str, Operator]:
+        """
+        Load all operators from a file, parsing it only once.
+
+        :param data_path: Base path storing data files.
+        :type data_path: :class:`Path`
+        :param maintenance_id: Maintenance ID.
+        :type maintenance_id: str
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        :param index: Index of *aws_regions* to resolve the references
+            against. It is built here if it is not given, unless the
+            regions are loaded lazily.
+        :type index: :class:`InventoryIndex`
+
+        :return: A dictionary of Operators keyed by operator ID.
+        :rtype: Dict[str, :class:`Operator`]
+
+        :raises UnresolvedReferenceError: With the references of all
+            operators which cannot be resolved.
         """
 
-        operator_yaml = yaml.safe_load(
-            data_path.joinpath(maintenance_id,
-                               "operator.yaml").read_text())
+        operator_yaml = _load_yaml_file(
+            data_path.joinpath(maintenance_id, "operator.yaml"))
+        if index is None and not isinstance(aws_regions, LazyAWSRegions):
+            index = InventoryIndex(aws_regions)
+
+        operators: Dict[str, Operator] = dict()
+        resolutions: List[Tuple[OperatorDataLoader, List[Tuple[str, Any]]]] = list()
+        unresolved: List[Tuple[str, str]] = list()
+        for operator_id, regions_yaml in operator_yaml.items():
+            operator = Operator(id=operator_id)
+            operators[operator_id] = operator
+            resolved = operator.data_loader._resolve(regions_yaml=regions_yaml,
+                                                     aws_regions=aws_regions,
+                                                     index=index,
+                                                     unresolved=unresolved)
+            resolutions.append((operator.data_loader, resolved))
+        if unresolved:
+            raise UnresolvedReferenceError(unresolved)
 
-        for region_name, region_yaml in operator_yaml[self._operator.id].items():
-            region = aws_regions[region_name]
+        for data_loader, resolved in resolutions:
+            data_loader._add_resources(resolved)
+
+        return operators
+
+    def load_from_yaml(self,
+                       regions_yaml: dict,
+                       aws_regions: Mapping[str, AWSRegion],
+                       index: InventoryIndex = None) -> None:
+        """
+        Load the operator from its parsed section of operator.yaml.
+
+        :param regions_yaml: Parsed regions of this operator.
+        :type regions_yaml: dict
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        :param index: Index of *aws_regions* to resolve the references
+            against. The regions are walked if it is not given.
+        :type index: :class:`InventoryIndex`
+
+        :raises UnresolvedReferenceError: If any referenced resource does
+            not exist. Nothing is added to the operator in that case.
+        """
+
+        unresolved: List[Tuple[str, str]] = list()
+        resolved = self._resolve(regions_yaml=regions_yaml,
+                                 aws_regions=aws_regions,
+                                 index=index,
+                                 unresolved=unresolved)
+        if unresolved:
+            raise UnresolvedReferenceError(unresolved)
+
+        self._add_resources(resolved)
+
+    def _resolve(self,
+                 regions_yaml: dict,
+                 aws_regions: Mapping[str, AWSRegion],
+                 index: Optional[InventoryIndex],
+                 unresolved: List[Tuple[str, str]]) -> List[Tuple[str, Any]]:
+        """
+        Resolve all references of this operator in one pass.
+
+        :param regions_yaml: Parsed regions of this operator.
+        :type regions_yaml: dict
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        :param index: Index of *aws_regions* or None to walk the regions.
+        :type index: :class:`InventoryIndex`
+        :param unresolved: The YAML path and resource path of references
+            which cannot be resolved are appended to it.
+        :type unresolved: List[Tuple[str, str]]
+
+        :return: The kind of every resolved resource and the resource.
+        :rtype: List[Tuple[str, Any]]
+        """
+
+        resolved: List[Tuple[str, Any]] = list()
+        for reference in self._references(regions_yaml=regions_yaml):
+            if index is not None:
+                resource = index.get(reference.path)
+            else:
+                resource = self._lookup(aws_regions=aws_regions,
+                                        reference=reference)
+            if resource is None:
+                unresolved.append((reference.yaml_path, reference.path))
+            else:
+                resolved.append((reference.kind, resource))
+
+        return resolved
+
+    def _references(self, regions_yaml: dict) -> Iterator[_Reference]:
+        """
+        Iterate the references to resources in the parsed regions of this
+        operator.
+
+        :param regions_yaml: Parsed regions of this operator.
+        :type regions_yaml: dict
+
+        :return: The references in the order of operator.yaml.
+        :rtype: Iterator[:class:`_Reference`]
+        """
+
+        for region_name, region_yaml in regions_yaml.items():
+            region_path = f"{self._operator.id}.{region_name}"
 
             # Extract databases detail
             if "databases" in region_yaml:
-                for database in region_yaml["databases"]:
-                    self._operator.add_rds_databases(
-                        region.rds_database(id=database["id"]))
+                for i, database in enumerate(region_yaml["databases"]):
+                    yield _Reference(yaml_path=f"{region_path}.databases[{i}]",
+                                     kind=KIND_RDS_DATABASE,
+                                     region=region_name,
+                                     name=database.get("id"))
 
             # Extract ecs servcies detail
             if "ecs" in region_yaml and "clusters" in region_yaml["ecs"]:
                 for cluster_name, cluster_yaml in region_yaml["ecs"]["clusters"].items():
-                    if "services" in cluster_yaml:
-                        for service in cluster_yaml["services"]:
-                            self._operator.add_ecs_service(
-                                service=region.ecs_cluster(name=cluster_name).service(name=service["name"]))
+                    cluster_path = f"{region_path}.ecs.clusters.{cluster_name}"
+                    for i, service in enumerate(cluster_yaml.get("services", [])):
+                        yield _Reference(yaml_path=f"{cluster_path}.services[{i}]",
+                                         kind=KIND_ECS_SERVICE,
+                                         region=region_name,
+                                         cluster=cluster_name,
+                                         name=service.get("name"))
 
             # Extract eks resources detail
             if "eks" in region_yaml and "clusters" in region_yaml["eks"]:
                 for cluster_name, cluster_yaml in region_yaml["eks"]["clusters"].items():
-                    if "namespaces" in cluster_yaml:
-                        for namespace_name, namespace_yaml in cluster_yaml["namespaces"].items():
-                            if "statefulsets" in namespace_yaml:
-                                for statefulset in namespace_yaml["statefulsets"]:
-                                    self._operator.add_eks_statefulset(
-                                        statefulset=region.eks_cluster(name=cluster_name).namespace(name=namespace_name).statefulset(name=statefulset["name"]))
-                            if "deployments" in namespace_yaml:
-                                for deployment in namespace_yaml["deployments"]:
-                                    self._operator.add_eks_deployment(
-                                        deployment=region.eks_cluster(name=cluster_name).namespace(name=namespace_name).deployment(name=deployment["name"]))
+                    for namespace_name, namespace_yaml in cluster_yaml.get("namespaces", {}).items():
+                        namespace_path = f"{region_path}.eks.clusters.{cluster_name}" + \
+                            f".namespaces.{namespace_name}"
+                        for key, kind in (("statefulsets", KIND_STATEFULSET),
+                                          ("deployments", KIND_DEPLOYMENT)):
+                            for i, workload in enumerate(namespace_yaml.get(key, [])):
+                                yield _Reference(yaml_path=f"{namespace_path}.{key}[{i}]",
+                                                 kind=kind,
+                                                 region=region_name,
+                                                 cluster=cluster_name,
+                                                 namespace=namespace_name,
+                                                 name=workload.get("name"))
+
+    @staticmethod
+    def _lookup(aws_regions: Mapping[str, AWSRegion],
+                reference: _Reference) -> Any:
+        """
+        Look up a referenced resource by walking the regions.
+
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        :param reference: The reference.
+        :type reference: :class:`_Reference`
+
+        :return: The resource or None if it does not exist.
+        :rtype: Any
+        """
+
+        region = aws_regions.get(reference.region)
+        if region is None:
+            return None
+        if reference.kind == KIND_RDS_DATABASE:
+            return region.rds_databases.get(reference.name)
+        if reference.kind == KIND_ECS_SERVICE:
+            cluster = region.ecs_clusters.get(reference.cluster)
+            return cluster.services.get(reference.name) if cluster else None
+
+        cluster = region.eks_clusters.get(reference.cluster)
+        namespace = cluster.namespaces.get(reference.namespace) if cluster else None
+        if namespace is None:
+            return None
+        if reference.kind == KIND_STATEFULSET:
+            return namespace.statefulsets.get(reference.name)
+        return namespace.deployments.get(reference.name)
+
+    def _add_resources(self, resolved: List[Tuple[str, Any]]) -> None:
+        """
+        Add the resolved resources to the operator.
+
+        :param resolved: The kind of every resolved resource and the
+            resource.
+        :type resolved: List[Tuple[str, Any]]
+        """
+
+        add_resource = {KIND_RDS_DATABASE: self._operator.add_rds_databases,
+                        KIND_ECS_SERVICE: self._operator.add_ecs_service,
+                        KIND_STATEFULSET: self._operator.add_eks_statefulset,
+                        KIND_DEPLOYMENT: self._operator.add_eks_deployment}
+        for kind, resource in resolved:
+            add_resource[kind](resource)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+from ..aws import (AWSRegion, ECSCluster, ECSService, ECSServicePatch,
+                   RDSDatabase, RDSDatabasePatch)
+from ..kubernetes import (AWSClusterRef, Cluster, Deployment, DeploymentPatch,
+                          Namespace, StatefulSet, StatefulSetPatch)
+from .inventory import (KIND_DEPLOYMENT, KIND_ECS_CLUSTER, KIND_ECS_SERVICE,
+                        KIND_EKS_CLUSTER, KIND_NAMESPACE, KIND_RDS_DATABASE,
+                        KIND_STATEFULSET)
+
+__all__ = ["SCHEMAS", "TABLE_REGION", "FORMAT_ARROW", "FORMAT_PARQUET",
+           "to_tables", "from_tables", "write_inventory", "read_inventory"]
+
+# Regions have their own table so that regions without any resource
+# survive a round trip
+TABLE_REGION = "region"
+
+FORMAT_ARROW = "arrow"
+FORMAT_PARQUET = "parquet"
+
+# Properties can be of any type that YAML supports, they are stored as a
+# JSON object per resource
+_properties_field = pa.field("properties", pa.string())
+
+_workload_fields = [pa.field("region", pa.string(), nullable=False),
+                    pa.field("cluster", pa.string(), nullable=False),
+                    pa.field("namespace", pa.string(), nullable=False),
+                    pa.field("name", pa.string(), nullable=False),
+                    pa.field("replicas", pa.int64()),
+                    pa.field("patched", pa.bool_(), nullable=False),
+                    pa.field("patch_replicas", pa.int64()),
+                    _properties_field]
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    TABLE_REGION: pa.schema([
+        pa.field("name", pa.string(), nullable=False)]),
+    KIND_RDS_DATABASE: pa.schema([
+        pa.field("region", pa.string(), nullable=False),
+        pa.field("id", pa.string(), nullable=False),
+        pa.field("type", pa.string(), nullable=False),
+        pa.field("host", pa.string()),
+        pa.field("port", pa.int64()),
+        pa.field("engine_type", pa.string(), nullable=False),
+        pa.field("engine_version", pa.string()),
+        pa.field("class_type", pa.string()),
+        pa.field("dbname", pa.string()),
+        pa.field("patched", pa.bool_(), nullable=False),
+        pa.field("patch_engine_version", pa.string()),
+        pa.field("patch_class_type", pa.string())]),
+    KIND_ECS_CLUSTER: pa.schema([
+        pa.field("region", pa.string(), nullable=False),
+        pa.field("name", pa.string(), nullable=False)]),
+    KIND_ECS_SERVICE: pa.schema([
+        pa.field("region", pa.string(), nullable=False),
+        pa.field("cluster", pa.string(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("desired_count", pa.int64()),
+        pa.field("patched", pa.bool_(), nullable=False),
+        pa.field("patch_desired_count", pa.int64()),
+        _properties_field]),
+    KIND_EKS_CLUSTER: pa.schema([
+        pa.field("region", pa.string(), nullable=False),
+        pa.field("name", pa.string(), nullable=False)]),
+    KIND_NAMESPACE: pa.schema([
+        pa.field("region", pa.string(), nullable=False),
+        pa.field("cluster", pa.string(), nullable=False),
+        pa.field("name", pa.string(), nullable=False)]),
+    KIND_STATEFULSET: pa.schema(_workload_fields),
+    KIND_DEPLOYMENT: pa.schema(_workload_fields),
+}
+
+
+def _dump_properties(properties: Mapping[str, Any]) -> Optional[str]:
+    return json.dumps(dict(properties)) if properties else None
+
+
+def _load_properties(resource: Any, properties: Optional[str]) -> None:
+    if properties:
+        for name, value in json.loads(properties).items():
+            resource.add_property(name=name, value=value)
+
+
+def to_tables(aws_regions: Mapping[str, AWSRegion]) -> Dict[str, pa.Table]:
+    """
+    Convert the regions into columnar tables, one table per kind of
+    resource. A resource refers to its parents by name in the region,
+    cluster and namespace columns.
+
+    :param aws_regions: Data of all regions.
+    :type aws_regions: Mapping[str, :class:`AWSRegion`]
+
+    :return: Tables keyed by TABLE_REGION and the kinds of resources.
+    :rtype: Dict[str, :class:`pyarrow.Table`]
+    """
+
+    columns: Dict[str, Dict[str, List[Any]]] = {
+        table_name: {name: list() for name in schema.names}
+        for table_name, schema in SCHEMAS.items()}
+
+    def _append(table_name: str, **row: Any) -> None:
+        for name, value in row.items():
+            columns[table_name][name].append(value)
+
+    for region_name, region in aws_regions.items():
+        _append(TABLE_REGION, name=region_name)
+
+        for db in region.rds_databases.values():
+            _append(KIND_RDS_DATABASE,
+                    region=region_name,
+                    id=db.id,
+                    type=db.type,
+                    host=db.host,
+                    port=db.port,
+                    engine_type=db.engine_type,
+                    engine_version=db.engine_version,
+                    class_type=db.class_type,
+                    dbname=db.dbname,
+                    patched=db.patch is not None,
+                    patch_engine_version=db.patch.engine_version if db.patch else None,
+                    patch_class_type=db.patch.class_type if db.patch else None)
+
+        for cluster in region.ecs_clusters.values():
+            _append(KIND_ECS_CLUSTER, region=region_name, name=cluster.name)
+            for service in cluster.services.values():
+                _append(KIND_ECS_SERVICE,
+                        region=region_name,
+                        cluster=cluster.name,
+                        name=service.name,
+                        desired_count=service.desired_count,
+                        patched=service.patch is not None,
+                        patch_desired_count=service.patch.desired_count
+                        if service.patch else None,
+                        properties=_dump_properties(service.properties))
+
+        for cluster in region.eks_clusters.values():
+            _append(KIND_EKS_CLUSTER, region=region_name, name=cluster.name)
+            for namespace in cluster.namespaces.values():
+                _append(KIND_NAMESPACE,
+                        region=region_name,
+                        cluster=cluster.name,
+                        name=namespace.name)
+                for kind, workloads in ((KIND_STATEFULSET, namespace.statefulsets),
+                                        (KIND_DEPLOYMENT, namespace.deployments)):
+                    for workload in workloads.values():
+                        _append(kind,
+                                region=region_name,
+                                cluster=cluster.name,
+                                namespace=namespace.name,
+                                name=workload.name,
+                                replicas=workload.replicas,
+                                patched=workload.patch is not None,
+                                patch_replicas=workload.patch.replicas
+                                if workload.patch else None,
+                                properties=_dump_properties(workload.properties))
+
+    return {table_name: pa.table(columns[table_name], schema=schema)
+            for table_name, schema in SCHEMAS.items()}
+
+
+def from_tables(tables: Mapping[str, pa.Table]) -> Dict[str, AWSRegion]:
+    """
+    Rebuild the regions from the tables created by :func:`to_tables`.
+
+    :param tables: Tables keyed by TABLE_REGION and the kinds of
+        resources. A missing table is treated as an empty one.
+    :type tables: Mapping[str, :class:`pyarrow.Table`]
+
+    :return: Data of all regions.
+    :rtype: Dict[str, :class:`AWSRegion`]
+    """
+
+    def _rows(table_name: str) -> List[Dict[str, Any]]:
+        table = tables.get(table_name)
+        return table.to_pylist() if table is not None else []
+
+    aws_regions: Dict[str, AWSRegion] = dict()
+    for row in _rows(TABLE_REGION):
+        aws_regions[row["name"]] = AWSRegion(name=row["name"])
+
+    for row in _rows(KIND_RDS_DATABASE):
+        RDSDatabase(id=row["id"],
+                    region=aws_regions[row["region"]],
+                    type=row["type"],
+                    host=row["host"],
+                    port=row["port"],
+                    engine_type=row["engine_type"],
+                    engine_version=row["engine_version"],
+                    class_type=row["class_type"],
+                    dbname=row["dbname"],
+                    patch=RDSDatabasePatch(engine_version=row["patch_engine_version"],
+                                           class_type=row["patch_class_type"])
+                    if row["patched"] else None)
+
+    for row in _rows(KIND_ECS_CLUSTER):
+        ECSCluster(name=row["name"], region=aws_regions[row["region"]])
+    for row in _rows(KIND_ECS_SERVICE):
+        service = ECSService(
+            name=row["name"],
+            cluster=aws_regions[row["region"]].ecs_cluster(row["cluster"]),
+            desired_count=row["desired_count"],
+            patch=ECSServicePatch(desired_count=row["patch_desired_count"])
+            if row["patched"] else None)
+        _load_properties(service, row["properties"])
+
+    for row in _rows(KIND_EKS_CLUSTER):
+        region = aws_regions[row["region"]]
+        Cluster(name=row["name"], platform_ref=AWSClusterRef(region=region))
+    for row in _rows(KIND_NAMESPACE):
+        Namespace(name=row["name"],
+                  cluster=aws_regions[row["region"]].eks_cluster(row["cluster"]))
+    for kind, workload_type, patch_type in (
+            (KIND_STATEFULSET, StatefulSet, StatefulSetPatch),
+            (KIND_DEPLOYMENT, Deployment, DeploymentPatch)):
+        for row in _rows(kind):
+            workload = workload_type(
+                name=row["name"],
+                namespace=aws_regions[row["region"]].eks_cluster(
+                    row["cluster"]).namespace(row["namespace"]),
+                replicas=row["replicas"],
+                patch=patch_type(replicas=row["patch_replicas"])
+                if row["patched"] else None)
+            _load_properties(workload, row["properties"])
+
+    return aws_regions
+
+
+def write_inventory(aws_regions: Mapping[str, AWSRegion],
+                    path: Path,
+                    format: str = FORMAT_PARQUET) -> List[Path]:
+    """
+    Write the regions into a directory, one file per table, e.g.
+    deployment.parquet.
+
+    :param aws_regions: Data of all regions.
+    :type aws_regions: Mapping[str, :class:`AWSRegion`]
+    :param path: The directory to write to. It is created if it does not
+        exist.
+    :type path: :class:`Path`
+    :param format: File format. Choices: 'parquet' or 'arrow' (Arrow IPC).
+    :type format: str
+
+    :return: Paths of the files written.
+    :rtype: List[:class:`Path`]
+    """
+
+    assert format in [FORMAT_PARQUET,
+                      FORMAT_ARROW], "format must be parquet or arrow"
+
+    path.mkdir(parents=True, exist_ok=True)
+    filepaths: List[Path] = list()
+    for table_name, table in to_tables(aws_regions).items():
+        filepath = path.joinpath(f"{table_name}.{format}")
+        if format == FORMAT_PARQUET:
+            pyarrow.parquet.write_table(table, filepath)
+        else:
+            with pa.OSFile(str(filepath), "wb") as sink, \
+                    pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        filepaths.append(filepath)
+
+    return filepaths
+
+
+def read_inventory(path: Path, format: str = FORMAT_PARQUET) -> Dict[str, AWSRegion]:
+    """
+    Read the regions from a directory written by :func:`write_inventory`.
+
+    :param path: The directory to read from.
+    :type path: :class:`Path`
+    :param format: File format. Choices: 'parquet' or 'arrow' (Arrow IPC).
+    :type format: str
+
+    :return: Data of all regions.
+    :rtype: Dict[str, :class:`AWSRegion`]
+    """
+
+    assert format in [FORMAT_PARQUET,
+                      FORMAT_ARROW], "format must be parquet or arrow"
+
+    tables: Dict[str, pa.Table] = dict()
+    for table_name in SCHEMAS:
+        filepath = path.joinpath(f"{table_name}.{format}")
+        if not filepath.exists():
+            continue
+        if format == FORMAT_PARQUET:
+            tables[table_name] = pyarrow.parquet.read_table(filepath)
+        else:
+            with pa.memory_map(str(filepath), "r") as source:
+                tables[table_name] = pyarrow.ipc.open_file(source).read_all()
+
+    return from_tables(tables)
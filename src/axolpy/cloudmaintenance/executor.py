@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import (Callable, Dict, Hashable, Iterable, List, Mapping,
+                    Optional, Tuple, Union)
+
+from .pacing import PacingScheduler
+from .steps import CloudMaintenanceStep, StepCommand
+
+__all__ = ["CommandResult", "CommandRunner", "SubprocessCommandRunner",
+           "FakeCommandRunner", "ExecutionSummary", "StepExecutor"]
+
+
+class CommandResult(object):
+    """
+    The result of running a step command.
+    """
+
+    __slots__ = ("_command", "_returncode", "_stdout", "_stderr", "_elapsed")
+
+    def __init__(self,
+                 command: StepCommand,
+                 returncode: Optional[int],
+                 stdout: str = "",
+                 stderr: str = "",
+                 elapsed: float = 0.0) -> None:
+        """
+        Initialize a command result.
+
+        :param command: The command.
+        :type command: :class:`StepCommand`
+        :param returncode: Exit code, or None if the command is skipped
+            because an earlier command of the same resource failed.
+        :type returncode: int
+        :param stdout: Captured standard output.
+        :type stdout: str
+        :param stderr: Captured standard error.
+        :type stderr: str
+        :param elapsed: Seconds taken to run the command.
+        :type elapsed: float
+        """
+
+        self._command: StepCommand = command
+        self._returncode: Optional[int] = returncode
+        self._stdout: str = stdout
+        self._stderr: str = stderr
+        self._elapsed: float = elapsed
+
+    @property
+    def command(self) -> StepCommand:
+        return self._command
+
+    @property
+    def returncode(self) -> Optional[int]:
+        return self._returncode
+
+    @property
+    def stdout(self) -> str:
+        return self._stdout
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def skipped(self) -> bool:
+        return self._returncode is None
+
+    @property
+    def succeeded(self) -> bool:
+        return self._returncode == 0
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(returncode: {self._returncode}" + \
+            f", command: {self._command.command})"
+
+
+class CommandRunner(ABC):
+    """
+    An abstract class to run the command of a step.
+    """
+
+    @abstractmethod
+    def run(self, command: StepCommand) -> CommandResult:
+        pass
+
+
+class SubprocessCommandRunner(CommandRunner):
+    """
+    Run commands with a shell, as the generated scripts do.
+    """
+
+    def __init__(self, shell: str = "/bin/bash", timeout: Optional[float] = 600.0) -> None:
+        """
+        Initialize a subprocess command runner.
+
+        :param shell: The shell to run the commands with.
+        :type shell: str
+        :param timeout: Seconds a command may take before it is killed, so
+            that a command waiting for input does not hang the run. None
+            waits for ever.
+        :type timeout: float
+        """
+
+        self._shell: str = shell
+        self._timeout: Optional[float] = timeout
+
+    def run(self, command: StepCommand) -> CommandResult:
+        start = time.perf_counter()
+        try:
+            completed = subprocess.run([self._shell, "-c", command.command],
+                                       stdin=subprocess.DEVNULL,
+                                       capture_output=True,
+                                       text=True,
+                                       timeout=self._timeout)
+        except subprocess.TimeoutExpired as e:
+            return CommandResult(command=command,
+                                 returncode=-1,
+                                 stdout=e.stdout if isinstance(e.stdout, str) else "",
+                                 stderr=f"timed out after {self._timeout}s",
+                                 elapsed=time.perf_counter() - start)
+
+        return CommandResult(command=command,
+                             returncode=completed.returncode,
+                             stdout=completed.stdout,
+                             stderr=completed.stderr,
+                             elapsed=time.perf_counter() - start)
+
+
+class FakeCommandRunner(CommandRunner):
+    """
+    Record commands instead of running them, for dry runs and tests.
+    """
+
+    def __init__(self,
+                 responses: Union[Mapping[str, Tuple[int, str, str]],
+                                  Callable[[StepCommand], Tuple[int, str, str]]] = None,
+                 delay: float = 0.0) -> None:
+        """
+        Initialize a fake command runner.
+
+        :param responses: Exit code, standard output and standard error of
+            commands keyed by the command, or a function returning them.
+            Other commands succeed without output.
+        :type responses: Union[Mapping[str, Tuple[int, str, str]], Callable]
+        :param delay: Seconds each command pretends to take.
+        :type delay: float
+        """
+
+        self._responses = responses if responses is not None else dict()
+        self._delay: float = delay
+        self._lock: threading.Lock = threading.Lock()
+        self._commands: List[StepCommand] = list()
+        self._running: int = 0
+        self._max_running: int = 0
+
+    @property
+    def commands(self) -> List[StepCommand]:
+        """
+        The commands in the order they are started.
+        """
+
+        return self._commands
+
+    @property
+    def max_running(self) -> int:
+        """
+        The largest number of commands that have run at the same time.
+        """
+
+        return self._max_running
+
+    def run(self, command: StepCommand) -> CommandResult:
+        with self._lock:
+            self._commands.append(command)
+            self._running += 1
+            self._max_running = max(self._max_running, self._running)
+        try:
+            if self._delay:
+                time.sleep(self._delay)
+            if callable(self._responses):
+                returncode, stdout, stderr = self._responses(command)
+            else:
+                returncode, stdout, stderr = self._responses.get(
+                    command.command, (0, "", ""))
+        finally:
+            with self._lock:
+                self._running -= 1
+
+        return CommandResult(command=command,
+                             returncode=returncode,
+                             stdout=stdout,
+                             stderr=stderr,
+                             elapsed=self._delay)
+
+
+class ExecutionSummary(object):
+    """
+    The results of executing steps.
+    """
+
+    __slots__ = ("_results", "_elapsed")
+
+    def __init__(self, results: List[CommandResult], elapsed: float) -> None:
+        """
+        Initialize an execution summary.
+
+        :param results: Results of the commands in the order of the steps
+            and of the commands in each step.
+        :type results: List[:class:`CommandResult`]
+        :param elapsed: Wall-clock seconds taken.
+        :type elapsed: float
+        """
+
+        self._results: List[CommandResult] = results
+        self._elapsed: float = elapsed
+
+    @property
+    def results(self) -> List[CommandResult]:
+        return self._results
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def failures(self) -> List[CommandResult]:
+        return [r for r in self._results if not r.skipped and not r.succeeded]
+
+    @property
+    def skipped(self) -> List[CommandResult]:
+        return [r for r in self._results if r.skipped]
+
+    @property
+    def succeeded(self) -> bool:
+        return all(r.succeeded for r in self._results)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._results)} commands" + \
+            f", {len(self.failures)} failures, {len(self.skipped)} skipped)"
+
+
+class StepExecutor(object):
+    """
+    Run the commands of cloud maintenance steps concurrently, with a limit
+    on the commands running at the same time in a region and in a
+    cluster. The commands of a resource run one after another, and the
+    steps run one after another. Commands of rate-limited APIs are paced
+    by a shared :class:`PacingScheduler`.
+
+    The commands which change the resources are commented out in the
+    scripts for a review before they are run, so they are only run when
+    asked for with ``execute_commented``. Nothing is run unless
+    ``dry_run`` is turned off.
+    """
+
+    def __init__(self,
+                 runner: Optional[CommandRunner] = None,
+                 max_workers: int = 8,
+                 max_per_region: int = 4,
+                 max_per_cluster: int = 2,
+                 dry_run: bool = True,
+                 stop_on_failure: bool = True,
+                 pacing: Optional[PacingScheduler] = None,
+                 execute_commented: bool = False) -> None:
+        """
+        Initialize a step executor.
+
+        :param runner: The command runner. By default commands are run
+            with bash, or recorded by a :class:`FakeCommandRunner` in a
+            dry run.
+        :type runner: :class:`CommandRunner`
+        :param max_workers: Maximum number of commands running at the same
+            time.
+        :type max_workers: int
+        :param max_per_region: Maximum number of commands running at the
+            same time in a region.
+        :type max_per_region: int
+        :param max_per_cluster: Maximum number of commands running at the
+            same time in an ECS or EKS cluster.
+        :type max_per_cluster: int
+        :param dry_run: Record the commands instead of running them. It is
+            ignored when a runner is given.
+        :type dry_run: bool
+        :param stop_on_failure: Do not run the next steps after a step has
+            a failed command.
+        :type stop_on_failure: bool
+        :param pacing: The scheduler to pace the commands of rate-limited
+            APIs with. Share it between executors working on the same
+            account. None runs the commands without pacing.
+        :type pacing: :class:`PacingScheduler`
+        :param execute_commented: Also run the commands which are commented
+            out in the scripts. They are left out otherwise.
+        :type execute_commented: bool
+        """
+
+        assert max_workers > 0, "max_workers must be positive"
+        assert max_per_region > 0, "max_per_region must be positive"
+        assert max_per_cluster > 0, "max_per_cluster must be positive"
+
+        if runner is None:
+            runner = FakeCommandRunner() if dry_run else SubprocessCommandRunner()
+        self._runner: CommandRunner = runner
+        self._max_workers: int = max_workers
+        self._max_per_region: int = max_per_region
+        self._max_per_cluster: int = max_per_cluster
+        self._stop_on_failure: bool = stop_on_failure
+        self._pacing: Optional[PacingScheduler] = pacing
+        self._execute_commented: bool = execute_commented
+        self._lock: threading.Lock = threading.Lock()
+        self._semaphores: Dict[Hashable, threading.BoundedSemaphore] = dict()
+
+    @property
+    def runner(self) -> CommandRunner:
+        return self._runner
+
+    @property
+    def pacing(self) -> Optional[PacingScheduler]:
+        return self._pacing
+
+    def _semaphore(self, key: Hashable, limit: int) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(limit)
+                self._semaphores[key] = semaphore
+
+        return semaphore
+
+    def _run(self, command: StepCommand) -> CommandResult:
+        # Wait for the rate limit before taking a slot of the region so
+        # that a waiting command does not hold back the others
+        if self._pacing is not None:
+            self._pacing.acquire(api=command.api, region=command.region)
+
+        # Always take the region before the cluster so that no two
+        # commands wait for each other
+        with ExitStack() as stack:
+            if command.region is not None:
+                stack.enter_context(self._semaphore(
+                    ("region", command.region), self._max_per_region))
+            if command.cluster is not None:
+                stack.enter_context(self._semaphore(
+                    ("cluster", command.cluster_kind, command.region, command.cluster),
+                    self._max_per_cluster))
+            return self._runner.run(command)
+
+    def _run_chain(self, commands: List[StepCommand]) -> List[CommandResult]:
+        results = list()
+        for command in commands:
+            if results and not results[-1].succeeded:
+                results.append(CommandResult(command=command, returncode=None))
+            else:
+                results.append(self._run(command))
+
+        return results
+
+    def execute_commands(self, commands: Iterable[StepCommand]) -> List[CommandResult]:
+        """
+        Run commands concurrently. Commented commands are left out unless
+        ``execute_commented`` is set.
+
+        :param commands: The commands.
+        :type commands: Iterable[:class:`StepCommand`]
+
+        :return: The results in the order of the commands which are run.
+        :rtype: List[:class:`CommandResult`]
+        """
+
+        if not self._execute_commented:
+            commands = (command for command in commands if not command.commented)
+
+        # The commands of a resource form a chain that runs in order and
+        # stops at the first failure
+        chains: Dict[Hashable, List[StepCommand]] = dict()
+        order: List[Tuple[Hashable, int]] = list()
+        for i, command in enumerate(commands):
+            key = id(command.resource) if command.resource is not None else ("command", i)
+            chain = chains.setdefault(key, list())
+            order.append((key, len(chain)))
+            chain.append(command)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = {key: executor.submit(self._run_chain, chain)
+                       for key, chain in chains.items()}
+            chain_results = {key: future.result() for key, future in futures.items()}
+
+        return [chain_results[key][position] for key, position in order]
+
+    def execute(self, steps: Iterable[CloudMaintenanceStep]) -> ExecutionSummary:
+        """
+        Run the commands of the eligible steps, one step after another.
+
+        :param steps: The steps.
+        :type steps: Iterable[:class:`CloudMaintenanceStep`]
+
+        :return: The summary.
+        :rtype: :class:`ExecutionSummary`
+        """
+
+        start = time.perf_counter()
+        results: List[CommandResult] = list()
+        for step in steps:
+            if not step.eligible():
+                continue
+            step_results = self.execute_commands(step.commands())
+            results.extend(step_results)
+            if self._stop_on_failure and not all(r.succeeded for r in step_results):
+                break
+
+        return ExecutionSummary(results=results, elapsed=time.perf_counter() - start)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Mapping, Sequence
+
+from ..aws import AWSRegion, ECSCluster, ECSService, RDSDatabase
+from ..kubernetes import AWSClusterRef, Cluster, Deployment, Namespace, StatefulSet
+
+# Kinds of resources in the inventory
+KIND_RDS_DATABASE = "rds_database"
+KIND_ECS_CLUSTER = "ecs_cluster"
+KIND_ECS_SERVICE = "ecs_service"
+KIND_EKS_CLUSTER = "eks_cluster"
+KIND_NAMESPACE = "namespace"
+KIND_STATEFULSET = "statefulset"
+KIND_DEPLOYMENT = "deployment"
+
+_kinds = {RDSDatabase: KIND_RDS_DATABASE,
+          ECSCluster: KIND_ECS_CLUSTER,
+          ECSService: KIND_ECS_SERVICE,
+          Cluster: KIND_EKS_CLUSTER,
+          Namespace: KIND_NAMESPACE,
+          StatefulSet: KIND_STATEFULSET,
+          Deployment: KIND_DEPLOYMENT}
+
+
+def resource_kind(resource: Any) -> str:
+    """
+    Get the kind of a resource, e.g. KIND_DEPLOYMENT.
+
+    :param resource: A cluster, namespace, database or workload.
+    :type resource: Any
+
+    :return: The kind of the resource.
+    :rtype: str
+    """
+
+    try:
+        return _kinds[type(resource)]
+    except KeyError:
+        raise TypeError(
+            f"Unsupported resource type {type(resource).__name__}") from None
+
+
+def resource_path(resource: Any) -> str:
+    """
+    Get the fully qualified path of a resource, e.g.
+    us-east-1/eks/prod/payments/deployment/api.
+
+    :param resource: A region, cluster, namespace, database or workload.
+    :type resource: Any
+
+    :return: The path of the resource.
+    :rtype: str
+    """
+
+    if isinstance(resource, AWSRegion):
+        return resource.name
+    elif isinstance(resource, RDSDatabase):
+        return f"{resource.region.name}/rds/{resource.id}"
+    elif isinstance(resource, ECSCluster):
+        return f"{resource.region.name}/ecs/{resource.name}"
+    elif isinstance(resource, ECSService):
+        return f"{resource_path(resource.cluster)}/service/{resource.name}"
+    elif isinstance(resource, Cluster):
+        if not isinstance(resource.platform_ref, AWSClusterRef):
+            raise ValueError(f"Cluster {resource.name} is not in an AWS region")
+        return f"{resource.platform_ref.region.name}/eks/{resource.name}"
+    elif isinstance(resource, Namespace):
+        return f"{resource_path(resource.cluster)}/{resource.name}"
+    elif isinstance(resource, StatefulSet):
+        return f"{resource_path(resource.namespace)}/statefulset/{resource.name}"
+    elif isinstance(resource, Deployment):
+        return f"{resource_path(resource.namespace)}/deployment/{resource.name}"
+
+    raise TypeError(f"Unsupported resource type {type(resource).__name__}")
+
+
+class InventoryIndex(object):
+    """
+    An index of all resources in a collection of regions, keyed by their
+    fully qualified paths, with secondary indexes by kind, engine type
+    and the restart_after_upgrade property.
+
+    The index is built once and does not follow resources added to the
+    regions afterwards.
+    """
+
+    def __init__(self, aws_regions: Mapping[str, AWSRegion]) -> None:
+        """
+        Build the index.
+
+        :param aws_regions: Data of all regions.
+        :type aws_regions: Mapping[str, :class:`AWSRegion`]
+        """
+
+        self._aws_regions: Mapping[str, AWSRegion] = aws_regions
+        self._resources: Dict[str, Any] = dict()
+        self._by_kind: Dict[str, List[Any]] = {
+            kind: list() for kind in (KIND_RDS_DATABASE,
+                                      KIND_ECS_CLUSTER,
+                                      KIND_ECS_SERVICE,
+                                      KIND_EKS_CLUSTER,
+                                      KIND_NAMESPACE,
+                                      KIND_STATEFULSET,
+                                      KIND_DEPLOYMENT)}
+        self._by_engine_type: Dict[str, List[RDSDatabase]] = dict()
+        self._by_restart_after_upgrade: Dict[bool, List[Any]] = {True: list(),
+                                                                 False: list()}
+
+        for region_name, region in aws_regions.items():
+            for db in region.rds_databases.values():
+                self._add(f"{region_name}/rds/{db.id}", KIND_RDS_DATABASE, db)
+                self._by_engine_type.setdefault(db.engine_type, list()).append(db)
+
+            for cluster in region.ecs_clusters.values():
+                cluster_path = f"{region_name}/ecs/{cluster.name}"
+                self._add(cluster_path, KIND_ECS_CLUSTER, cluster)
+                for service in cluster.services.values():
+                    self._add_workload(f"{cluster_path}/service/{service.name}",
+                                       KIND_ECS_SERVICE,
+                                       service)
+
+            for cluster in region.eks_clusters.values():
+                cluster_path = f"{region_name}/eks/{cluster.name}"
+                self._add(cluster_path, KIND_EKS_CLUSTER, cluster)
+                for namespace in cluster.namespaces.values():
+                    namespace_path = f"{cluster_path}/{namespace.name}"
+                    self._add(namespace_path, KIND_NAMESPACE, namespace)
+                    for statefulset in namespace.statefulsets.values():
+                        self._add_workload(
+                            f"{namespace_path}/statefulset/{statefulset.name}",
+                            KIND_STATEFULSET,
+                            statefulset)
+                    for deployment in namespace.deployments.values():
+                        self._add_workload(
+                            f"{namespace_path}/deployment/{deployment.name}",
+                            KIND_DEPLOYMENT,
+                            deployment)
+
+    def _add(self, path: str, kind: str, resource: Any) -> None:
+        self._resources[path] = resource
+        self._by_kind[kind].append(resource)
+
+    def _add_workload(self, path: str, kind: str, workload: Any) -> None:
+        self._add(path, kind, workload)
+        self._by_restart_after_upgrade[
+            bool(workload.property("restart_after_upgrade"))].append(workload)
+
+    @property
+    def aws_regions(self) -> Mapping[str, AWSRegion]:
+        return self._aws_regions
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """
+        Get a resource by its path.
+
+        :param path: Fully qualified path of the resource.
+        :type path: str
+        :param default: Value returned if the path does not exist.
+        :type default: Any
+
+        :return: The resource or *default*.
+        :rtype: Any
+        """
+
+        return self._resources.get(path, default)
+
+    def by_kind(self, kind: str) -> Sequence[Any]:
+        """
+        Get all resources of a kind, e.g. KIND_DEPLOYMENT.
+
+        :param kind: Kind of resource.
+        :type kind: str
+
+        :return: The resources in the order they are in the regions.
+        :rtype: Sequence[Any]
+        """
+
+        return self._by_kind.get(kind, ())
+
+    def by_engine_type(self, engine_type: str) -> Sequence[RDSDatabase]:
+        """
+        Get all databases of an engine type.
+
+        :param engine_type: Engine type, 'postgresql' or 'mysql'.
+        :type engine_type: str
+
+        :return: The databases.
+        :rtype: Sequence[:class:`RDSDatabase`]
+        """
+
+        return self._by_engine_type.get(engine_type, ())
+
+    def by_restart_after_upgrade(self, restart_after_upgrade: bool = True) -> Sequence[Any]:
+        """
+        Get all ECS services, StatefulSets and Deployments by whether they
+        have the restart_after_upgrade property set.
+
+        :param restart_after_upgrade: Value of the property.
+        :type restart_after_upgrade: bool
+
+        :return: The workloads.
+        :rtype: Sequence[Any]
+        """
+
+        return self._by_restart_after_upgrade[bool(restart_after_upgrade)]
+
+    def paths(self) -> Iterator[str]:
+        return iter(self._resources)
+
+    def resources(self) -> Iterator[Any]:
+        return iter(self._resources.values())
+
+    def __getitem__(self, path: str) -> Any:
+        return self._resources[path]
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._resources
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._aws_regions)} regions" + \
+            f", {len(self._resources)} resources)"
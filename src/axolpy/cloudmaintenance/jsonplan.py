@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+from .steps import CloudMaintenanceStep
+
+try:
+    # orjson is an optional dependency and is several times faster than
+    # the json module for plans of thousands of commands
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+__all__ = ["plan_records", "dumps_record", "dumps_plan", "write_plan"]
+
+
+def plan_records(steps: Iterable[CloudMaintenanceStep]) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate the command records of the eligible steps lazily.
+
+    :param steps: The steps.
+    :type steps: Iterable[:class:`CloudMaintenanceStep`]
+
+    :return: The records, see :meth:`CloudMaintenanceStep.records`.
+    :rtype: Iterator[Dict[str, Any]]
+    """
+
+    for step in steps:
+        if step.eligible():
+            yield from step.records()
+
+
+def dumps_record(record: Any, indent: bool = False) -> bytes:
+    """
+    Serialise a record, or a list of them, to JSON.
+
+    :param record: The record.
+    :type record: Any
+    :param indent: Indent by 2 spaces instead of the compact form.
+    :type indent: bool
+
+    :return: UTF-8 encoded JSON.
+    :rtype: bytes
+    """
+
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    return json.dumps(record,
+                      ensure_ascii=False,
+                      indent=2 if indent else None,
+                      separators=None if indent else (",", ":")).encode("utf-8")
+
+
+def dumps_plan(steps: Iterable[CloudMaintenanceStep], indent: bool = False) -> bytes:
+    """
+    Serialise the command records of the eligible steps to a JSON array.
+
+    :param steps: The steps.
+    :type steps: Iterable[:class:`CloudMaintenanceStep`]
+    :param indent: Indent by 2 spaces instead of the compact form.
+    :type indent: bool
+
+    :return: UTF-8 encoded JSON.
+    :rtype: bytes
+    """
+
+    return dumps_record(list(plan_records(steps)), indent=indent)
+
+
+def write_plan(steps: Iterable[CloudMaintenanceStep],
+               filepath: Path,
+               json_lines: bool = False) -> int:
+    """
+    Write the command records of the eligible steps into a file
+    atomically.
+
+    :param steps: The steps.
+    :type steps: Iterable[:class:`CloudMaintenanceStep`]
+    :param filepath: Path of the file.
+    :type filepath: Path
+    :param json_lines: Write a record per line (JSON Lines) as it is
+        produced, so that a plan of any size is written with constant
+        memory. Otherwise write a JSON array.
+    :type json_lines: bool
+
+    :return: Number of records written.
+    :rtype: int
+    """
+
+    filepath.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=filepath.parent,
+                                     prefix=f".{filepath.name}.",
+                                     suffix=".tmp")
+    try:
+        with open(fd, "wb") as f:
+            if json_lines:
+                count = 0
+                for record in plan_records(steps):
+                    f.write(dumps_record(record) + b"\n")
+                    count += 1
+            else:
+                records = list(plan_records(steps))
+                count = len(records)
+                f.write(dumps_record(records) + b"\n")
+        os.replace(temp_path, filepath)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+    return count
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set
+
+__all__ = ["StepManifest", "content_digest"]
+
+
+def content_digest(content: str) -> str:
+    """
+    Calculate the digest of the content of a script.
+
+    :param content: Content of the script.
+    :type content: str
+
+    :return: SHA-256 digest in hex.
+    :rtype: str
+    """
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class StepManifest(object):
+    """
+    A manifest in a distribution directory which records the digest of
+    every script written into it, so that a script whose content has not
+    changed is not written again.
+
+    Only the scripts recorded or kept since the manifest is loaded are
+    saved, so the scripts which the current render no longer produces
+    are dropped from it, see :attr:`orphaned`.
+    """
+
+    FILENAME = ".manifest.json"
+    VERSION = 1
+
+    __slots__ = ("_dist_path", "_files", "_current")
+
+    def __init__(self, dist_path: Path) -> None:
+        """
+        Initialize an empty manifest. Use :meth:`load` to read the
+        manifest of a distribution directory.
+
+        :param dist_path: The path to the distribution directory.
+        :type dist_path: Path
+        """
+
+        self._dist_path: Path = dist_path
+        # Digest, size and modification time of every script keyed by
+        # its filename
+        self._files: Dict[str, Dict[str, object]] = dict()
+        # Filenames of the scripts recorded or kept since it is loaded
+        self._current: Set[str] = set()
+
+    @classmethod
+    def load(cls, dist_path: Path) -> StepManifest:
+        """
+        Read the manifest of a distribution directory. A missing or
+        unreadable manifest is treated as an empty one.
+
+        :param dist_path: The path to the distribution directory.
+        :type dist_path: Path
+
+        :return: The manifest.
+        :rtype: :class:`StepManifest`
+        """
+
+        manifest = cls(dist_path=dist_path)
+        try:
+            content = json.loads(dist_path.joinpath(cls.FILENAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return manifest
+        if isinstance(content, dict) and content.get("version") == cls.VERSION:
+            manifest._files = content.get("files", {})
+
+        return manifest
+
+    @property
+    def dist_path(self) -> Path:
+        return self._dist_path
+
+    @property
+    def filepath(self) -> Path:
+        return self._dist_path.joinpath(self.FILENAME)
+
+    @property
+    def orphaned(self) -> List[str]:
+        """
+        Filenames of the scripts in the manifest which are neither recorded
+        nor kept since it is loaded, e.g. the scripts of a step removed
+        from the plan. They are dropped when the manifest is saved, but
+        the files are left in the distribution directory.
+        """
+
+        return sorted(filename for filename in self._files
+                      if filename not in self._current)
+
+    def digest(self, filename: str) -> Optional[str]:
+        """
+        Get the recorded digest of a script.
+
+        :param filename: Filename of the script.
+        :type filename: str
+
+        :return: The digest or None if the script is not recorded.
+        :rtype: str
+        """
+
+        entry = self._files.get(filename)
+        return entry["sha256"] if entry else None
+
+    def unchanged(self, filename: str, digest: str) -> bool:
+        """
+        Check if a script on disk already has the given content. The
+        script must still have the size and modification time recorded
+        with its digest, so a script edited or removed by hand is written
+        again.
+
+        :param filename: Filename of the script.
+        :type filename: str
+        :param digest: Digest of the new content.
+        :type digest: str
+
+        :return: True if the script does not have to be written.
+        :rtype: bool
+        """
+
+        entry = self._files.get(filename)
+        if not entry or entry["sha256"] != digest:
+            return False
+        try:
+            stat = self._dist_path.joinpath(filename).stat()
+        except OSError:
+            return False
+
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def record(self, filename: str, digest: str) -> None:
+        """
+        Record the digest of a script which has just been written.
+
+        :param filename: Filename of the script.
+        :type filename: str
+        :param digest: Digest of the content.
+        :type digest: str
+        """
+
+        stat = self._dist_path.joinpath(filename).stat()
+        self._files[filename] = {"sha256": digest,
+                                 "size": stat.st_size,
+                                 "mtime_ns": stat.st_mtime_ns}
+        self._current.add(filename)
+
+    def keep(self, filename: str) -> None:
+        """
+        Keep the recorded digest of a script which is not written again
+        because it is unchanged.
+
+        :param filename: Filename of the script.
+        :type filename: str
+        """
+
+        if filename in self._files:
+            self._current.add(filename)
+
+    def save(self) -> None:
+        """
+        Write the manifest into the distribution directory atomically,
+        without the scripts which are :attr:`orphaned`.
+        """
+
+        self._files = {filename: entry for filename, entry in self._files.items()
+                       if filename in self._current}
+
+        self._dist_path.mkdir(mode=0o755, parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self._dist_path,
+                                         prefix=f"{self.FILENAME}.",
+                                         suffix=".tmp")
+        try:
+            with open(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "files": self._files},
+                          f, indent=2, sort_keys=True)
+                f.write("\n")
+            os.replace(temp_path, self.filepath)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, filename: object) -> bool:
+        return filename in self._files
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({self._dist_path}, {len(self._files)} files)"
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import (Any, Callable, Dict, Hashable, Iterable, Iterator, List,
+                    Mapping, Optional, Tuple, Union)
+
+__all__ = ["API_ECS_UPDATE_SERVICE", "API_RDS_MODIFY_DB_INSTANCE",
+           "DEFAULT_RATE_LIMITS", "RateLimit", "TokenBucket",
+           "ScriptSchedule", "PacingScheduler", "format_delay"]
+
+API_ECS_UPDATE_SERVICE = "ecs:UpdateService"
+API_RDS_MODIFY_DB_INSTANCE = "rds:ModifyDBInstance"
+
+
+class RateLimit(object):
+    """
+    The rate at which the calls of an API may be made, as a token bucket
+    which holds up to *burst* tokens and is refilled with *rate* tokens a
+    second.
+    """
+
+    __slots__ = ("_rate", "_burst")
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """
+        Initialize a rate limit.
+
+        :param rate: Calls a second in the long run.
+        :type rate: float
+        :param burst: Calls which can be made at once.
+        :type burst: int
+        """
+
+        assert rate > 0, "rate must be positive"
+        assert burst >= 1, "burst must be at least 1"
+
+        self._rate: float = rate
+        self._burst: int = burst
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        return self._burst
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, RateLimit) and \
+            (self._rate, self._burst) == (other._rate, other._burst)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(rate: {self._rate}, burst: {self._burst})"
+
+
+# Rate limits of the API families in every region unless they are
+# configured otherwise
+DEFAULT_RATE_LIMITS: Dict[str, RateLimit] = {
+    API_ECS_UPDATE_SERVICE: RateLimit(rate=1.0, burst=10),
+    API_RDS_MODIFY_DB_INSTANCE: RateLimit(rate=0.5, burst=5)}
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket. A call reserves a token and waits until
+    the token is refilled, so callers are served in the order they ask.
+    """
+
+    __slots__ = ("_limit", "_tokens", "_updated", "_clock", "_sleep", "_lock")
+
+    def __init__(self,
+                 limit: RateLimit,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize a full token bucket.
+
+        :param limit: The rate limit.
+        :type limit: :class:`RateLimit`
+        :param clock: Function returning the current time in seconds.
+        :type clock: Callable[[], float]
+        :param sleep: Function to wait for a number of seconds.
+        :type sleep: Callable[[float], None]
+        """
+
+        self._limit: RateLimit = limit
+        self._tokens: float = float(limit.burst)
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+        self._updated: float = clock()
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def limit(self) -> RateLimit:
+        return self._limit
+
+    def reserve(self) -> float:
+        """
+        Take a token, which may not have been refilled yet.
+
+        :return: Seconds to wait until the token is refilled.
+        :rtype: float
+        """
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(float(self._limit.burst),
+                               self._tokens + (now - self._updated) * self._limit.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return -self._tokens / self._limit.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """
+        Take a token and wait until it is refilled.
+
+        :return: Seconds waited.
+        :rtype: float
+        """
+
+        delay = self.reserve()
+        if delay > 0:
+            self._sleep(delay)
+
+        return delay
+
+
+class _VirtualClock(object):
+    """
+    A clock which only moves when it sleeps, to work out the waits of
+    commands which run one after another in a script.
+    """
+
+    __slots__ = ("_now",)
+
+    def __init__(self) -> None:
+        self._now: float = 0.0
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self._now += seconds
+
+
+class ScriptSchedule(object):
+    """
+    Work out the sleeps of scripts which are run side by side, all
+    starting at once, so that their calls of a rate-limited API in a
+    region together keep to its rate limit. The commands of a script run
+    one after another, and each call is given the earliest time the rate
+    limit allows after the calls scheduled before it, of any script.
+
+    Scripts are scheduled in groups, e.g. by step, and only the scripts
+    of a group are taken to run at the same time. The sleeps of a script
+    are kept by its key, e.g. the path of the script, so that rendering
+    the script again gives the same sleeps.
+    """
+
+    __slots__ = ("_pacing", "_lock", "_next", "_scripts")
+
+    def __init__(self, pacing: PacingScheduler) -> None:
+        """
+        Initialize an empty schedule.
+
+        :param pacing: The scheduler with the rate limits.
+        :type pacing: :class:`PacingScheduler`
+        """
+
+        self._pacing: PacingScheduler = pacing
+        self._lock: threading.Lock = threading.Lock()
+        # The time a call of an API family in a region would be made in a
+        # group if the calls so far were evenly spaced, as in the generic
+        # cell rate algorithm
+        self._next: Dict[Tuple[Hashable, str, Optional[str]], float] = dict()
+        # The API family, region and sleep of every call of a script
+        self._scripts: Dict[Hashable, List[Tuple[str, Optional[str], float]]] = dict()
+
+    def _reserve(self, group: Hashable, api: str, region: Optional[str], at: float) -> float:
+        limit = self._pacing.limit(api=api, region=region)
+        if limit is None:
+            return at
+
+        interval = 1.0 / limit.rate
+        next_at = self._next.get((group, api, region), 0.0)
+        start = max(at, next_at - (limit.burst - 1) * interval)
+        self._next[(group, api, region)] = max(next_at, start) + interval
+
+        return start
+
+    def pace(self,
+             key: Hashable,
+             commands: Iterable[Any],
+             group: Hashable = None) -> Iterator[Tuple[Any, float]]:
+        """
+        Schedule the calls of a script lazily. A script which is scheduled
+        again with the same calls keeps its sleeps. When its calls have
+        changed, the changed calls are scheduled after all others, and the
+        calls it no longer makes are not given back.
+
+        :param key: The key of the script.
+        :type key: Hashable
+        :param commands: The commands of the script, each with the api
+            and the region it calls.
+        :type commands: Iterable[Any]
+        :param group: The scripts which run at the same time.
+        :type group: Hashable
+
+        :return: The commands with the seconds to sleep before each.
+        :rtype: Iterator[Tuple[Any, float]]
+        """
+
+        with self._lock:
+            scheduled = self._scripts.get(key, [])
+            calls: List[Tuple[str, Optional[str], float]] = list()
+            self._scripts[key] = calls
+        reuse = True
+        now = 0.0
+        for command in commands:
+            delay = 0.0
+            if command.api is not None:
+                index = len(calls)
+                reuse = reuse and index < len(scheduled) and \
+                    scheduled[index][:2] == (command.api, command.region)
+                if reuse:
+                    delay = scheduled[index][2]
+                else:
+                    with self._lock:
+                        delay = self._reserve(group=group,
+                                              api=command.api,
+                                              region=command.region,
+                                              at=now) - now
+                calls.append((command.api, command.region, delay))
+                now += delay
+            yield command, delay
+
+    def __getstate__(self):
+        return self._next, self._scripts
+
+    def __setstate__(self, state) -> None:
+        self._lock = threading.Lock()
+        self._next, self._scripts = state
+
+
+class PacingScheduler(object):
+    """
+    Pace the calls of rate-limited APIs with a token bucket per API family
+    and region. Share one scheduler between everything that calls the
+    APIs in the same account, e.g. the steps of all operators.
+
+    The scripts generated by the steps given the same scheduler share its
+    :class:`ScriptSchedule`, so that scripts rendered together stagger
+    their sleeps.
+    """
+
+    __slots__ = ("_limits", "_clock", "_sleep", "_lock", "_buckets", "_scripts")
+
+    def __init__(self,
+                 limits: Optional[Mapping[Union[str, Tuple[str, str]], RateLimit]] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize a pacing scheduler.
+
+        :param limits: Rate limits keyed by the API family, e.g.
+            'ecs:UpdateService', or by the API family and region name for
+            a region with its own quota. They override the
+            DEFAULT_RATE_LIMITS.
+        :type limits: Mapping[Union[str, Tuple[str, str]], :class:`RateLimit`]
+        :param clock: Function returning the current time in seconds.
+        :type clock: Callable[[], float]
+        :param sleep: Function to wait for a number of seconds.
+        :type sleep: Callable[[float], None]
+        """
+
+        self._limits: Dict[Union[str, Tuple[str, str]], RateLimit] = dict(DEFAULT_RATE_LIMITS)
+        if limits:
+            self._limits.update(limits)
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], None] = sleep
+        self._lock: threading.Lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = dict()
+        self._scripts: ScriptSchedule = ScriptSchedule(pacing=self)
+
+    @property
+    def scripts(self) -> ScriptSchedule:
+        """
+        The schedule of the calls of the scripts generated with this
+        scheduler.
+        """
+
+        return self._scripts
+
+    def limit(self, api: str, region: Optional[str]) -> Optional[RateLimit]:
+        """
+        Get the rate limit of an API family in a region.
+
+        :param api: The API family.
+        :type api: str
+        :param region: Name of the region.
+        :type region: str
+
+        :return: The rate limit or None if the API is not rate-limited.
+        :rtype: :class:`RateLimit`
+        """
+
+        return self._limits.get((api, region), self._limits.get(api))
+
+    def bucket(self, api: str, region: Optional[str]) -> Optional[TokenBucket]:
+        """
+        Get the token bucket of an API family in a region.
+
+        :param api: The API family.
+        :type api: str
+        :param region: Name of the region.
+        :type region: str
+
+        :return: The token bucket or None if the API is not rate-limited.
+        :rtype: :class:`TokenBucket`
+        """
+
+        with self._lock:
+            bucket = self._buckets.get((api, region))
+            if bucket is None:
+                limit = self.limit(api=api, region=region)
+                if limit is None:
+                    return None
+                bucket = TokenBucket(limit=limit, clock=self._clock, sleep=self._sleep)
+                self._buckets[(api, region)] = bucket
+
+        return bucket
+
+    def acquire(self, api: Optional[str], region: Optional[str]) -> float:
+        """
+        Wait until a call of an API family may be made in a region.
+
+        :param api: The API family, or None for a call which is not
+            rate-limited.
+        :type api: str
+        :param region: Name of the region.
+        :type region: str
+
+        :return: Seconds waited.
+        :rtype: float
+        """
+
+        bucket = self.bucket(api=api, region=region) if api is not None else None
+        return bucket.acquire() if bucket is not None else 0.0
+
+    def simulate(self) -> PacingScheduler:
+        """
+        Create a scheduler with the same rate limits and full buckets on a
+        virtual clock, which advances by the waits instead of waiting. It
+        works out the sleeps of a script whose commands run one after
+        another.
+
+        :return: The scheduler.
+        :rtype: :class:`PacingScheduler`
+        """
+
+        clock = _VirtualClock()
+        return PacingScheduler(limits=self._limits, clock=clock.now, sleep=clock.sleep)
+
+    def __reduce__(self):
+        # Locks cannot be pickled, e.g. to render steps in other processes.
+        # The schedule of the scripts is kept, so that scripts scheduled
+        # before are rendered with the same sleeps.
+        return (PacingScheduler, (self._limits,), self._scripts.__getstate__())
+
+    def __setstate__(self, state) -> None:
+        self._scripts.__setstate__(state)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._limits)} rate limits" + \
+            f", {len(self._buckets)} buckets)"
+
+
+def format_delay(delay: float) -> str:
+    """
+    Format seconds to wait for the sleep command, rounded up to
+    milliseconds.
+
+    :param delay: Seconds.
+    :type delay: float
+
+    :return: The seconds, e.g. '0.5'.
+    :rtype: str
+    """
+
+    return f"{math.ceil(round(delay * 1000, 6)) / 1000:g}"
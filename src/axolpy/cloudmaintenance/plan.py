@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Optional, Tuple, Union)
+
+from .executor import ExecutionSummary, StepExecutor
+from .steps import CloudMaintenanceStep
+
+__all__ = ["PlanNode", "MaintenancePlan", "NodeResult", "PlanSummary",
+           "PlanScheduler"]
+
+
+class PlanNode(object):
+    """
+    A step of a maintenance plan with the steps it depends on.
+    """
+
+    __slots__ = ("_name", "_step", "_dependencies")
+
+    def __init__(self,
+                 name: str,
+                 step: CloudMaintenanceStep,
+                 dependencies: Iterable[PlanNode] = ()) -> None:
+        """
+        Initialize a plan node.
+
+        :param name: Name of the node, unique in the plan.
+        :type name: str
+        :param step: The cloud maintenance step.
+        :type step: :class:`CloudMaintenanceStep`
+        :param dependencies: The nodes which must finish before this one
+            starts.
+        :type dependencies: Iterable[:class:`PlanNode`]
+        """
+
+        self._name: str = name
+        self._step: CloudMaintenanceStep = step
+        self._dependencies: Tuple[PlanNode, ...] = tuple(dependencies)
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def step(self) -> CloudMaintenanceStep:
+        return self._step
+
+    @property
+    def dependencies(self) -> Tuple[PlanNode, ...]:
+        return self._dependencies
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({self._name}" + \
+            f", after: {[node.name for node in self._dependencies]})"
+
+
+class MaintenancePlan(object):
+    """
+    Cloud maintenance steps and the dependencies between them. A step can
+    only depend on steps added before it, so the plan never has a cycle.
+    """
+
+    __slots__ = ("_nodes", "_dependents")
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, PlanNode] = dict()
+        self._dependents: Dict[str, List[PlanNode]] = dict()
+
+    @classmethod
+    def from_steps(cls, steps: Iterable[CloudMaintenanceStep]) -> MaintenancePlan:
+        """
+        Create a plan which keeps the order of the step numbers of every
+        operator: a step depends on the steps of the operator with the
+        next lower step number. The operators do not wait for each other.
+
+        :param steps: The steps.
+        :type steps: Iterable[:class:`CloudMaintenanceStep`]
+
+        :return: The plan.
+        :rtype: :class:`MaintenancePlan`
+        """
+
+        plan = cls()
+        operator_steps: Dict[str, Dict[int, List[CloudMaintenanceStep]]] = dict()
+        for step in steps:
+            operator_steps.setdefault(step.operator.id, dict()) \
+                .setdefault(step.step_no, list()).append(step)
+
+        for step_nos in operator_steps.values():
+            previous: List[PlanNode] = list()
+            for step_no in sorted(step_nos):
+                previous = [plan.add(step, after=previous) for step in step_nos[step_no]]
+
+        return plan
+
+    @property
+    def nodes(self) -> List[PlanNode]:
+        """
+        The nodes in the order they are added, which is a topological
+        order.
+        """
+
+        return list(self._nodes.values())
+
+    def node(self, name: str) -> PlanNode:
+        return self._nodes[name]
+
+    def add(self,
+            step: CloudMaintenanceStep,
+            after: Iterable[Union[PlanNode, str]] = (),
+            name: Optional[str] = None) -> PlanNode:
+        """
+        Add a step to the plan.
+
+        :param step: The cloud maintenance step.
+        :type step: :class:`CloudMaintenanceStep`
+        :param after: The nodes, or their names, which must finish before
+            the step starts. They must be in the plan already.
+        :type after: Iterable[Union[:class:`PlanNode`, str]]
+        :param name: Name of the node. Default to the filename of the
+            step's script.
+        :type name: str
+
+        :return: The node of the step.
+        :rtype: :class:`PlanNode`
+        """
+
+        name = name if name is not None else step.filename()
+        assert name not in self._nodes, f"{name} is already in the plan"
+        dependencies = [self._nodes.get(d if isinstance(d, str) else d.name) for d in after]
+        assert None not in dependencies, "dependencies must be in the plan"
+
+        node = PlanNode(name=name, step=step, dependencies=dependencies)
+        self._nodes[name] = node
+        self._dependents[name] = list()
+        for dependency in dependencies:
+            self._dependents[dependency.name].append(node)
+
+        return node
+
+    def dependents(self, node: Union[PlanNode, str]) -> List[PlanNode]:
+        """
+        Get the nodes which depend directly on a node.
+
+        :param node: The node or its name.
+        :type node: Union[:class:`PlanNode`, str]
+
+        :return: The dependent nodes.
+        :rtype: List[:class:`PlanNode`]
+        """
+
+        return list(self._dependents[node if isinstance(node, str) else node.name])
+
+    def critical_path(self, durations: Mapping[str, float]) -> Tuple[List[PlanNode], float]:
+        """
+        Find the chain of dependent steps which takes the longest time, so
+        no schedule can finish the plan sooner.
+
+        :param durations: Seconds each node takes keyed by its name. A
+            missing node takes no time.
+        :type durations: Mapping[str, float]
+
+        :return: The nodes of the chain in order and its total seconds.
+        :rtype: Tuple[List[:class:`PlanNode`], float]
+        """
+
+        finish: Dict[str, float] = dict()
+        previous: Dict[str, Optional[PlanNode]] = dict()
+        for node in self._nodes.values():
+            start, before = 0.0, None
+            for dependency in node.dependencies:
+                if before is None or finish[dependency.name] > start:
+                    start, before = finish[dependency.name], dependency
+            finish[node.name] = start + durations.get(node.name, 0.0)
+            previous[node.name] = before
+
+        if not finish:
+            return [], 0.0
+
+        last = max(self._nodes.values(), key=lambda node: finish[node.name])
+        path: List[PlanNode] = list()
+        node: Optional[PlanNode] = last
+        while node is not None:
+            path.append(node)
+            node = previous[node.name]
+        path.reverse()
+
+        return path, finish[last.name]
+
+    def __iter__(self) -> Iterator[PlanNode]:
+        return iter(self._nodes.values())
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._nodes
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._nodes)} steps)"
+
+
+class NodeResult(object):
+    """
+    The result of running a step of a plan.
+    """
+
+    __slots__ = ("_node", "_start", "_end", "_value", "_error", "_skipped")
+
+    def __init__(self,
+                 node: PlanNode,
+                 start: float = 0.0,
+                 end: float = 0.0,
+                 value: Any = None,
+                 error: Optional[str] = None,
+                 skipped: bool = False) -> None:
+        """
+        Initialize a node result.
+
+        :param node: The node.
+        :type node: :class:`PlanNode`
+        :param start: Seconds from the start of the plan to the start of
+            the step.
+        :type start: float
+        :param end: Seconds from the start of the plan to the end of the
+            step.
+        :type end: float
+        :param value: What running the step returned, e.g. an
+            :class:`ExecutionSummary`.
+        :type value: Any
+        :param error: Description of the error if the step failed.
+        :type error: str
+        :param skipped: True if the step did not run because a step it
+            depends on failed.
+        :type skipped: bool
+        """
+
+        self._node: PlanNode = node
+        self._start: float = start
+        self._end: float = end
+        self._value: Any = value
+        self._error: Optional[str] = error
+        self._skipped: bool = skipped
+
+    @property
+    def node(self) -> PlanNode:
+        return self._node
+
+    @property
+    def start(self) -> float:
+        return self._start
+
+    @property
+    def end(self) -> float:
+        return self._end
+
+    @property
+    def elapsed(self) -> float:
+        return self._end - self._start
+
+    @property
+    def value(self) -> Any:
+        return self._value
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def skipped(self) -> bool:
+        return self._skipped
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def __str__(self) -> str:
+        state = "skipped" if self._skipped else \
+            f"error: {self._error}" if self._error else f"{self.elapsed:.3f}s"
+        return f"{__class__.__name__}({self._node.name}, {state})"
+
+
+class PlanSummary(object):
+    """
+    The results of running a plan.
+    """
+
+    __slots__ = ("_plan", "_results", "_elapsed")
+
+    def __init__(self,
+                 plan: MaintenancePlan,
+                 results: Mapping[str, NodeResult],
+                 elapsed: float) -> None:
+        """
+        Initialize a plan summary.
+
+        :param plan: The plan.
+        :type plan: :class:`MaintenancePlan`
+        :param results: Results keyed by the name of the node.
+        :type results: Mapping[str, :class:`NodeResult`]
+        :param elapsed: Wall-clock seconds taken.
+        :type elapsed: float
+        """
+
+        self._plan: MaintenancePlan = plan
+        self._results: Dict[str, NodeResult] = dict(results)
+        self._elapsed: float = elapsed
+
+    @property
+    def results(self) -> List[NodeResult]:
+        """
+        The results in the order of the plan.
+        """
+
+        return [self._results[node.name] for node in self._plan]
+
+    def result(self, name: str) -> NodeResult:
+        return self._results[name]
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def failures(self) -> List[NodeResult]:
+        return [r for r in self.results if r.failed]
+
+    @property
+    def skipped(self) -> List[NodeResult]:
+        return [r for r in self.results if r.skipped]
+
+    @property
+    def succeeded(self) -> bool:
+        return not any(r.failed or r.skipped for r in self._results.values())
+
+    def critical_path(self) -> Tuple[List[PlanNode], float]:
+        """
+        Find the chain of dependent steps which took the longest time.
+
+        :return: The nodes of the chain in order and its total seconds.
+        :rtype: Tuple[List[:class:`PlanNode`], float]
+        """
+
+        return self._plan.critical_path(
+            {name: result.elapsed for name, result in self._results.items()})
+
+    def report(self) -> str:
+        """
+        Format the critical path and the failures as text.
+
+        :return: The report.
+        :rtype: str
+        """
+
+        path, length = self.critical_path()
+        lines = [f"{len(self._results)} steps in {self._elapsed:.3f}s" +
+                 f", critical path {length:.3f}s" +
+                 f", {len(self.failures)} failures, {len(self.skipped)} skipped"]
+        lines.extend(f"  {node.name}: {self._results[node.name].elapsed:.3f}s"
+                     for node in path)
+        lines.extend(f"  FAILED {r.node.name}: {r.error}" for r in self.failures)
+
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._results)} steps" + \
+            f", {len(self.failures)} failures, {len(self.skipped)} skipped)"
+
+
+class PlanScheduler(object):
+    """
+    Run the steps of a plan, every step as soon as the steps it depends on
+    have finished. The dependents of a failed step are skipped.
+    """
+
+    __slots__ = ("_run_step", "_max_workers")
+
+    def __init__(self,
+                 run_step: Optional[Callable[[CloudMaintenanceStep], Any]] = None,
+                 max_workers: int = 4) -> None:
+        """
+        Initialize a plan scheduler.
+
+        :param run_step: Function to run a step. The step fails if the
+            function raises an exception or returns an
+            :class:`ExecutionSummary` which has not succeeded. Default to
+            a dry run of the commands of the step with a
+            :class:`StepExecutor`, which runs nothing. Pass the
+            :meth:`StepExecutor.execute` of an executor that is not in dry
+            run to run the commands.
+        :type run_step: Callable[[:class:`CloudMaintenanceStep`], Any]
+        :param max_workers: Maximum number of steps running at the same
+            time.
+        :type max_workers: int
+        """
+
+        assert max_workers > 0, "max_workers must be positive"
+
+        if run_step is None:
+            executor = StepExecutor(dry_run=True)
+
+            def run_step(step: CloudMaintenanceStep) -> ExecutionSummary:
+                return executor.execute([step])
+
+        self._run_step: Callable[[CloudMaintenanceStep], Any] = run_step
+        self._max_workers: int = max_workers
+
+    def _run(self, node: PlanNode, origin: float) -> NodeResult:
+        start = time.perf_counter() - origin
+        try:
+            value = self._run_step(node.step)
+        except Exception as e:
+            return NodeResult(node=node,
+                              start=start,
+                              end=time.perf_counter() - origin,
+                              error=f"{type(e).__name__}: {e}")
+
+        error = None
+        if isinstance(value, ExecutionSummary) and not value.succeeded:
+            error = f"{len(value.failures)} commands failed"
+
+        return NodeResult(node=node,
+                          start=start,
+                          end=time.perf_counter() - origin,
+                          value=value,
+                          error=error)
+
+    def run(self, plan: MaintenancePlan) -> PlanSummary:
+        """
+        Run the plan.
+
+        :param plan: The plan.
+        :type plan: :class:`MaintenancePlan`
+
+        :return: The summary.
+        :rtype: :class:`PlanSummary`
+        """
+
+        origin = time.perf_counter()
+        results: Dict[str, NodeResult] = dict()
+        waiting: Dict[str, int] = {node.name: len(node.dependencies) for node in plan}
+        ready: List[PlanNode] = [node for node in plan if not node.dependencies]
+
+        def _finish(result: NodeResult) -> None:
+            # Release the dependents, or skip them and everything after
+            # them if the step did not succeed
+            results[result.node.name] = result
+            for dependent in plan.dependents(result.node):
+                if result.failed or result.skipped:
+                    if dependent.name not in results:
+                        _finish(NodeResult(node=dependent,
+                                           start=result.end,
+                                           end=result.end,
+                                           skipped=True))
+                    continue
+                waiting[dependent.name] -= 1
+                if waiting[dependent.name] == 0:
+                    ready.append(dependent)
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            running: Dict[Future, PlanNode] = dict()
+            while ready or running:
+                while ready:
+                    node = ready.pop(0)
+                    if node.name not in results:
+                        running[executor.submit(self._run, node, origin)] = node
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    _finish(future.result())
+
+        return PlanSummary(plan=plan, results=results, elapsed=time.perf_counter() - origin)
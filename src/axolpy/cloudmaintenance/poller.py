@@ -0,0 +1,512 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterable, List,
+                    Mapping, Optional, Sequence, Tuple)
+
+from ..aws import ECSService, RDSDatabase
+from ..kubernetes import Deployment
+from .steps import (ACTION_ECS_FORCE_NEW_DEPLOYMENT, ACTION_ECS_UPDATE_SERVICE,
+                    ACTION_KUBECTL_ROLLOUT_RESTART, ACTION_KUBECTL_SCALE,
+                    ACTION_RDS_MODIFY_DB_INSTANCE, CloudMaintenanceStep)
+
+__all__ = ["ResourceStatus", "ECSServiceStatus", "RDSDatabaseStatus",
+           "DeploymentStatus", "StatusClient", "FakeStatusClient",
+           "PollResult", "PollSummary", "StabilityPoller", "step_resources"]
+
+# The actions of the commands which change the state of a resource
+_STATE_CHANGING_ACTIONS = frozenset([ACTION_ECS_UPDATE_SERVICE,
+                                     ACTION_ECS_FORCE_NEW_DEPLOYMENT,
+                                     ACTION_RDS_MODIFY_DB_INSTANCE,
+                                     ACTION_KUBECTL_SCALE,
+                                     ACTION_KUBECTL_ROLLOUT_RESTART])
+
+
+class ResourceStatus(ABC):
+    """
+    An abstract class for the status of a resource.
+    """
+
+    __slots__ = ()
+
+    @property
+    @abstractmethod
+    def stable(self) -> bool:
+        pass
+
+    @abstractmethod
+    def _key(self) -> Tuple[Any, ...]:
+        pass
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and other._key() == self._key()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._key()))
+
+
+class ECSServiceStatus(ResourceStatus):
+    """
+    The task counts of an ECS service. It is stable when all desired
+    tasks are running.
+    """
+
+    __slots__ = ("_desired_count", "_running_count")
+
+    def __init__(self, desired_count: int, running_count: int) -> None:
+        self._desired_count: int = desired_count
+        self._running_count: int = running_count
+
+    @property
+    def desired_count(self) -> int:
+        return self._desired_count
+
+    @property
+    def running_count(self) -> int:
+        return self._running_count
+
+    @property
+    def stable(self) -> bool:
+        return self._desired_count == self._running_count
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (self._desired_count, self._running_count)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(desired_count: {self._desired_count}" + \
+            f", running_count: {self._running_count})"
+
+
+class RDSDatabaseStatus(ResourceStatus):
+    """
+    The status of an RDS database, e.g. upgrading. It is stable when it is
+    available.
+    """
+
+    __slots__ = ("_status",)
+
+    def __init__(self, status: str) -> None:
+        self._status: str = status
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def stable(self) -> bool:
+        return self._status == "available"
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (self._status,)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(status: {self._status})"
+
+
+class DeploymentStatus(ResourceStatus):
+    """
+    The replicas of a k8s deployment. It is stable when all replicas are
+    ready and, during a rollout, updated.
+    """
+
+    __slots__ = ("_replicas", "_ready_replicas", "_updated_replicas")
+
+    def __init__(self,
+                 replicas: int,
+                 ready_replicas: int,
+                 updated_replicas: Optional[int] = None) -> None:
+        """
+        Initialize a deployment status.
+
+        :param replicas: Desired replicas.
+        :type replicas: int
+        :param ready_replicas: Ready replicas.
+        :type ready_replicas: int
+        :param updated_replicas: Replicas of the latest revision, or None
+            if it is not known.
+        :type updated_replicas: int
+        """
+
+        self._replicas: int = replicas
+        self._ready_replicas: int = ready_replicas
+        self._updated_replicas: Optional[int] = updated_replicas
+
+    @property
+    def replicas(self) -> int:
+        return self._replicas
+
+    @property
+    def ready_replicas(self) -> int:
+        return self._ready_replicas
+
+    @property
+    def updated_replicas(self) -> Optional[int]:
+        return self._updated_replicas
+
+    @property
+    def stable(self) -> bool:
+        return self._ready_replicas == self._replicas and \
+            self._updated_replicas in (None, self._replicas)
+
+    def _key(self) -> Tuple[Any, ...]:
+        return (self._replicas, self._ready_replicas, self._updated_replicas)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(replicas: {self._replicas}" + \
+            f", ready_replicas: {self._ready_replicas}" + \
+            f", updated_replicas: {self._updated_replicas})"
+
+
+class StatusClient(ABC):
+    """
+    An abstract class to get the status of resources, e.g. from the AWS
+    and Kubernetes APIs.
+    """
+
+    @abstractmethod
+    async def ecs_service_status(self, service: ECSService) -> ECSServiceStatus:
+        pass
+
+    @abstractmethod
+    async def rds_database_status(self, database: RDSDatabase) -> RDSDatabaseStatus:
+        pass
+
+    @abstractmethod
+    async def deployment_status(self, deployment: Deployment) -> DeploymentStatus:
+        pass
+
+    async def status(self, resource: Any) -> ResourceStatus:
+        """
+        Get the status of a resource of any supported type.
+
+        :param resource: An ECS service, RDS database or k8s deployment.
+        :type resource: Any
+
+        :return: The status.
+        :rtype: :class:`ResourceStatus`
+        """
+
+        if isinstance(resource, ECSService):
+            return await self.ecs_service_status(resource)
+        if isinstance(resource, RDSDatabase):
+            return await self.rds_database_status(resource)
+        if isinstance(resource, Deployment):
+            return await self.deployment_status(resource)
+
+        raise TypeError(f"cannot get the status of {type(resource).__name__}")
+
+
+class FakeStatusClient(StatusClient):
+    """
+    Return scripted statuses, for tests and dry runs. Each call returns
+    the next status of the resource and the last one is repeated.
+    """
+
+    def __init__(self,
+                 statuses: Mapping[Hashable, Sequence[ResourceStatus]],
+                 delay: float = 0.0) -> None:
+        """
+        Initialize a fake status client.
+
+        :param statuses: Statuses keyed by the resource.
+        :type statuses: Mapping[Hashable, Sequence[:class:`ResourceStatus`]]
+        :param delay: Seconds each call pretends to take.
+        :type delay: float
+        """
+
+        self._statuses: Dict[Hashable, Sequence[ResourceStatus]] = dict(statuses)
+        self._delay: float = delay
+        self._calls: Dict[Hashable, int] = dict()
+
+    def calls(self, resource: Hashable) -> int:
+        """
+        Get the number of times the status of a resource is asked for.
+        """
+
+        return self._calls.get(resource, 0)
+
+    async def _next(self, resource: Hashable) -> ResourceStatus:
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        statuses = self._statuses[resource]
+        call = self._calls.get(resource, 0)
+        self._calls[resource] = call + 1
+
+        return statuses[min(call, len(statuses) - 1)]
+
+    async def ecs_service_status(self, service: ECSService) -> ECSServiceStatus:
+        return await self._next(service)
+
+    async def rds_database_status(self, database: RDSDatabase) -> RDSDatabaseStatus:
+        return await self._next(database)
+
+    async def deployment_status(self, deployment: Deployment) -> DeploymentStatus:
+        return await self._next(deployment)
+
+
+class PollResult(object):
+    """
+    The result of waiting for a resource to become stable.
+    """
+
+    __slots__ = ("_resource", "_status", "_polls", "_elapsed", "_error")
+
+    def __init__(self,
+                 resource: Any,
+                 status: Optional[ResourceStatus],
+                 polls: int,
+                 elapsed: float,
+                 error: Optional[str] = None) -> None:
+        """
+        Initialize a poll result.
+
+        :param resource: The resource.
+        :type resource: Any
+        :param status: The last status, or None if it is never received.
+        :type status: :class:`ResourceStatus`
+        :param polls: Number of times the status is asked for.
+        :type polls: int
+        :param elapsed: Seconds until the resource became stable or the
+            poller gave up.
+        :type elapsed: float
+        :param error: Description of the last error of the client.
+        :type error: str
+        """
+
+        self._resource: Any = resource
+        self._status: Optional[ResourceStatus] = status
+        self._polls: int = polls
+        self._elapsed: float = elapsed
+        self._error: Optional[str] = error
+
+    @property
+    def resource(self) -> Any:
+        return self._resource
+
+    @property
+    def status(self) -> Optional[ResourceStatus]:
+        return self._status
+
+    @property
+    def polls(self) -> int:
+        return self._polls
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def stable(self) -> bool:
+        return self._status is not None and self._status.stable
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({self._resource}" + \
+            f", status: {self._status}, polls: {self._polls})"
+
+
+class PollSummary(object):
+    """
+    The results of waiting for resources to become stable.
+    """
+
+    __slots__ = ("_results", "_elapsed")
+
+    def __init__(self, results: List[PollResult], elapsed: float) -> None:
+        self._results: List[PollResult] = results
+        self._elapsed: float = elapsed
+
+    @property
+    def results(self) -> List[PollResult]:
+        return self._results
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def stable(self) -> bool:
+        return all(r.stable for r in self._results)
+
+    @property
+    def unstable(self) -> List[PollResult]:
+        return [r for r in self._results if not r.stable]
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self._results)} resources" + \
+            f", {len(self.unstable)} unstable, {self._elapsed:.3f}s)"
+
+
+class StabilityPoller(object):
+    """
+    Watch resources concurrently until every one is stable. The interval
+    between polls of a resource grows while its status does not change
+    and is reset when it does, so a rollout in progress is followed
+    closely while a slow upgrade is not polled needlessly.
+
+    A resource which has just been modified may still report the status
+    from before the change, so a resource is only taken as stable once it
+    has been seen unstable, or after it has stayed stable for the settle
+    time.
+    """
+
+    def __init__(self,
+                 client: StatusClient,
+                 initial_interval: float = 5.0,
+                 max_interval: float = 60.0,
+                 factor: float = 2.0,
+                 timeout: float = 3600.0,
+                 settle_time: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        """
+        Initialize a stability poller.
+
+        :param client: The client to get the status of resources.
+        :type client: :class:`StatusClient`
+        :param initial_interval: Seconds between the first polls.
+        :type initial_interval: float
+        :param max_interval: Longest seconds between polls.
+        :type max_interval: float
+        :param factor: Growth of the interval when the status has not
+            changed.
+        :type factor: float
+        :param timeout: Seconds to wait before giving up.
+        :type timeout: float
+        :param settle_time: Seconds a resource must stay stable, from the
+            start of the wait, before it is taken as stable without having
+            been seen unstable.
+        :type settle_time: float
+        :param clock: Function returning the current time in seconds.
+        :type clock: Callable[[], float]
+        :param sleep: Coroutine function to wait for a number of seconds.
+        :type sleep: Callable[[float], Awaitable[None]]
+        """
+
+        assert initial_interval > 0, "initial_interval must be positive"
+        assert max_interval >= initial_interval, \
+            "max_interval must not be shorter than initial_interval"
+        assert factor >= 1, "factor must be at least 1"
+        assert settle_time >= 0, "settle_time must not be negative"
+
+        self._client: StatusClient = client
+        self._initial_interval: float = initial_interval
+        self._max_interval: float = max_interval
+        self._factor: float = factor
+        self._timeout: float = timeout
+        self._settle_time: float = settle_time
+        self._clock: Callable[[], float] = clock
+        self._sleep: Callable[[float], Awaitable[None]] = sleep
+
+    async def _watch(self, resource: Any, deadline: float, start: float) -> PollResult:
+        status = None
+        error = None
+        polls = 0
+        interval = self._initial_interval
+        changed = False
+        while True:
+            polls += 1
+            try:
+                current = await self._client.status(resource)
+                error = None
+            except Exception as e:
+                current = status
+                error = f"{type(e).__name__}: {e}"
+
+            settled = self._clock() - start >= self._settle_time
+            if current is not None and current.stable:
+                if changed or settled:
+                    return PollResult(resource=resource,
+                                      status=current,
+                                      polls=polls,
+                                      elapsed=self._clock() - start)
+            elif current is not None:
+                changed = True
+
+            if current != status or error is not None:
+                interval = self._initial_interval
+            else:
+                interval = min(interval * self._factor, self._max_interval)
+            status = current
+
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return PollResult(resource=resource,
+                                  status=status,
+                                  polls=polls,
+                                  elapsed=self._clock() - start,
+                                  error=error)
+            if current is not None and current.stable:
+                # Do not sleep past the end of the settle time
+                remaining = min(remaining, start + self._settle_time - self._clock())
+            await self._sleep(min(interval, remaining))
+
+    async def wait_until_stable(self, resources: Iterable[Any]) -> PollSummary:
+        """
+        Wait until every resource is stable or the timeout is reached.
+
+        :param resources: ECS services, RDS databases or k8s deployments.
+        :type resources: Iterable[Any]
+
+        :return: The summary, in the order of the resources.
+        :rtype: :class:`PollSummary`
+        """
+
+        resources = list(resources)
+        assert all(isinstance(r, (ECSService, RDSDatabase, Deployment)) for r in resources), \
+            "resources must be ECS services, RDS databases or k8s deployments"
+
+        start = self._clock()
+        deadline = start + self._timeout
+        results = await asyncio.gather(*[self._watch(resource, deadline, start)
+                                         for resource in resources])
+
+        return PollSummary(results=list(results), elapsed=self._clock() - start)
+
+    def poll(self, resources: Iterable[Any]) -> PollSummary:
+        """
+        Run :meth:`wait_until_stable` in a new event loop.
+
+        :param resources: ECS services, RDS databases or k8s deployments.
+        :type resources: Iterable[Any]
+
+        :return: The summary.
+        :rtype: :class:`PollSummary`
+        """
+
+        return asyncio.run(self.wait_until_stable(resources))
+
+
+def step_resources(steps: Iterable[CloudMaintenanceStep]) -> List[Any]:
+    """
+    Get the ECS services, RDS databases and k8s deployments which the
+    commands of eligible steps change, e.g. the services restarted by
+    :class:`RestartECSService`, to wait for them. The resources which are
+    only queried, and the other kinds of resources, are left out.
+
+    :param steps: The steps.
+    :type steps: Iterable[:class:`CloudMaintenanceStep`]
+
+    :return: The resources in the order of the commands, without
+        duplicates.
+    :rtype: List[Any]
+    """
+
+    resources: Dict[int, Any] = dict()
+    for step in steps:
+        if not step.eligible():
+            continue
+        for command in step.commands():
+            if command.action not in _STATE_CHANGING_ACTIONS:
+                continue
+            # A batched command works on many resources at once
+            for resource in command.resources:
+                if isinstance(resource, (ECSService, RDSDatabase, Deployment)):
+                    resources.setdefault(id(resource), resource)
+
+    return list(resources.values())
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import ast
+import operator
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from typing import (Any, Callable, Generator, List, Mapping, Optional,
+                    Sequence, Tuple, Union)
+
+from ..aws import AWSRegion, ECSCluster, ECSService, RDSDatabase
+from ..kubernetes import Cluster, Deployment, Namespace, StatefulSet
+from .inventory import InventoryIndex, resource_kind, resource_path
+
+__all__ = ["Query", "QuerySyntaxError", "select"]
+
+# Attributes of resources which can be used in a query
+_attribute_fields = frozenset(["id", "type", "host", "port", "dbname",
+                               "engine_type", "engine_version", "class_type",
+                               "replicas", "desired_count"])
+# Attributes of patches which can be used as patch.<name> in a query
+_patch_fields = frozenset(["engine_version", "class_type",
+                           "replicas", "desired_count"])
+
+_comparison_operators = {ast.Eq: operator.eq,
+                         ast.NotEq: operator.ne,
+                         ast.Lt: operator.lt,
+                         ast.LtE: operator.le,
+                         ast.Gt: operator.gt,
+                         ast.GtE: operator.ge,
+                         ast.In: lambda a, b: a in b,
+                         ast.NotIn: lambda a, b: a not in b}
+
+
+class QuerySyntaxError(ValueError):
+    """
+    Raised when a query expression cannot be compiled.
+    """
+
+    pass
+
+
+def _region_of(resource: Any) -> Optional[AWSRegion]:
+    if isinstance(resource, (RDSDatabase, ECSCluster)):
+        return resource.region
+    elif isinstance(resource, ECSService):
+        return resource.cluster.region
+    elif isinstance(resource, Cluster):
+        return getattr(resource.platform_ref, "region", None)
+    elif isinstance(resource, Namespace):
+        return _region_of(resource.cluster)
+    elif isinstance(resource, (StatefulSet, Deployment)):
+        return _region_of(resource.namespace.cluster)
+
+    return None
+
+
+def _cluster_of(resource: Any) -> Optional[Union[ECSCluster, Cluster]]:
+    if isinstance(resource, (ECSCluster, Cluster)):
+        return resource
+    elif isinstance(resource, (ECSService, Namespace)):
+        return resource.cluster
+    elif isinstance(resource, (StatefulSet, Deployment)):
+        return resource.namespace.cluster
+
+    return None
+
+
+def _get_region(resource: Any) -> Optional[str]:
+    region = _region_of(resource)
+    return region.name if region else None
+
+
+def _get_cluster(resource: Any) -> Optional[str]:
+    cluster = _cluster_of(resource)
+    return cluster.name if cluster else None
+
+
+def _get_namespace(resource: Any) -> Optional[str]:
+    if isinstance(resource, Namespace):
+        return resource.name
+    elif isinstance(resource, (StatefulSet, Deployment)):
+        return resource.namespace.name
+
+    return None
+
+
+def _get_name(resource: Any) -> Optional[str]:
+    return resource.id if isinstance(resource, RDSDatabase) else resource.name
+
+
+def _get_property(name: str) -> Callable[[Any], Any]:
+    def _getter(resource: Any) -> Any:
+        return resource.property(name) if hasattr(resource, "property") else None
+
+    return _getter
+
+
+_named_fields = {"kind": resource_kind,
+                 "path": resource_path,
+                 "region": _get_region,
+                 "cluster": _get_cluster,
+                 "namespace": _get_namespace,
+                 "name": _get_name,
+                 "patch": lambda resource: getattr(resource, "patch", None),
+                 "restart_after_upgrade": _get_property("restart_after_upgrade")}
+
+
+class _Compiler(object):
+    """
+    Compile the AST of a query expression into a tree of closures.
+    """
+
+    def __init__(self) -> None:
+        # Conditions of the top level conjunction which can be answered
+        # by the secondary indexes of InventoryIndex, as a field and the
+        # values it may have
+        self.index_hints: List[Tuple[str, tuple]] = list()
+
+    def compile(self, node: ast.AST, top_level: bool = False) -> Callable[[Any], Any]:
+        if isinstance(node, ast.Expression):
+            return self.compile(node.body, top_level=True)
+        elif isinstance(node, ast.BoolOp):
+            operands = [self.compile(value, top_level=top_level and isinstance(node.op, ast.And))
+                        for value in node.values]
+            if isinstance(node.op, ast.And):
+                return lambda resource: all(f(resource) for f in operands)
+            return lambda resource: any(f(resource) for f in operands)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self.compile(node.operand)
+            return lambda resource: not operand(resource)
+        elif isinstance(node, ast.Compare):
+            return self._compile_compare(node, top_level=top_level)
+        elif isinstance(node, ast.Call):
+            return self._compile_call(node)
+        elif isinstance(node, ast.Name):
+            if top_level and node.id == "restart_after_upgrade":
+                self.index_hints.append(("restart_after_upgrade", (True,)))
+            return self._compile_field(node)
+        elif isinstance(node, ast.Attribute):
+            return self._compile_field(node)
+        elif isinstance(node, (ast.Constant, ast.List, ast.Tuple, ast.Set)):
+            value = self._literal(node)
+            return lambda resource: value
+
+        raise QuerySyntaxError(f"Unsupported expression: {ast.dump(node)}")
+
+    def _literal(self, node: ast.AST) -> Any:
+        try:
+            value = ast.literal_eval(node)
+        except ValueError:
+            raise QuerySyntaxError(
+                f"Only literals can be listed: {ast.dump(node)}") from None
+        return frozenset(value) if isinstance(value, (list, tuple, set)) else value
+
+    def _compile_field(self, node: ast.AST) -> Callable[[Any], Any]:
+        if isinstance(node, ast.Name):
+            if node.id in _named_fields:
+                return _named_fields[node.id]
+            if node.id in _attribute_fields:
+                return lambda resource, name=node.id: getattr(resource, name, None)
+        elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+            if node.value.id == "patch" and node.attr in _patch_fields:
+                return lambda resource, name=node.attr: \
+                    getattr(getattr(resource, "patch", None), name, None)
+            if node.value.id == "properties":
+                return _get_property(node.attr)
+
+        raise QuerySyntaxError(f"Unknown field: {ast.unparse(node)}")
+
+    def _compile_compare(self, node: ast.Compare, top_level: bool) -> Callable[[Any], Any]:
+        if len(node.ops) != 1:
+            raise QuerySyntaxError(
+                f"Chained comparison is not supported: {ast.unparse(node)}")
+
+        op_type = type(node.ops[0])
+        if op_type not in _comparison_operators:
+            raise QuerySyntaxError(
+                f"Unsupported comparison: {ast.unparse(node)}")
+
+        compare = _comparison_operators[op_type]
+        left, right = node.left, node.comparators[0]
+        left_value, right_value = self.compile(left), self.compile(right)
+        if top_level and isinstance(left, ast.Name):
+            if op_type is ast.Eq and isinstance(right, ast.Constant):
+                self.index_hints.append((left.id, (right.value,)))
+            elif op_type is ast.In and isinstance(right, (ast.List, ast.Tuple)):
+                # Keep the order of the listed values for the results
+                self.index_hints.append(
+                    (left.id, tuple(dict.fromkeys(ast.literal_eval(right)))))
+
+        if op_type in (ast.Lt, ast.LtE, ast.Gt, ast.GtE):
+            def _compare(resource: Any) -> bool:
+                a, b = left_value(resource), right_value(resource)
+                # Resources without the field never match an ordering
+                return a is not None and b is not None and compare(a, b)
+        elif op_type in (ast.In, ast.NotIn):
+            def _compare(resource: Any) -> bool:
+                b = right_value(resource)
+                return b is not None and compare(left_value(resource), b)
+        else:
+            def _compare(resource: Any) -> bool:
+                return compare(left_value(resource), right_value(resource))
+
+        return _compare
+
+    def _compile_call(self, node: ast.Call) -> Callable[[Any], Any]:
+        if not isinstance(node.func, ast.Name) or node.func.id != "match" or \
+                len(node.args) != 2 or node.keywords or \
+                not isinstance(node.args[1], ast.Constant) or \
+                not isinstance(node.args[1].value, str):
+            raise QuerySyntaxError(
+                f"Only match(field, \"pattern\") can be called: {ast.unparse(node)}")
+
+        field = self.compile(node.args[0])
+        pattern = node.args[1].value
+
+        def _match(resource: Any) -> bool:
+            value = field(resource)
+            return value is not None and fnmatchcase(str(value), pattern)
+
+        return _match
+
+
+class Query(object):
+    """
+    A filter expression over the resources of an inventory, compiled once
+    and evaluated many times.
+
+    The expression uses the Python syntax for boolean operations and
+    comparisons, e.g.::
+
+        kind == "rds_database" and engine_type == "postgresql"
+            and match(region, "ap-*") and patch.class_type
+
+    The fields are kind, path, region, cluster, namespace, name, patch,
+    restart_after_upgrade, the attributes of resources such as replicas,
+    desired_count or engine_version, patch.<attribute> and
+    properties.<name>. A field that does not apply to a resource is None.
+    ``match(field, "pattern")`` matches a shell-style wildcard pattern.
+    """
+
+    def __init__(self, expression: str) -> None:
+        """
+        Compile a query.
+
+        :param expression: The filter expression.
+        :type expression: str
+        """
+
+        try:
+            tree = ast.parse(expression.strip(), mode="eval")
+        except SyntaxError as e:
+            raise QuerySyntaxError(f"Invalid query {expression!r}: {e.msg}") from None
+
+        compiler = _Compiler()
+        self._expression: str = expression
+        self._predicate: Callable[[Any], Any] = compiler.compile(tree)
+        self._index_hints: List[Tuple[str, tuple]] = compiler.index_hints
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def compile(cls, expression: str) -> Query:
+        """
+        Compile a query, reusing the compiled query of the same expression.
+
+        :param expression: The filter expression.
+        :type expression: str
+
+        :return: The compiled query.
+        :rtype: :class:`Query`
+        """
+
+        return cls(expression)
+
+    @property
+    def expression(self) -> str:
+        return self._expression
+
+    def matches(self, resource: Any) -> bool:
+        """
+        Check if a resource matches this query.
+
+        :param resource: A cluster, namespace, database or workload.
+        :type resource: Any
+
+        :return: True if the resource matches.
+        :rtype: bool
+        """
+
+        return bool(self._predicate(resource))
+
+    def _candidates(self, index: InventoryIndex) -> Sequence[Any]:
+        """
+        Get the smallest set of resources which has to be scanned, by
+        using the secondary indexes for the conditions of the top level
+        conjunction. None means all resources have to be scanned.
+        """
+
+        candidates = None
+        for field, values in self._index_hints:
+            if field == "kind":
+                found = [resource for kind in values
+                         for resource in index.by_kind(kind)]
+            elif field == "engine_type" and None not in values:
+                # Only databases are indexed by engine type, while every
+                # other resource has no engine type
+                found = [resource for engine_type in values
+                         for resource in index.by_engine_type(engine_type)]
+            elif field == "restart_after_upgrade" and values == (True,):
+                found = index.by_restart_after_upgrade(True)
+            else:
+                continue
+            if candidates is None or len(found) < len(candidates):
+                candidates = found
+
+        return candidates
+
+    def select(self,
+               source: Union[InventoryIndex, Mapping[str, AWSRegion]]) -> Generator[Any, None, None]:
+        """
+        Stream the resources matching this query.
+
+        :param source: An inventory index, or the regions to be indexed
+            before querying.
+        :type source: Union[:class:`InventoryIndex`, Mapping[str, :class:`AWSRegion`]]
+
+        :return: The matching resources.
+        :rtype: Generator[Any, None, None]
+        """
+
+        index = source if isinstance(source, InventoryIndex) else InventoryIndex(source)
+        candidates = self._candidates(index)
+        predicate = self._predicate
+        for resource in index.resources() if candidates is None else candidates:
+            if predicate(resource):
+                yield resource
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({self._expression})"
+
+
+def select(expression: str,
+           source: Union[InventoryIndex, Mapping[str, AWSRegion]]) -> Generator[Any, None, None]:
+    """
+    Stream the resources matching a query expression.
+
+    :param expression: The filter expression, see :class:`Query`.
+    :type expression: str
+    :param source: An inventory index, or the regions to be indexed
+        before querying.
+    :type source: Union[:class:`InventoryIndex`, Mapping[str, :class:`AWSRegion`]]
+
+    :return: The matching resources.
+    :rtype: Generator[Any, None, None]
+    """
+
+    return Query.compile(expression).select(source)
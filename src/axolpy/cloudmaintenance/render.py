@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import inspect
+import time
+import warnings
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Type, Union
+
+from . import Operator
+from .manifest import StepManifest
+from .pacing import PacingScheduler
+from .steps import CloudMaintenanceStep
+
+__all__ = ["PlanStep", "RenderResult", "RenderSummary", "render_plan"]
+
+
+class PlanStep(object):
+    """
+    A step of a maintenance plan, to be rendered for every operator.
+    """
+
+    __slots__ = ("_step_no", "_step_class", "_kwargs")
+
+    def __init__(self,
+                 step_no: int,
+                 step_class: Type[CloudMaintenanceStep],
+                 **kwargs) -> None:
+        """
+        Initialize a plan step.
+
+        :param step_no: The step number.
+        :type step_no: int
+        :param step_class: The class of the cloud maintenance step.
+        :type step_class: Type[:class:`CloudMaintenanceStep`]
+        :param kwargs: Other arguments of the step, e.g. zeroinfy.
+        """
+
+        assert issubclass(step_class, CloudMaintenanceStep), \
+            "step_class must be a CloudMaintenanceStep"
+
+        self._step_no: int = step_no
+        self._step_class: Type[CloudMaintenanceStep] = step_class
+        self._kwargs: Dict[str, Any] = kwargs
+
+    @property
+    def step_no(self) -> int:
+        return self._step_no
+
+    @property
+    def step_class(self) -> Type[CloudMaintenanceStep]:
+        return self._step_class
+
+    @property
+    def pacing(self) -> Optional[PacingScheduler]:
+        return self._kwargs.get("pacing")
+
+    @property
+    def paceable(self) -> bool:
+        """
+        Whether the step class paces its commands with a scheduler.
+        """
+
+        return "pacing" in inspect.signature(self._step_class).parameters
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the step in the summary, e.g.
+        0-UpdateECSTaskCount(zeroinfy=True). The pacing scheduler is left
+        out, as it does not change what the step does.
+        """
+
+        arguments = ", ".join(f"{k}={v}" for k, v in self._kwargs.items()
+                              if k != "pacing")
+        return f"{self._step_no}-{self._step_class.__name__}" + \
+            (f"({arguments})" if arguments else "")
+
+    def create(self, operator: Operator, dist_path: Path) -> CloudMaintenanceStep:
+        """
+        Create the step for an operator.
+
+        :param operator: The operator.
+        :type operator: :class:`Operator`
+        :param dist_path: The path to the distribution directory.
+        :type dist_path: Path
+
+        :return: The cloud maintenance step.
+        :rtype: :class:`CloudMaintenanceStep`
+        """
+
+        return self._step_class(step_no=self._step_no,
+                                operator=operator,
+                                dist_path=dist_path,
+                                **self._kwargs)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({self.name})"
+
+
+class RenderResult(object):
+    """
+    The result of rendering a step for an operator.
+    """
+
+    __slots__ = ("_operator_id", "_step_name", "_filepath", "_elapsed",
+                 "_changed", "_digest", "_error")
+
+    def __init__(self,
+                 operator_id: str,
+                 step_name: str,
+                 filepath: Optional[Path],
+                 elapsed: float,
+                 changed: bool = True,
+                 digest: Optional[str] = None,
+                 error: Optional[str] = None) -> None:
+        """
+        Initialize a render result.
+
+        :param operator_id: ID of the operator.
+        :type operator_id: str
+        :param step_name: Name of the plan step.
+        :type step_name: str
+        :param filepath: Path of the script, or None if the step is not
+            eligible for the operator or failed.
+        :type filepath: Path
+        :param elapsed: Seconds taken to render the script.
+        :type elapsed: float
+        :param changed: False if the script is not written because its
+            content has not changed.
+        :type changed: bool
+        :param digest: Digest of the content if it is recorded in a
+            manifest.
+        :type digest: str
+        :param error: Description of the error if the step failed.
+        :type error: str
+        """
+
+        self._operator_id: str = operator_id
+        self._step_name: str = step_name
+        self._filepath: Optional[Path] = filepath
+        self._elapsed: float = elapsed
+        self._changed: bool = changed and filepath is not None
+        self._digest: Optional[str] = digest
+        self._error: Optional[str] = error
+
+    @property
+    def operator_id(self) -> str:
+        return self._operator_id
+
+    @property
+    def step_name(self) -> str:
+        return self._step_name
+
+    @property
+    def filepath(self) -> Optional[Path]:
+        return self._filepath
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def changed(self) -> bool:
+        return self._changed
+
+    @property
+    def digest(self) -> Optional[str]:
+        return self._digest
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    @property
+    def failed(self) -> bool:
+        return self._error is not None
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(operator_id: {self._operator_id}" + \
+            f", step: {self._step_name}" + \
+            f", {'error: ' + self._error if self._error else self._filepath})"
+
+
+class RenderSummary(object):
+    """
+    The results of rendering a plan.
+    """
+
+    __slots__ = ("_results", "_elapsed", "_orphaned")
+
+    def __init__(self,
+                 results: List[RenderResult],
+                 elapsed: float,
+                 orphaned: Optional[List[Path]] = None) -> None:
+        """
+        Initialize a render summary.
+
+        :param results: Results of every step of every operator, in the
+            order of the operators and then the steps.
+        :type results: List[:class:`RenderResult`]
+        :param elapsed: Wall-clock seconds taken to render the plan.
+        :type elapsed: float
+        :param orphaned: The scripts in the manifest of an incremental
+            render which the plan no longer produces.
+        :type orphaned: List[Path]
+        """
+
+        self._results: List[RenderResult] = results
+        self._elapsed: float = elapsed
+        self._orphaned: List[Path] = orphaned if orphaned else list()
+
+    @property
+    def results(self) -> List[RenderResult]:
+        return self._results
+
+    @property
+    def elapsed(self) -> float:
+        return self._elapsed
+
+    @property
+    def written(self) -> List[Path]:
+        return [r.filepath for r in self._results if r.changed]
+
+    @property
+    def unchanged(self) -> List[Path]:
+        return [r.filepath for r in self._results
+                if r.filepath is not None and not r.changed]
+
+    @property
+    def failures(self) -> List[RenderResult]:
+        return [r for r in self._results if r.failed]
+
+    @property
+    def orphaned(self) -> List[Path]:
+        return self._orphaned
+
+    def timings(self) -> Dict[str, float]:
+        """
+        Get the total seconds each step took over all operators.
+
+        :return: Seconds keyed by the name of the plan step.
+        :rtype: Dict[str, float]
+        """
+
+        timings: Dict[str, float] = dict()
+        for result in self._results:
+            timings[result.step_name] = timings.get(result.step_name, 0.0) + \
+                result.elapsed
+
+        return timings
+
+    def report(self) -> str:
+        """
+        Format the timings of the steps and the failures as text.
+
+        :return: The report.
+        :rtype: str
+        """
+
+        lines = [f"{len(self.written)} scripts written in {self._elapsed:.3f}s" +
+                 f", {len(self.unchanged)} unchanged, {len(self.failures)} failures"]
+        lines.extend(f"  {name}: {elapsed * 1000:.1f} ms"
+                     for name, elapsed in self.timings().items())
+        lines.extend(f"  FAILED {r.operator_id} {r.step_name}: {r.error}"
+                     for r in self.failures)
+        lines.extend(f"  ORPHANED {filepath}" for filepath in self._orphaned)
+
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}({len(self.written)} written" + \
+            f", {len(self.unchanged)} unchanged, {len(self.failures)} failures)"
+
+
+def _render_step(operator: Operator,
+                 plan_step: PlanStep,
+                 dist_path: Path,
+                 manifest: Optional[StepManifest] = None) -> RenderResult:
+    start = time.perf_counter()
+    try:
+        step = plan_step.create(operator=operator, dist_path=dist_path)
+        filepath = None
+        changed = False
+        if step.eligible():
+            changed = step.write_file(manifest=manifest)
+            filepath = step.output_filepath()
+    except Exception as e:
+        return RenderResult(operator_id=operator.id,
+                            step_name=plan_step.name,
+                            filepath=None,
+                            elapsed=time.perf_counter() - start,
+                            error=f"{type(e).__name__}: {e}")
+
+    return RenderResult(operator_id=operator.id,
+                        step_name=plan_step.name,
+                        filepath=filepath,
+                        elapsed=time.perf_counter() - start,
+                        changed=changed,
+                        digest=manifest.digest(filepath.name)
+                        if manifest is not None and changed else None)
+
+
+def _schedule_pacing(operators: List[Operator],
+                     plan_steps: List[PlanStep],
+                     dist_path: Path) -> None:
+    """
+    Schedule the rate-limited calls of the scripts in the order of the
+    steps and the operators before they are rendered concurrently, so
+    that their sleeps do not depend on the order the workers render them
+    in. Warn about the steps rendered for several operators without a
+    shared pacing scheduler, whose scripts may together exceed the rate
+    limits.
+    """
+
+    for plan_step in plan_steps:
+        if not plan_step.paceable:
+            continue
+        steps = [plan_step.create(operator=operator, dist_path=dist_path)
+                 for operator in operators]
+        steps = [step for step in steps if step.eligible()]
+        if plan_step.pacing is not None:
+            for step in steps:
+                step.schedule()
+        elif len(steps) > 1:
+            warnings.warn(f"{plan_step.name} is rendered for {len(steps)} operators"
+                          " without a shared PacingScheduler, so their scripts"
+                          " may together exceed the rate limits")
+
+
+def _render_operator(operator: Operator,
+                     plan_steps: List[PlanStep],
+                     dist_path: Path,
+                     manifest: Optional[StepManifest] = None) -> List[RenderResult]:
+    return [_render_step(operator=operator,
+                         plan_step=plan_step,
+                         dist_path=dist_path,
+                         manifest=manifest)
+            for plan_step in plan_steps]
+
+
+def render_plan(operators: Union[Mapping[str, Operator], Iterable[Operator]],
+                plan_steps: Iterable[PlanStep],
+                dist_path: Path,
+                max_workers: Optional[int] = None,
+                use_processes: bool = False,
+                incremental: bool = False) -> RenderSummary:
+    """
+    Render the scripts of every step for every operator concurrently.
+    A failing step does not stop the others, it is reported in the
+    summary instead.
+
+    :param operators: The operators, e.g. as returned by
+        :meth:`OperatorDataLoader.load_all_from_file`.
+    :type operators: Union[Mapping[str, :class:`Operator`], Iterable[:class:`Operator`]]
+    :param plan_steps: The steps to render for every operator. Give the
+        steps which pace rate-limited APIs one shared
+        :class:`PacingScheduler` as *pacing*, so that the scripts of the
+        operators, which run side by side, stagger their sleeps.
+    :type plan_steps: Iterable[:class:`PlanStep`]
+    :param dist_path: The path to the distribution directory.
+    :type dist_path: Path
+    :param max_workers: Maximum number of workers. 1 renders in the
+        calling thread. None uses the default of the pool.
+    :type max_workers: int
+    :param use_processes: Use a process pool instead of a thread pool.
+        Each process renders all steps of an operator, so that the
+        operator and its resources are pickled only once.
+    :type use_processes: bool
+    :param incremental: Skip the scripts whose content is the same as
+        recorded in the manifest of *dist_path*, and update the manifest.
+        The scripts in the manifest which the plan no longer produces are
+        dropped from it and reported as orphaned in the summary.
+    :type incremental: bool
+
+    :return: The summary.
+    :rtype: :class:`RenderSummary`
+    """
+
+    if isinstance(operators, Mapping):
+        operators = operators.values()
+    operators = list(operators)
+    plan_steps = list(plan_steps)
+    manifest = StepManifest.load(dist_path) if incremental else None
+
+    start = time.perf_counter()
+    _schedule_pacing(operators=operators, plan_steps=plan_steps, dist_path=dist_path)
+    if max_workers == 1:
+        results = [result for operator in operators
+                   for result in _render_operator(operator, plan_steps, dist_path, manifest)]
+    else:
+        executor: Executor = ProcessPoolExecutor(max_workers=max_workers) \
+            if use_processes else ThreadPoolExecutor(max_workers=max_workers)
+        with executor:
+            if use_processes:
+                futures = [executor.submit(_render_operator,
+                                           operator, plan_steps, dist_path, manifest)
+                           for operator in operators]
+                results = [result for future in futures for result in future.result()]
+            else:
+                futures = [executor.submit(_render_step,
+                                           operator, plan_step, dist_path, manifest)
+                           for operator in operators
+                           for plan_step in plan_steps]
+                results = [future.result() for future in futures]
+
+    orphaned = list()
+    if manifest is not None:
+        # Worker processes update their own copies of the manifest
+        for result in results:
+            if result.changed:
+                manifest.record(filename=result.filepath.name, digest=result.digest)
+            elif result.filepath is not None:
+                manifest.keep(filename=result.filepath.name)
+        orphaned = [dist_path.joinpath(filename) for filename in manifest.orphaned]
+        manifest.save()
+
+    return RenderSummary(results=results,
+                         elapsed=time.perf_counter() - start,
+                         orphaned=orphaned)
@@ -1,9 +1,275 @@
+import os
+import tempfile
 from abc import ABC, abstractmethod
-from io import TextIOWrapper
+from io import StringIO, TextIOWrapper
 from pathlib import Path
-from typing import List
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Mapping,
+                    Optional, Set, TextIO, Tuple, Union)
 
 from axolpy.cloudmaintenance import Operator
+from axolpy.cloudmaintenance.inventory import resource_path
+from axolpy.cloudmaintenance.manifest import StepManifest, content_digest
+from axolpy.cloudmaintenance.pacing import (API_ECS_UPDATE_SERVICE,
+                                            API_RDS_MODIFY_DB_INSTANCE,
+                                            PacingScheduler, format_delay)
+from axolpy.kubernetes import Cluster, Deployment, StatefulSet
+
+# Actions of the commands in the structured plan
+ACTION_ECS_UPDATE_SERVICE = "ecs:update-service"
+ACTION_ECS_FORCE_NEW_DEPLOYMENT = "ecs:force-new-deployment"
+ACTION_ECS_DESCRIBE_SERVICES = "ecs:describe-services"
+ACTION_RDS_MODIFY_DB_INSTANCE = "rds:modify-db-instance"
+ACTION_RDS_DESCRIBE_DB_INSTANCES = "rds:describe-db-instances"
+ACTION_KUBECTL_SCALE = "kubectl:scale"
+ACTION_KUBECTL_ROLLOUT_RESTART = "kubectl:rollout-restart"
+ACTION_KUBECTL_GET_DEPLOYMENTS = "kubectl:get-deployments"
+ACTION_PSQL_DUMP_PGSTATS = "psql:dump-pgstats"
+ACTION_MYSQL_DUMP_TABLE_STATUS = "mysql:dump-table-status"
+
+# Kinds of the clusters the commands work on, by the tool of the action
+_CLUSTER_KINDS = {"ecs": "ecs", "kubectl": "eks"}
+
+# Distribution directories known to exist, so that they are created only
+# once however many scripts are written into them
+_created_dist_paths: Set[Path] = set()
+
+
+def _make_dist_path(path: Path, exist: bool = True) -> None:
+    """
+    Create a distribution directory unless it is known to exist.
+
+    :param path: The path to the distribution directory.
+    :type path: Path
+    :param exist: False if the directory is found missing, e.g. it is
+        removed after it was created.
+    :type exist: bool
+    """
+
+    if exist and path in _created_dist_paths:
+        return
+
+    path.mkdir(mode=0o755, parents=True, exist_ok=True)
+    _created_dist_paths.add(path)
+
+
+def _replace_file(filepath: Path, content: Union[str, Callable[[TextIO], None]]) -> None:
+    """
+    Write an executable script into a temporary file and rename it into
+    place, so that the script is either complete or not changed.
+
+    :param filepath: Path of the script.
+    :type filepath: Path
+    :param content: Content of the script, or a function streaming it
+        into the temporary file.
+    :type content: Union[str, Callable[[TextIO], None]]
+    """
+
+    _make_dist_path(filepath.parent)
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=filepath.parent,
+                                         prefix=f".{filepath.name}.",
+                                         suffix=".tmp")
+    except FileNotFoundError:
+        _make_dist_path(filepath.parent, exist=False)
+        fd, temp_path = tempfile.mkstemp(dir=filepath.parent,
+                                         prefix=f".{filepath.name}.",
+                                         suffix=".tmp")
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            if callable(content):
+                content(f)
+            else:
+                f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+            os.fchmod(f.fileno(), 0o755)
+        os.replace(temp_path, filepath)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _eks_region_name(cluster: Cluster) -> Optional[str]:
+    region = getattr(cluster.platform_ref, "region", None)
+    return region.name if region else None
+
+
+class StepCommand(object):
+    """
+    A command produced by a cloud maintenance step, with the region and
+    cluster it works on.
+    """
+
+    __slots__ = ("_line", "_region", "_cluster", "_resource", "_resources",
+                 "_api", "_action", "_arguments")
+
+    def __init__(self,
+                 line: str,
+                 region: Optional[str] = None,
+                 cluster: Optional[str] = None,
+                 resource: Any = None,
+                 api: Optional[str] = None,
+                 action: Optional[str] = None,
+                 arguments: Optional[Mapping[str, Any]] = None,
+                 resources: Optional[Iterable[Any]] = None) -> None:
+        """
+        Initialize a step command.
+
+        :param line: The line of the command in the script. It is
+            commented out if the script only shows it for review.
+        :type line: str
+        :param region: Name of the region the command works on.
+        :type region: str
+        :param cluster: Name of the ECS or EKS cluster the command works on.
+        :type cluster: str
+        :param resource: The resource the command works on. The commands
+            of the same resource must run one after another.
+        :type resource: Any
+        :param api: The rate-limited API family the command calls, e.g.
+            'ecs:UpdateService', so that it is paced.
+        :type api: str
+        :param action: What the command does, e.g. 'ecs:update-service'.
+        :type action: str
+        :param arguments: The values the command is made of, e.g. the
+            cluster and the desired count.
+        :type arguments: Mapping[str, Any]
+        :param resources: The resources a command which works on many
+            resources at once works on, e.g. the deployments scaled by
+            one batched command.
+        :type resources: Iterable[Any]
+        """
+
+        assert resource is None or resources is None, \
+            "resource and resources cannot be given together"
+
+        self._line: str = line
+        self._region: Optional[str] = region
+        self._cluster: Optional[str] = cluster
+        self._resource: Any = resource
+        self._resources: Tuple[Any, ...] = tuple(resources) if resources is not None \
+            else ((resource,) if resource is not None else ())
+        self._api: Optional[str] = api
+        self._action: Optional[str] = action
+        self._arguments: Dict[str, Any] = dict(arguments) if arguments else dict()
+
+    @property
+    def line(self) -> str:
+        return self._line
+
+    @property
+    def command(self) -> str:
+        """
+        The command to run, i.e. the line without the comment mark.
+        """
+
+        return self._line[2:] if self.commented else self._line
+
+    @property
+    def commented(self) -> bool:
+        return self._line.startswith("# ")
+
+    @property
+    def region(self) -> Optional[str]:
+        return self._region
+
+    @property
+    def cluster(self) -> Optional[str]:
+        return self._cluster
+
+    @property
+    def cluster_kind(self) -> Optional[str]:
+        """
+        Kind of the cluster the command works on, i.e. 'ecs' or 'eks', as
+        an ECS cluster and an EKS cluster may have the same name.
+        """
+
+        if self._cluster is None or self._action is None:
+            return None
+
+        return _CLUSTER_KINDS.get(self._action.split(":", 1)[0])
+
+    @property
+    def resource(self) -> Any:
+        return self._resource
+
+    @property
+    def resources(self) -> Tuple[Any, ...]:
+        """
+        All resources the command works on, i.e. the resource of the
+        command or the resources of a batched command.
+        """
+
+        return self._resources
+
+    @property
+    def api(self) -> Optional[str]:
+        return self._api
+
+    @property
+    def action(self) -> Optional[str]:
+        return self._action
+
+    @property
+    def arguments(self) -> Dict[str, Any]:
+        return self._arguments
+
+    @property
+    def resource_path(self) -> Optional[str]:
+        """
+        Path of the resource in the inventory, see
+        :func:`axolpy.cloudmaintenance.inventory.resource_path`, e.g.
+        ap-east-1/ecs/Production/service/p-api, or None if the command
+        works on many resources.
+        """
+
+        return resource_path(self._resource) if self._resource is not None else None
+
+    def __str__(self) -> str:
+        return f"{__class__.__name__}(region: {self._region}" + \
+            f", cluster: {self._cluster}, command: {self.command})"
+
+
+def _batch_scale_commands(cmd: str,
+                          name_format: str,
+                          workload_replicas: Iterable[Tuple[Any, int]]) -> Iterator[StepCommand]:
+    """
+    Group workloads by cluster, namespace and target replica count, and
+    scale each group with one command.
+
+    :param cmd: Template of the command with namespace, names and replicas.
+    :type cmd: str
+    :param name_format: Template of a workload in the command.
+    :type name_format: str
+    :param workload_replicas: Workloads and their target replica counts.
+    :type workload_replicas: Iterable[Tuple[Any, int]]
+
+    :return: The commands in the order the groups first appear.
+    :rtype: Iterator[:class:`StepCommand`]
+    """
+
+    groups: Dict[Tuple[int, str, int], List[Any]] = dict()
+    for workload, replicas in workload_replicas:
+        groups.setdefault((id(workload.namespace.cluster), workload.namespace.name, replicas),
+                          list()).append(workload)
+
+    for (_, namespace, replicas), workloads in groups.items():
+        cluster = workloads[0].namespace.cluster
+        yield StepCommand(line=cmd.format(
+            namespace=namespace,
+            names=" ".join(name_format.format(name=w.name) for w in workloads),
+            replicas=replicas),
+            region=_eks_region_name(cluster),
+            cluster=cluster.name,
+            action=ACTION_KUBECTL_SCALE,
+            arguments={"namespace": namespace,
+                       "names": [w.name for w in workloads],
+                       "replicas": replicas},
+            resources=workloads)
 
 
 class CloudMaintenanceStep(ABC):
@@ -22,7 +288,8 @@ class CloudMaintenanceStep(ABC):
     def __init__(self,
                  step_no: int,
                  operator: Operator,
-                 dist_path: Path) -> None:
+                 dist_path: Path,
+                 pacing: Optional[PacingScheduler] = None) -> None:
         """
         Initialize a cloud maintenance step.
 
@@ -32,11 +299,24 @@ class CloudMaintenanceStep(ABC):
         :type operator: :class:`Operator`
         :param dist_path: The path to the distribution directory.
         :type dist_path: Path
+        :param pacing: The scheduler whose rate limits pace the commands
+            of rate-limited APIs in the script. None uses the default
+            rate limits.
+        :type pacing: :class:`PacingScheduler`
         """
 
         self._step_no: str = step_no
         self._operator: Operator = operator
         self._dist_path: Path = dist_path
+        self._pacing: Optional[PacingScheduler] = pacing
+
+    @property
+    def step_no(self) -> int:
+        return self._step_no
+
+    @property
+    def operator(self) -> Operator:
+        return self._operator
 
     def filename(self) -> str:
         return "{operator}-{step_no}-{file_step_name}{file_step_name_suffix}.{file_extenstion}".format(
@@ -54,21 +334,171 @@ class CloudMaintenanceStep(ABC):
     def eligible(self) -> bool:
         pass
 
-    def write_file(self) -> None:
+    @abstractmethod
+    def commands(self) -> Iterator[StepCommand]:
+        """
+        Iterate the commands of this step in the order of the script.
+
+        :return: The commands.
+        :rtype: Iterator[:class:`StepCommand`]
+        """
+
+        pass
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Iterate the lines of the script lazily, each ending with a newline.
+        Commands of rate-limited APIs are preceded by the sleeps their
+        rate limits need.
+
+        :return: The lines.
+        :rtype: Iterator[str]
+        """
+
+        yield from self._content_header
+        for command, delay in self._paced_commands():
+            if delay > 0:
+                yield ("# " if command.commented else "") + \
+                    f"sleep {format_delay(delay)}\n"
+            yield command.line + "\n"
+
+    def _paced_commands(self) -> Iterator[Tuple[StepCommand, float]]:
+        # The scripts of the steps with the same number run side by side,
+        # so the steps given the same pacing scheduler share its schedule,
+        # while a script without one has the rate limits to itself
+        pacing = self._pacing if self._pacing is not None else PacingScheduler()
+        yield from pacing.scripts.pace(key=str(self.output_filepath()),
+                                       commands=self.commands(),
+                                       group=self._step_no)
+
+    def schedule(self) -> None:
+        """
+        Schedule the calls of rate-limited APIs of the script on the
+        schedule of its pacing scheduler, so that the scripts are given
+        their sleeps in this order rather than in the order they are
+        rendered.
+        """
+
+        for _ in self._paced_commands():
+            pass
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate the commands of this step as plain records which can be
+        serialised, e.g. to JSON, so that other tools need not parse the
+        script.
+
+        :return: A record per command with the operator, step, index,
+            action, resource path, region, cluster, arguments, command and
+            pacing hints, i.e. the API family, its rate limit and the
+            seconds the script waits before the command.
+        :rtype: Iterator[Dict[str, Any]]
+        """
+
+        pacing = self._pacing or PacingScheduler()
+        for index, (command, delay) in enumerate(self._paced_commands()):
+            limit = pacing.limit(api=command.api, region=command.region) \
+                if command.api is not None else None
+            yield {"operator": self._operator.id,
+                   "step_no": self._step_no,
+                   "step": self.__class__.__name__,
+                   "filename": self.filename(),
+                   "index": index,
+                   "action": command.action,
+                   "resource": command.resource_path,
+                   "region": command.region,
+                   "cluster": command.cluster,
+                   "arguments": command.arguments,
+                   "command": command.command,
+                   "commented": command.commented,
+                   "pacing": {"api": command.api,
+                              "rate": limit.rate,
+                              "burst": limit.burst,
+                              "delay": delay} if limit is not None else None}
+
+    def write_to(self, file: TextIO) -> None:
+        """
+        Stream the script into a text stream, e.g. sys.stdout or a socket
+        file, without keeping it in memory.
+
+        :param file: The text stream.
+        :type file: TextIO
+        """
+
+        self._write_file_content(file=file)
+
+    def render(self) -> str:
+        """
+        Render the content of the script.
+
+        :return: The content.
+        :rtype: str
+        """
+
+        buffer = StringIO()
+        self._write_file_content(file=buffer)
+
+        return buffer.getvalue()
+
+    def write_file(self,
+                   atomic: bool = True,
+                   manifest: Optional[StepManifest] = None) -> bool:
+        """
+        Write the script if the step is eligible for the operator.
+
+        :param atomic: Stream the script into a temporary file and rename
+            it into place, so that a crash never leaves a partial script.
+            Otherwise the script is written directly.
+        :type atomic: bool
+        :param manifest: Manifest of the distribution directory. The
+            script is not written if the manifest shows that it already
+            has the same content, otherwise its digest is recorded. The
+            manifest is only updated in memory, so the caller must call
+            :meth:`StepManifest.save` after writing all the scripts.
+        :type manifest: :class:`StepManifest`
+
+        :return: True if the script is written.
+        :rtype: bool
+        """
+
         if not self.eligible():
-            return
+            return False
 
         filepath = self.output_filepath()
-        filepath.parent.mkdir(mode=0o755,
-                              parents=True,
-                              exist_ok=True)
-        with filepath.open("w") as f:
-            self._write_file_content(file=f)
-        filepath.chmod(0o755)
+        if not atomic and manifest is None:
+            filepath.parent.mkdir(mode=0o755,
+                                  parents=True,
+                                  exist_ok=True)
+            with filepath.open("w", encoding="utf-8") as f:
+                self._write_file_content(file=f)
+            filepath.chmod(0o755)
+            return True
+
+        if manifest is None:
+            _replace_file(filepath=filepath, content=self.write_to)
+            return True
+
+        # The digest of the whole content is needed before it is written
+        content = self.render()
+        digest = content_digest(content)
+        if manifest.unchanged(filename=filepath.name, digest=digest):
+            manifest.keep(filename=filepath.name)
+            return False
+
+        if atomic:
+            _replace_file(filepath=filepath, content=content)
+        else:
+            filepath.parent.mkdir(mode=0o755,
+                                  parents=True,
+                                  exist_ok=True)
+            filepath.write_text(content, encoding="utf-8")
+            filepath.chmod(0o755)
+        manifest.record(filename=filepath.name, digest=digest)
+
+        return True
 
-    @abstractmethod
     def _write_file_content(self, file: TextIOWrapper) -> None:
-        pass
+        file.writelines(self.iter_lines())
 
 
 class UpdateECSTaskCount(CloudMaintenanceStep):
@@ -91,8 +521,10 @@ class UpdateECSTaskCount(CloudMaintenanceStep):
                  step_no: int,
                  operator: Operator,
                  dist_path: Path,
-                 zeroinfy: bool = False) -> None:
-        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
+                 zeroinfy: bool = False,
+                 pacing: Optional[PacingScheduler] = None) -> None:
+        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path,
+                         pacing=pacing)
         self._zeroinfy = zeroinfy
         if self._zeroinfy:
             self._file_step_name_suffix = "ZERO"
@@ -100,23 +532,25 @@ class UpdateECSTaskCount(CloudMaintenanceStep):
     def eligible(self) -> bool:
         return True if len(self._operator.ecs_services) > 0 else False
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for i, service in enumerate(self._operator.ecs_services):
-            if not service.property("restart_after_upgrade"):
-                count = service.desired_count
-                if self._zeroinfy:
-                    count = 0
-                elif service.patch and service.patch.desired_count > 0:
-                    count = service.patch.desired_count
-
-                file.write(self._cmd[0].format(
-                    region=service.cluster.region.name,
-                    cluster=service.cluster.name,
-                    name=service.name,
-                    count=count) + "\n")
-                if i < len(self._operator.ecs_services) - 1:
-                    file.write("# sleep 2\n")
+    def commands(self) -> Iterator[StepCommand]:
+        for service in self._operator.ecs_services_by_restart_after_upgrade(False):
+            count = service.desired_count
+            if self._zeroinfy:
+                count = 0
+            elif service.patch and service.patch.desired_count > 0:
+                count = service.patch.desired_count
+
+            arguments = {"region": service.cluster.region.name,
+                         "cluster": service.cluster.name,
+                         "name": service.name,
+                         "count": count}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=service.cluster.region.name,
+                              cluster=service.cluster.name,
+                              resource=service,
+                              api=API_ECS_UPDATE_SERVICE,
+                              action=ACTION_ECS_UPDATE_SERVICE,
+                              arguments=arguments)
 
 
 class UpdateK8sStatefulSetReplicas(CloudMaintenanceStep):
@@ -130,6 +564,10 @@ class UpdateK8sStatefulSetReplicas(CloudMaintenanceStep):
 
     _cmd: List[str] = [
         "# kubectl scale -n {namespace} statefulsets {name} --replicas={replicas}"]
+    # Scale the statefulsets of a namespace that have the same replica count
+    # in one command
+    _batch_cmd: str = "# kubectl scale -n {namespace} statefulsets {names} --replicas={replicas}"
+    _batch_name: str = "{name}"
 
     _content_header: List[str] = ["#!/bin/bash\n\n"]
 
@@ -139,33 +577,55 @@ class UpdateK8sStatefulSetReplicas(CloudMaintenanceStep):
                  step_no: int,
                  operator: Operator,
                  dist_path: Path,
-                 zeroinfy: bool = False) -> None:
+                 zeroinfy: bool = False,
+                 batch: bool = False) -> None:
+        """
+        Initialize the step.
+
+        :param zeroinfy: Scale the statefulsets to zero instead of their
+            patched or current replicas.
+        :type zeroinfy: bool
+        :param batch: Scale the statefulsets of a namespace which have the
+            same target replica count in one command.
+        :type batch: bool
+        """
+
         super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
         self._zeroinfy = zeroinfy
+        self._batch: bool = batch
         if self._zeroinfy:
             self._file_step_name_suffix = "ZERO"
 
     def eligible(self) -> bool:
-        for deployment in self._operator.eks_statefulsets:
-            if not deployment.property("restart_after_upgrade"):
-                return True
-
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for statefulset in self._operator.eks_statefulsets:
-            if not statefulset.property("restart_after_upgrade"):
-                replicas = statefulset.replicas
-                if self._zeroinfy:
-                    replicas = 0
-                elif statefulset.patch and statefulset.patch.replicas > 0:
-                    replicas = statefulset.patch.replicas
+        return len(self._operator.eks_statefulsets_by_restart_after_upgrade(False)) > 0
+
+    def _target_replicas(self) -> Iterator[Tuple[StatefulSet, int]]:
+        for statefulset in self._operator.eks_statefulsets_by_restart_after_upgrade(False):
+            replicas = statefulset.replicas
+            if self._zeroinfy:
+                replicas = 0
+            elif statefulset.patch and statefulset.patch.replicas > 0:
+                replicas = statefulset.patch.replicas
+
+            yield statefulset, replicas
+
+    def commands(self) -> Iterator[StepCommand]:
+        if self._batch:
+            yield from _batch_scale_commands(cmd=self._batch_cmd,
+                                             name_format=self._batch_name,
+                                             workload_replicas=self._target_replicas())
+            return
 
-                file.write(self._cmd[0].format(
-                    namespace=statefulset.namespace.name,
-                    name=statefulset.name,
-                    replicas=replicas) + "\n")
+        for statefulset, replicas in self._target_replicas():
+            arguments = {"namespace": statefulset.namespace.name,
+                         "name": statefulset.name,
+                         "replicas": replicas}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=_eks_region_name(statefulset.namespace.cluster),
+                              cluster=statefulset.namespace.cluster.name,
+                              resource=statefulset,
+                              action=ACTION_KUBECTL_SCALE,
+                              arguments=arguments)
 
 
 class UpdateK8sDeploymentReplicas(CloudMaintenanceStep):
@@ -179,6 +639,10 @@ class UpdateK8sDeploymentReplicas(CloudMaintenanceStep):
 
     _cmd: List[str] = [
         "# kubectl scale -n {namespace} deployment/{name} --replicas={replicas}"]
+    # Scale the deployments of a namespace that have the same replica count
+    # in one command
+    _batch_cmd: str = "# kubectl scale -n {namespace} {names} --replicas={replicas}"
+    _batch_name: str = "deployment/{name}"
 
     _content_header: List[str] = ["#!/bin/bash\n\n"]
 
@@ -188,33 +652,55 @@ class UpdateK8sDeploymentReplicas(CloudMaintenanceStep):
                  step_no: int,
                  operator: Operator,
                  dist_path: Path,
-                 zeroinfy: bool = False) -> None:
+                 zeroinfy: bool = False,
+                 batch: bool = False) -> None:
+        """
+        Initialize the step.
+
+        :param zeroinfy: Scale the deployments to zero instead of their
+            patched or current replicas.
+        :type zeroinfy: bool
+        :param batch: Scale the deployments of a namespace which have the
+            same target replica count in one command.
+        :type batch: bool
+        """
+
         super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
         self._zeroinfy = zeroinfy
+        self._batch: bool = batch
         if self._zeroinfy:
             self._file_step_name_suffix = "ZERO"
 
     def eligible(self) -> bool:
-        for deployment in self._operator.eks_deployments:
-            if not deployment.property("restart_after_upgrade"):
-                return True
-
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for deployment in self._operator.eks_deployments:
-            if not deployment.property("restart_after_upgrade"):
-                replicas = deployment.replicas
-                if self._zeroinfy:
-                    replicas = 0
-                elif deployment.patch and deployment.patch.replicas > 0:
-                    replicas = deployment.patch.replicas
+        return len(self._operator.eks_deployments_by_restart_after_upgrade(False)) > 0
+
+    def _target_replicas(self) -> Iterator[Tuple[Deployment, int]]:
+        for deployment in self._operator.eks_deployments_by_restart_after_upgrade(False):
+            replicas = deployment.replicas
+            if self._zeroinfy:
+                replicas = 0
+            elif deployment.patch and deployment.patch.replicas > 0:
+                replicas = deployment.patch.replicas
+
+            yield deployment, replicas
+
+    def commands(self) -> Iterator[StepCommand]:
+        if self._batch:
+            yield from _batch_scale_commands(cmd=self._batch_cmd,
+                                             name_format=self._batch_name,
+                                             workload_replicas=self._target_replicas())
+            return
 
-                file.write(self._cmd[0].format(
-                    namespace=deployment.namespace.name,
-                    name=deployment.name,
-                    replicas=replicas) + "\n")
+        for deployment, replicas in self._target_replicas():
+            arguments = {"namespace": deployment.namespace.name,
+                         "name": deployment.name,
+                         "replicas": replicas}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=_eks_region_name(deployment.namespace.cluster),
+                              cluster=deployment.namespace.cluster.name,
+                              resource=deployment,
+                              action=ACTION_KUBECTL_SCALE,
+                              arguments=arguments)
 
 
 class DumpPgstats(CloudMaintenanceStep):
@@ -237,20 +723,22 @@ class DumpPgstats(CloudMaintenanceStep):
         super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
 
     def eligible(self) -> bool:
-        for db in self._operator.rds_databases:
-            if db.is_postgresql():
-                return True
+        return len(self._operator.postgresql_databases) > 0
 
-        return False
+    def commands(self) -> Iterator[StepCommand]:
+        for db in self._operator.postgresql_databases:
+            arguments = {"host": db.host, "port": db.port, "dbname": db.dbname, "id": db.id}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=db.region.name,
+                              resource=db,
+                              action=ACTION_PSQL_DUMP_PGSTATS,
+                              arguments=arguments)
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for db in self._operator.rds_databases:
-            if db.is_postgresql():
-                file.write(
-                    "echo \"database id: {id}\"\n".format(id=db.id))
-                file.write(self._cmd[0].format(
-                    host=db.host, port=db.port, dbname=db.dbname, id=db.id) + "\n")
+    def iter_lines(self) -> Iterator[str]:
+        yield from self._content_header
+        for command in self.commands():
+            yield "echo \"database id: {id}\"\n".format(id=command.resource.id)
+            yield command.line + "\n"
 
 
 class DumpMysqlTableStatus(CloudMaintenanceStep):
@@ -273,19 +761,22 @@ class DumpMysqlTableStatus(CloudMaintenanceStep):
         super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
 
     def eligible(self) -> bool:
-        for db in self._operator.rds_databases:
-            if db.is_mysql():
-                return True
+        return len(self._operator.mysql_databases) > 0
 
-        return False
+    def commands(self) -> Iterator[StepCommand]:
+        for db in self._operator.mysql_databases:
+            arguments = {"host": db.host, "port": db.port, "dbname": db.dbname, "id": db.id}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=db.region.name,
+                              resource=db,
+                              action=ACTION_MYSQL_DUMP_TABLE_STATUS,
+                              arguments=arguments)
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for db in self._operator.rds_databases:
-            if db.is_mysql():
-                file.write("echo \"database id: {id}\"\n".format(id=db.id))
-                file.write(self._cmd[0].format(
-                    host=db.host, port=db.port, dbname=db.dbname, id=db.id) + "\n")
+    def iter_lines(self) -> Iterator[str]:
+        yield from self._content_header
+        for command in self.commands():
+            yield "echo \"database id: {id}\"\n".format(id=command.resource.id)
+            yield command.line + "\n"
 
 
 class ModifyDatabaseEngineVersion(CloudMaintenanceStep):
@@ -304,26 +795,25 @@ class ModifyDatabaseEngineVersion(CloudMaintenanceStep):
     def __init__(self,
                  step_no: int,
                  operator: Operator,
-                 dist_path: Path) -> None:
-        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
+                 dist_path: Path,
+                 pacing: Optional[PacingScheduler] = None) -> None:
+        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path,
+                         pacing=pacing)
 
     def eligible(self) -> bool:
-        for db in self._operator.rds_databases:
-            if db.patch and hasattr(db.patch, "engine_version"):
-                return True
+        return len(self._operator.patched_databases) > 0
 
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for i, db in enumerate(self._operator.rds_databases):
-            if db.patch and db.patch.engine_version:
-                file.write(self._cmd[0].format(
-                    region=db.region.name,
-                    id=db.id,
-                    version=db.patch.engine_version) + "\n")
-                if i < len(self._operator.rds_databases) - 1:
-                    file.write("# sleep 2\n")
+    def commands(self) -> Iterator[StepCommand]:
+        for db in self._operator.engine_version_patched_databases:
+            arguments = {"region": db.region.name,
+                         "id": db.id,
+                         "version": db.patch.engine_version}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=db.region.name,
+                              resource=db,
+                              api=API_RDS_MODIFY_DB_INSTANCE,
+                              action=ACTION_RDS_MODIFY_DB_INSTANCE,
+                              arguments=arguments)
 
 
 class ModifyDatabaseClassType(CloudMaintenanceStep):
@@ -342,26 +832,25 @@ class ModifyDatabaseClassType(CloudMaintenanceStep):
     def __init__(self,
                  step_no: int,
                  operator: Operator,
-                 dist_path: Path) -> None:
-        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
+                 dist_path: Path,
+                 pacing: Optional[PacingScheduler] = None) -> None:
+        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path,
+                         pacing=pacing)
 
     def eligible(self) -> bool:
-        for db in self._operator.rds_databases:
-            if db.patch and hasattr(db.patch, "class_type"):
-                return True
+        return len(self._operator.patched_databases) > 0
 
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for i, db in enumerate(self._operator.rds_databases):
-            if db.patch and db.patch.class_type:
-                file.write(self._cmd[0].format(
-                    region=db.region.name,
-                    id=db.id,
-                    class_type=db.patch.class_type) + "\n")
-                if i < len(self._operator.rds_databases) - 1:
-                    file.write("# sleep 2\n")
+    def commands(self) -> Iterator[StepCommand]:
+        for db in self._operator.class_type_patched_databases:
+            arguments = {"region": db.region.name,
+                         "id": db.id,
+                         "class_type": db.patch.class_type}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=db.region.name,
+                              resource=db,
+                              api=API_RDS_MODIFY_DB_INSTANCE,
+                              action=ACTION_RDS_MODIFY_DB_INSTANCE,
+                              arguments=arguments)
 
 
 class QueryDatabaseStatus(CloudMaintenanceStep):
@@ -373,10 +862,13 @@ class QueryDatabaseStatus(CloudMaintenanceStep):
     _file_extension: str = "sh"
 
     _cmd: List[str] = [
-        "aws rds describe-db-instances --region {region} --db-instance-identifier {id} --query 'DBInstances[*].{{DBInstanceIdentifier:DBInstanceIdentifier,DBInstanceClass:DBInstanceClass,Engine:Engine,DBInstanceStatus:DBInstanceStatus,DBName:DBName,Endpoint:Endpoint,EngineVersion:EngineVersion}}'"]
+        "aws rds describe-db-instances --region {region} --filters Name=db-instance-id,Values={ids} --query 'DBInstances[*].{{DBInstanceIdentifier:DBInstanceIdentifier,DBInstanceClass:DBInstanceClass,Engine:Engine,DBInstanceStatus:DBInstanceStatus,DBName:DBName,Endpoint:Endpoint,EngineVersion:EngineVersion}}'"]
 
     _content_header: List[str] = ["#!/bin/bash\n\n"]
 
+    # Maximum number of databases described in one call
+    _chunk_size: int = 100
+
     def __init__(self,
                  step_no: int,
                  operator: Operator,
@@ -386,14 +878,19 @@ class QueryDatabaseStatus(CloudMaintenanceStep):
     def eligible(self) -> bool:
         return True if len(self._operator.rds_databases) > 0 else False
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for i, db in enumerate(self._operator.rds_databases):
-            file.write(self._cmd[0].format(
-                region=db.region.name,
-                id=db.id) + "\n")
-            if i < len(self._operator.rds_databases) - 1:
-                file.write("sleep 2\n")
+    def commands(self) -> Iterator[StepCommand]:
+        region_dbs = dict()
+        for db in self._operator.rds_databases:
+            region_dbs.setdefault(db.region.name, list()).append(db)
+        for region_name, dbs in region_dbs.items():
+            for chunk in _chunks(dbs, self._chunk_size):
+                yield StepCommand(line=self._cmd[0].format(
+                    region=region_name,
+                    ids=",".join(db.id for db in chunk)),
+                    region=region_name,
+                    action=ACTION_RDS_DESCRIBE_DB_INSTANCES,
+                    arguments={"region": region_name,
+                               "ids": [db.id for db in chunk]})
 
 
 class RestartK8sDeployment(CloudMaintenanceStep):
@@ -419,23 +916,29 @@ class RestartK8sDeployment(CloudMaintenanceStep):
         super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
 
     def eligible(self) -> bool:
-        for deployment in self._operator.eks_deployments:
-            if deployment.property("restart_after_upgrade"):
-                return True
-
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for deployment in self._operator.eks_deployments:
-            if deployment.property("restart_after_upgrade"):
-                file.write(self._cmd[0].format(
-                    namespace=deployment.namespace.name, name=deployment.name) + "\n")
-                if deployment.patch and deployment.patch.replicas > 0:
-                    file.write(self._cmd[1].format(
-                        namespace=deployment.namespace.name,
-                        name=deployment.name,
-                        replicas=deployment.patch.replicas) + "\n")
+        return len(self._operator.eks_deployments_by_restart_after_upgrade(True)) > 0
+
+    def commands(self) -> Iterator[StepCommand]:
+        for deployment in self._operator.eks_deployments_by_restart_after_upgrade(True):
+            region = _eks_region_name(deployment.namespace.cluster)
+            cluster = deployment.namespace.cluster.name
+            arguments = {"namespace": deployment.namespace.name, "name": deployment.name}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=region,
+                              cluster=cluster,
+                              resource=deployment,
+                              action=ACTION_KUBECTL_ROLLOUT_RESTART,
+                              arguments=arguments)
+            if deployment.patch and deployment.patch.replicas > 0:
+                arguments = {"namespace": deployment.namespace.name,
+                             "name": deployment.name,
+                             "replicas": deployment.patch.replicas}
+                yield StepCommand(line=self._cmd[1].format(**arguments),
+                                  region=region,
+                                  cluster=cluster,
+                                  resource=deployment,
+                                  action=ACTION_KUBECTL_SCALE,
+                                  arguments=arguments)
 
 
 class RestartECSService(CloudMaintenanceStep):
@@ -456,26 +959,26 @@ class RestartECSService(CloudMaintenanceStep):
     def __init__(self,
                  step_no: int,
                  operator: Operator,
-                 dist_path: Path) -> None:
-        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path)
+                 dist_path: Path,
+                 pacing: Optional[PacingScheduler] = None) -> None:
+        super().__init__(step_no=step_no, operator=operator, dist_path=dist_path,
+                         pacing=pacing)
 
     def eligible(self) -> bool:
-        for service in self._operator.ecs_services:
-            if service.property("restart_after_upgrade"):
-                return True
-
-        return False
-
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
-        for i, service in enumerate(self._operator.ecs_services):
-            if service.property("restart_after_upgrade"):
-                file.write(self._cmd[0].format(
-                    region=service.cluster.region.name,
-                    cluster=service.cluster.name,
-                    name=service.name) + "\n")
-                if i < len(self._operator.ecs_services) - 1:
-                    file.write("# sleep 2\n")
+        return len(self._operator.ecs_services_by_restart_after_upgrade(True)) > 0
+
+    def commands(self) -> Iterator[StepCommand]:
+        for service in self._operator.ecs_services_by_restart_after_upgrade(True):
+            arguments = {"region": service.cluster.region.name,
+                         "cluster": service.cluster.name,
+                         "name": service.name}
+            yield StepCommand(line=self._cmd[0].format(**arguments),
+                              region=service.cluster.region.name,
+                              cluster=service.cluster.name,
+                              resource=service,
+                              api=API_ECS_UPDATE_SERVICE,
+                              action=ACTION_ECS_FORCE_NEW_DEPLOYMENT,
+                              arguments=arguments)
 
 
 class QueryK8sDeploymentStatus(CloudMaintenanceStep):
@@ -501,17 +1004,22 @@ class QueryK8sDeploymentStatus(CloudMaintenanceStep):
     def eligible(self) -> bool:
         return True if len(self._operator.eks_deployments) > 0 else False
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
+    def commands(self) -> Iterator[StepCommand]:
         namespace_dpms = dict()
         for dpm in self._operator.eks_deployments:
             if dpm.namespace.name not in namespace_dpms:
                 namespace_dpms[dpm.namespace.name] = list()
             namespace_dpms[dpm.namespace.name].append(dpm)
         for namespace, deployments in namespace_dpms.items():
-            file.write(self._cmd[0].format(
+            cluster = deployments[0].namespace.cluster
+            yield StepCommand(line=self._cmd[0].format(
                 namespace=namespace,
-                names=" ".join([deployment.name for deployment in deployments])) + "\n")
+                names=" ".join([deployment.name for deployment in deployments])),
+                region=_eks_region_name(cluster),
+                cluster=cluster.name,
+                action=ACTION_KUBECTL_GET_DEPLOYMENTS,
+                arguments={"namespace": namespace,
+                           "names": [deployment.name for deployment in deployments]})
 
 
 class QueryECSTaskStatus(CloudMaintenanceStep):
@@ -527,6 +1035,9 @@ class QueryECSTaskStatus(CloudMaintenanceStep):
 
     _content_header: List[str] = ["#!/bin/bash\n\n"]
 
+    # DescribeServices accepts at most 10 services in a call
+    _chunk_size: int = 10
+
     _zeroinfy: bool = False
 
     def __init__(self,
@@ -538,8 +1049,7 @@ class QueryECSTaskStatus(CloudMaintenanceStep):
     def eligible(self) -> bool:
         return True if len(self._operator.ecs_services) > 0 else False
 
-    def _write_file_content(self, file: TextIOWrapper) -> None:
-        file.writelines(self._content_header)
+    def commands(self) -> Iterator[StepCommand]:
         rc_services = dict()
         for service in self._operator.ecs_services:
             if service.cluster.region.name not in rc_services:
@@ -550,7 +1060,14 @@ class QueryECSTaskStatus(CloudMaintenanceStep):
                 service)
         for region_name, clusters in rc_services.items():
             for cluster_name, services in clusters.items():
-                file.write(self._cmd[0].format(
-                    region=region_name,
-                    cluster=cluster_name,
-                    names=" ".join([service.name for service in services])) + "\n")
+                for chunk in _chunks(services, self._chunk_size):
+                    yield StepCommand(line=self._cmd[0].format(
+                        region=region_name,
+                        cluster=cluster_name,
+                        names=" ".join([service.name for service in chunk])),
+                        region=region_name,
+                        cluster=cluster_name,
+                        action=ACTION_ECS_DESCRIBE_SERVICES,
+                        arguments={"region": region_name,
+                                   "cluster": cluster_name,
+                                   "names": [service.name for service in chunk]})
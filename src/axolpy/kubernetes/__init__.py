@@ -1,7 +1,11 @@
 from __future__ import annotations
 
 from abc import ABC
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from axolpy.util.helper.string import intern_string
+from axolpy.util.types import resource_changes
 
 
 class ClusterCloudPlatformRef(ABC):
@@ -9,7 +13,7 @@ class ClusterCloudPlatformRef(ABC):
     A reference to a cluster in a cloud platform.
     """
 
-    pass
+    __slots__ = ()
 
 
 class AWSClusterRef(ClusterCloudPlatformRef):
@@ -17,6 +21,8 @@ class AWSClusterRef(ClusterCloudPlatformRef):
     AWS Cluster Ref for a cluster in AWS cloud platform.
     """
 
+    __slots__ = ("_region",)
+
     def __init__(self, region: Any) -> None:
         """
         Initialize this Ref.
@@ -33,6 +39,8 @@ class AWSClusterRef(ClusterCloudPlatformRef):
 
 
 class Cluster(object):
+    __slots__ = ("_name", "_namespaces", "_platform_ref")
+
     def __init__(self, name: str, platform_ref: ClusterCloudPlatformRef = None) -> None:
         """
         A Cluster in kubernetes.
@@ -43,7 +51,7 @@ class Cluster(object):
         :type platform_ref: :class:`ClusterCloudPlatformRef`
         """
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._namespaces: Dict[str, Namespace] = dict()
         self._platform_ref: ClusterCloudPlatformRef = platform_ref
 
@@ -55,8 +63,8 @@ class Cluster(object):
         return self._name
 
     @property
-    def namespaces(self) -> Dict[str, Namespace]:
-        return self._namespaces.copy()
+    def namespaces(self) -> Mapping[str, Namespace]:
+        return MappingProxyType(self._namespaces)
 
     def namespace(self, name: str) -> Namespace:
         return self._namespaces[name]
@@ -73,6 +81,8 @@ class Cluster(object):
 
 
 class Namespace(object):
+    __slots__ = ("_name", "_cluster", "_statefulsets", "_deployments")
+
     def __init__(
             self,
             name: str,
@@ -86,7 +96,7 @@ class Namespace(object):
         :type cluster: :class:`Cluster`
         """
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._cluster: Cluster = cluster
         self._statefulsets: Dict[str, StatefulSet] = dict()
         self._deployments: Dict[str, Deployment] = dict()
@@ -102,8 +112,8 @@ class Namespace(object):
         return self._cluster
 
     @property
-    def statefulsets(self) -> Dict[str, StatefulSet]:
-        return self._statefulsets.copy()
+    def statefulsets(self) -> Mapping[str, StatefulSet]:
+        return MappingProxyType(self._statefulsets)
 
     def statefulset(self, name: str) -> StatefulSet:
         return self._statefulsets[name]
@@ -112,8 +122,8 @@ class Namespace(object):
         self._statefulsets[statefulset.name] = statefulset
 
     @property
-    def deployments(self) -> Dict[str, Deployment]:
-        return self._deployments.copy()
+    def deployments(self) -> Mapping[str, Deployment]:
+        return MappingProxyType(self._deployments)
 
     def deployment(self, name: str) -> Deployment:
         return self._deployments[name]
@@ -127,6 +137,8 @@ class Namespace(object):
 
 
 class AbstractStatefulSetPatchable(ABC):
+    __slots__ = ("_replicas",)
+
     def __init__(self, replicas: int) -> None:
         self._replicas: int = replicas
 
@@ -136,6 +148,8 @@ class AbstractStatefulSetPatchable(ABC):
 
 
 class StatefulSetPatch(AbstractStatefulSetPatchable):
+    __slots__ = ()
+
     def __init__(self, replicas: int = -1) -> None:
         super().__init__(replicas=replicas)
 
@@ -144,6 +158,8 @@ class StatefulSetPatch(AbstractStatefulSetPatchable):
 
 
 class StatefulSet(AbstractStatefulSetPatchable):
+    __slots__ = ("_name", "_namespace", "_patch", "_properties")
+
     def __init__(self,
                  name: str,
                  namespace: Namespace,
@@ -165,14 +181,16 @@ class StatefulSet(AbstractStatefulSetPatchable):
 
         super().__init__(replicas=replicas)
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._namespace: Namespace = namespace
         self._patch: StatefulSetPatch = patch
         # Properties is used to store the properties of this StatefulSet
-        # which are not the standard attributes of k8s.
-        self._properties: dict = dict()
-        for k, v in kwargs.items():
-            self.add_property(name=k, value=v)
+        # which are not the standard attributes of k8s. It is created
+        # when the first property is added.
+        self._properties: dict = None
+        if kwargs:
+            self._properties = {intern_string(k): intern_string(v)
+                                for k, v in kwargs.items()}
 
         self._namespace.add_statefulset(statefulset=self)
 
@@ -191,19 +209,29 @@ class StatefulSet(AbstractStatefulSetPatchable):
     @patch.setter
     def patch(self, patch: StatefulSetPatch) -> None:
         self._patch = patch
+        resource_changes.increase()
 
     def add_property(self, name: str, value: Any) -> None:
-        self._properties[name] = value
+        if self._properties is None:
+            self._properties = dict()
+        self._properties[intern_string(name)] = intern_string(value)
+        resource_changes.increase()
+
+    @property
+    def properties(self) -> Mapping[str, Any]:
+        return MappingProxyType(self._properties if self._properties else {})
 
     def property(self, name) -> Any:
-        return self._properties.get(name, None)
+        return self._properties.get(name, None) if self._properties else None
 
     def __str__(self) -> str:
         return f"{__class__.__name__}(name: {self._name}, replicas: {self._replicas}" + \
-            f", {len(self._properties)} properties)"
+            f", {len(self._properties) if self._properties else 0} properties)"
 
 
 class AbstractDeploymentPatchable(ABC):
+    __slots__ = ("_replicas",)
+
     def __init__(self, replicas: int) -> None:
         self._replicas: int = replicas
 
@@ -213,6 +241,8 @@ class AbstractDeploymentPatchable(ABC):
 
 
 class DeploymentPatch(AbstractDeploymentPatchable):
+    __slots__ = ()
+
     def __init__(self, replicas: int = -1) -> None:
         super().__init__(replicas=replicas)
 
@@ -221,6 +251,8 @@ class DeploymentPatch(AbstractDeploymentPatchable):
 
 
 class Deployment(AbstractDeploymentPatchable):
+    __slots__ = ("_name", "_namespace", "_patch", "_properties")
+
     def __init__(self,
                  name: str,
                  namespace: Namespace,
@@ -242,14 +274,16 @@ class Deployment(AbstractDeploymentPatchable):
 
         super().__init__(replicas=replicas)
 
-        self._name: str = name
+        self._name: str = intern_string(name)
         self._namespace: Namespace = namespace
         self._patch: DeploymentPatch = patch
         # Properties is used to store the properties of this Deployment
-        # which are not the standard attributes of k8s.
-        self._properties: dict = dict()
-        for k, v in kwargs.items():
-            self.add_property(name=k, value=v)
+        # which are not the standard attributes of k8s. It is created
+        # when the first property is added.
+        self._properties: dict = None
+        if kwargs:
+            self._properties = {intern_string(k): intern_string(v)
+                                for k, v in kwargs.items()}
 
         self._namespace.add_deployment(deployment=self)
 
@@ -268,13 +302,21 @@ class Deployment(AbstractDeploymentPatchable):
     @patch.setter
     def patch(self, patch: DeploymentPatch) -> None:
         self._patch = patch
+        resource_changes.increase()
 
     def add_property(self, name: str, value: Any) -> None:
-        self._properties[name] = value
+        if self._properties is None:
+            self._properties = dict()
+        self._properties[intern_string(name)] = intern_string(value)
+        resource_changes.increase()
+
+    @property
+    def properties(self) -> Mapping[str, Any]:
+        return MappingProxyType(self._properties if self._properties else {})
 
     def property(self, name) -> Any:
-        return self._properties.get(name, None)
+        return self._properties.get(name, None) if self._properties else None
 
     def __str__(self) -> str:
         return f"{__class__.__name__}(name: {self._name}, replicas: {self._replicas}" + \
-            f", {len(self._properties)} properties)"
+            f", {len(self._properties) if self._properties else 0} properties)"
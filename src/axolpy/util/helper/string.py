@@ -2,8 +2,9 @@ import hashlib
 import random
 import re
 import string
+import sys
 from itertools import chain
-from typing import Iterable
+from typing import Any, Iterable
 
 
 def camelcase_to_underscrollsep(string: str) -> str:
@@ -135,3 +136,18 @@ def generate_random_string(
         return "".join(random.choice(characters) for _ in range(length))
     else:
         return "".join(random.sample(characters, length))
+
+
+def intern_string(value: Any) -> Any:
+    """
+    Intern *value* if it is a string so that equal strings share one
+    object. Other values are returned as they are.
+
+    :param value: Value to be interned.
+    :type value: Any
+
+    :return: The interned string or *value* itself.
+    :rtype: Any
+    """
+
+    return sys.intern(value) if type(value) is str else value
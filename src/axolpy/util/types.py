@@ -51,3 +51,27 @@ class KeyDefaultDict(defaultdict):
         else:
             self[key] = value = self.default_factory(key)
             return value
+
+
+class ChangeCounter(object):
+    """
+    A counter of changes to some objects, for a cache built from them to
+    tell whether it is stale.
+    """
+
+    __slots__ = ("_value",)
+
+    def __init__(self) -> None:
+        self._value: int = 0
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def increase(self) -> None:
+        self._value += 1
+
+
+# Counts the changes to the patch and the properties of the cloud
+# resources, see :mod:`axolpy.aws` and :mod:`axolpy.kubernetes`
+resource_changes: ChangeCounter = ChangeCounter()
@@ -1,3 +1,5 @@
+import sys
+
 import pytest
 from axolpy.aws import (AWSRegion, ECSCluster, ECSService, ECSServicePatch,
                         RDSDatabase, RDSDatabasePatch)
@@ -96,6 +98,29 @@ def test_ecs_service_patch_model():
     s.patch = patch
 
     assert s.patch.desired_count == patch_desired_count
+    assert s.property("restart_after_upgrade") is None
+    assert str(s) == f"{s.__class__.__name__}(name: test-service, desired_count: 1" + \
+        ", 0 properties)"
+
+
+def test_compact_layout():
+    """
+    Test that the models use slots and share equal names.
+    """
+
+    region = AWSRegion(name="".join(["us-", "east-1"]))
+    cluster = ECSCluster(name="test-cluster", region=region)
+    service = ECSService(name="test-service", cluster=cluster, desired_count=1,
+                         patch=ECSServicePatch(desired_count=2))
+    db = RDSDatabase(id="test-rds", region=region, type="instance",
+                     host="test-host.amazonaws.com",
+                     engine_version="".join(["13.", "6"]),
+                     patch=RDSDatabasePatch(class_type="db.t2.micro"))
+
+    for obj in [region, cluster, service, service.patch, db, db.patch]:
+        assert not hasattr(obj, "__dict__")
+    assert region.name is sys.intern("us-east-1")
+    assert db.engine_version is sys.intern("13.6")
 
 
 def test_rds_database():
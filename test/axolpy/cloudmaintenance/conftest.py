@@ -0,0 +1,36 @@
+from pathlib import Path
+
+import pytest
+from axolpy.cloudmaintenance import OperatorDataLoader, ResourceDataLoader
+
+_data_path = Path(__file__).parent.joinpath("testdata")
+
+
+@pytest.fixture
+def aws_regions():
+    """
+    Fixture for some AWS regions.
+
+    :return: A dictionary of AWSRegions.
+    :rtype: Dict[str, :class:`AWSRegion`]
+    """
+
+    return ResourceDataLoader.load_from_file(data_path=_data_path,
+                                             maintenance_id="maintenance")
+
+
+@pytest.fixture
+def operators(aws_regions):
+    """
+    Load all Operators of the test data.
+
+    :param aws_regions: Data of all regions.
+    :type aws_regions: Dict[str, :class:`AWSRegion`]
+
+    :return: A dictionary of Operators.
+    :rtype: Dict[str, :class:`Operator`]
+    """
+
+    return OperatorDataLoader.load_all_from_file(data_path=_data_path,
+                                                 maintenance_id="maintenance",
+                                                 aws_regions=aws_regions)
@@ -1,5 +1,14 @@
-from axolpy.aws import AWSRegion, ECSCluster, ECSService, RDSDatabase
-from axolpy.cloudmaintenance import Operator
+from pathlib import Path
+
+import axolpy.cloudmaintenance as cloudmaintenance
+import pytest
+import yaml
+from axolpy.aws import (AWSRegion, ECSCluster, ECSService, RDSDatabase,
+                        RDSDatabasePatch)
+from axolpy.cloudmaintenance import (LazyAWSRegions, Operator,
+                                     OperatorDataLoader, ResourceDataLoader,
+                                     UnresolvedReferenceError)
+from axolpy.cloudmaintenance.inventory import InventoryIndex
 from axolpy.kubernetes import Cluster, Deployment, Namespace, StatefulSet
 
 
@@ -42,3 +51,381 @@ def test_operator() -> None:
     assert len(operator.eks_statefulsets) == 1
     assert len(operator.ecs_services) == 1
     assert len(operator.rds_databases) == 1
+
+
+def test_operator_categories() -> None:
+    operator = Operator("kobe")
+    aws_region = AWSRegion(name="us-east-1")
+    databases = [RDSDatabase(id="pg", region=aws_region, type="instance", host="pg"),
+                 RDSDatabase(id="mysql", region=aws_region, type="instance",
+                             host="mysql", engine_type="mysql",
+                             patch=RDSDatabasePatch(class_type="db.t3.large")),
+                 RDSDatabase(id="pg-upgrade", region=aws_region, type="cluster",
+                             host="pg-upgrade",
+                             patch=RDSDatabasePatch(engine_version="14.5"))]
+    for database in databases:
+        operator.add_rds_databases(database=database)
+
+    ecs_cluster = ECSCluster(name="allinone", region=aws_region)
+    services = [ECSService(name="api", cluster=ecs_cluster),
+                ECSService(name="worker", cluster=ecs_cluster,
+                           restart_after_upgrade=True)]
+    for service in services:
+        operator.add_ecs_service(service=service)
+
+    namespace = Namespace(name="general", cluster=Cluster(name="allinone"))
+    deployment = Deployment(name="api", namespace=namespace, replicas=1,
+                            restart_after_upgrade=True)
+    statefulset = StatefulSet(name="redis", namespace=namespace, replicas=1)
+    operator.add_eks_deployment(deployment=deployment)
+    operator.add_eks_statefulset(statefulset=statefulset)
+
+    assert operator.postgresql_databases == [databases[0], databases[2]]
+    assert operator.mysql_databases == [databases[1]]
+    assert operator.patched_databases == databases[1:]
+    assert operator.engine_version_patched_databases == [databases[2]]
+    assert operator.class_type_patched_databases == [databases[1]]
+    assert operator.ecs_services_by_restart_after_upgrade(True) == [services[1]]
+    assert operator.ecs_services_by_restart_after_upgrade(False) == [services[0]]
+    assert operator.eks_deployments_by_restart_after_upgrade(True) == [deployment]
+    assert operator.eks_deployments_by_restart_after_upgrade(False) == []
+    assert operator.eks_statefulsets_by_restart_after_upgrade(False) == [statefulset]
+
+    # The categories are kept rather than built on every read
+    assert operator.patched_databases is operator.patched_databases
+
+    # Changes made after the resources are added are reflected
+    databases[1].patch = None
+    services[0].add_property(name="restart_after_upgrade", value=True)
+    assert operator.patched_databases == [databases[2]]
+    assert operator.class_type_patched_databases == []
+    assert operator.ecs_services_by_restart_after_upgrade(True) == services
+    assert operator.ecs_services_by_restart_after_upgrade(False) == []
+
+
+def test_resource_data_loader_snapshot(tmp_path) -> None:
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    resource_path = maintenance_path.joinpath("resource.yaml")
+    resource_path.write_text(
+        Path(__file__).parent.joinpath(
+            "testdata", "maintenance", "resource.yaml").read_text())
+    snapshot_path = maintenance_path.joinpath(
+        ResourceDataLoader.SNAPSHOT_FILENAME)
+
+    # Cold load parses resource.yaml and writes the snapshot
+    aws_regions = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance", use_snapshot=True)
+    assert snapshot_path.is_file()
+
+    # Warm load does not need resource.yaml to be parsed again
+    snapshot_mtime = snapshot_path.stat().st_mtime_ns
+    warm_regions = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance", use_snapshot=True)
+    assert snapshot_path.stat().st_mtime_ns == snapshot_mtime
+    assert warm_regions.keys() == aws_regions.keys()
+    warm_region = warm_regions["ap-east-1"]
+    assert str(warm_region) == str(aws_regions["ap-east-1"])
+    deployment = warm_region.eks_cluster("p-main").namespace(
+        "p-general").deployment("p-audit-log-api")
+    assert deployment.patch.replicas == 10
+    assert deployment.property("restart_after_upgrade") is True
+    assert deployment.namespace.cluster.platform_ref.region is warm_region
+
+    # Changing resource.yaml invalidates the snapshot
+    resource_path.write_text(
+        resource_path.read_text().replace("desired_count: 5", "desired_count: 6"))
+    changed_regions = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance", use_snapshot=True)
+    assert changed_regions["ap-east-1"].ecs_cluster(
+        "Production").service("p-authentication-api").desired_count == 6
+
+
+def test_resource_data_loader_without_libyaml(monkeypatch) -> None:
+    data_path = Path(__file__).parent.joinpath("testdata")
+    expected = ResourceDataLoader.load_from_file(
+        data_path=data_path, maintenance_id="maintenance")
+
+    # Fall back to the pure-Python loader as if libyaml is not available
+    monkeypatch.setattr(cloudmaintenance, "_YAMLLoader", yaml.SafeLoader)
+    actual = ResourceDataLoader.load_from_file(
+        data_path=data_path, maintenance_id="maintenance")
+
+    assert actual.keys() == expected.keys()
+    for region_name, region in expected.items():
+        assert str(actual[region_name]) == str(region)
+        assert [str(db) for db in actual[region_name].rds_databases.values()] == \
+            [str(db) for db in region.rds_databases.values()]
+
+
+def test_operator_data_loader_load_all() -> None:
+    data_path = Path(__file__).parent.joinpath("testdata")
+    aws_regions = ResourceDataLoader.load_from_file(
+        data_path=data_path, maintenance_id="maintenance")
+
+    operators = OperatorDataLoader.load_all_from_file(
+        data_path=data_path,
+        maintenance_id="maintenance",
+        aws_regions=aws_regions)
+
+    assert list(operators.keys()) == ["operator1", "operator2", "operator3"]
+    for operator_id, operator in operators.items():
+        assert operator.id == operator_id
+
+        expected = Operator(id=operator_id)
+        expected.data_loader.load_from_file(
+            data_path=data_path,
+            maintenance_id="maintenance",
+            aws_regions=aws_regions)
+        assert operator.rds_databases == expected.rds_databases
+        assert operator.ecs_services == expected.ecs_services
+        assert operator.eks_statefulsets == expected.eks_statefulsets
+        assert operator.eks_deployments == expected.eks_deployments
+
+    assert [db.id for db in operators["operator2"].rds_databases] == \
+        ["audit_log", "subcription"]
+    assert [dpm.name for dpm in operators["operator3"].eks_deployments] == \
+        ["p-db-housekeeping-monthly", "p-aggregation-api", "p-authentication-api"]
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_operator_data_loader_unresolved_references(tmp_path, use_index) -> None:
+    data_path = Path(__file__).parent.joinpath("testdata")
+    aws_regions = ResourceDataLoader.load_from_file(
+        data_path=data_path, maintenance_id="maintenance")
+    index = InventoryIndex(aws_regions) if use_index else None
+
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    operator_yaml = yaml.safe_load(
+        data_path.joinpath("maintenance", "operator.yaml").read_text())
+    operator1 = operator_yaml["operator1"]["ap-east-1"]
+    operator1["databases"].append({"id": "missing-db"})
+    operator1["ecs"]["clusters"]["Staging"] = {"services": [{"name": "api"}]}
+    operator1["eks"]["clusters"]["p-main"]["namespaces"]["p-general"][
+        "deployments"].append({"name": "missing-api"})
+    operator_yaml["operator2"]["eu-west-1"] = {"databases": [{"id": "user"}]}
+    maintenance_path.joinpath("operator.yaml").write_text(
+        yaml.safe_dump(operator_yaml, sort_keys=False))
+
+    with pytest.raises(UnresolvedReferenceError) as e:
+        OperatorDataLoader.load_all_from_file(
+            data_path=tmp_path,
+            maintenance_id="maintenance",
+            aws_regions=aws_regions,
+            index=index)
+
+    # Every dangling reference of all operators is reported at once
+    assert e.value.references == [
+        ("operator1.ap-east-1.databases[4]", "ap-east-1/rds/missing-db"),
+        ("operator1.ap-east-1.ecs.clusters.Staging.services[0]",
+         "ap-east-1/ecs/Staging/service/api"),
+        ("operator1.ap-east-1.eks.clusters.p-main.namespaces.p-general.deployments[1]",
+         "ap-east-1/eks/p-main/p-general/deployment/missing-api"),
+        ("operator2.eu-west-1.databases[0]", "eu-west-1/rds/user")]
+    assert isinstance(e.value, KeyError)
+    assert str(e.value).startswith("4 unresolved references:")
+
+    # Nothing is added to an operator with unresolved references
+    operator = Operator(id="operator1")
+    with pytest.raises(UnresolvedReferenceError) as e:
+        operator.data_loader.load_from_file(data_path=tmp_path,
+                                            maintenance_id="maintenance",
+                                            aws_regions=aws_regions,
+                                            index=index)
+    assert len(e.value.references) == 3
+    assert operator.rds_databases == []
+    assert operator.ecs_services == []
+
+
+def test_resource_data_loader_in_parallel(tmp_path) -> None:
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    resource_yaml = Path(__file__).parent.joinpath(
+        "testdata", "maintenance", "resource.yaml").read_text()
+    # Duplicate the region so that there is more than one region to build
+    maintenance_path.joinpath("resource.yaml").write_text(
+        resource_yaml + resource_yaml.replace("regions:\n", "# copy\n", 1)
+        .replace("ap-east-1", "ap-southeast-1"))
+
+    expected = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance")
+    actual = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance", max_workers=2)
+
+    assert list(actual.keys()) == ["ap-east-1", "ap-southeast-1"]
+    for region_name, region in expected.items():
+        assert str(actual[region_name]) == str(region)
+        for cluster_name, cluster in region.eks_clusters.items():
+            for namespace_name, namespace in cluster.namespaces.items():
+                actual_namespace = actual[region_name].eks_cluster(
+                    cluster_name).namespace(namespace_name)
+                assert str(actual_namespace) == str(namespace)
+                assert actual_namespace.cluster.platform_ref.region is actual[region_name]
+
+
+def test_index_region_sections() -> None:
+    content = b"regions:\n" + \
+        b"  # first region\n" + \
+        b"  ap-east-1:\n" + \
+        b"    databases: []\n" + \
+        b"\n" + \
+        b"  'us-east-1':  # second region\n" + \
+        b"    ecs:\n" + \
+        b"      clusters: {}\n"
+
+    sections = cloudmaintenance._index_region_sections(content)
+
+    assert list(sections.keys()) == ["ap-east-1", "us-east-1"]
+    for region_name, (start, end) in sections.items():
+        assert region_name in yaml.safe_load(content[start:end])
+    assert yaml.safe_load(content[sections["ap-east-1"][0]:sections["ap-east-1"][1]]) == \
+        {"ap-east-1": {"databases": []}}
+
+    # Regions which cannot be located reliably
+    assert cloudmaintenance._index_region_sections(
+        b"regions: {ap-east-1: {databases: []}}\n") is None
+    assert cloudmaintenance._index_region_sections(
+        b"regions:\n  ap-east-1: {}\n") is None
+    assert cloudmaintenance._index_region_sections(
+        b"regions:\n  ap-east-1: &region\n    databases: []\n  us-east-1: *region\n") is None
+
+
+@pytest.mark.parametrize("regions_key", ["regions:\n", "regions: &regions\n"])
+def test_resource_data_loader_lazily(tmp_path, regions_key) -> None:
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    resource_yaml = Path(__file__).parent.joinpath(
+        "testdata", "maintenance", "resource.yaml").read_text()
+    # An anchor prevents the regions from being indexed by byte offsets
+    maintenance_path.joinpath("resource.yaml").write_text(
+        resource_yaml.replace("regions:\n", regions_key, 1) +
+        resource_yaml.replace("regions:\n", "", 1).replace("ap-east-1", "us-east-1"))
+
+    aws_regions = ResourceDataLoader.load_lazily_from_file(
+        data_path=tmp_path, maintenance_id="maintenance")
+
+    assert list(aws_regions) == ["ap-east-1", "us-east-1"]
+    assert len(aws_regions) == 2
+    assert "us-east-1" in aws_regions
+    assert "eu-west-1" not in aws_regions
+    assert not aws_regions.is_loaded("ap-east-1")
+    assert not aws_regions.is_loaded("us-east-1")
+
+    operator = Operator(id="operator1")
+    operator.data_loader.load_from_file(
+        data_path=Path(__file__).parent.joinpath("testdata"),
+        maintenance_id="maintenance",
+        aws_regions=aws_regions)
+    assert aws_regions.is_loaded("ap-east-1")
+    assert not aws_regions.is_loaded("us-east-1")
+    assert str(aws_regions) == "LazyAWSRegions(2 regions, 1 loaded)"
+    assert aws_regions["ap-east-1"] is aws_regions["ap-east-1"]
+    assert [db.id for db in operator.rds_databases] == \
+        ["user", "address", "favorite", "bookmark"]
+
+    expected = ResourceDataLoader.load_from_file(
+        data_path=Path(__file__).parent.joinpath("testdata"),
+        maintenance_id="maintenance")
+    assert str(aws_regions["us-east-1"]) == \
+        str(expected["ap-east-1"]).replace("ap-east-1", "us-east-1")
+
+    with pytest.raises(KeyError):
+        aws_regions["eu-west-1"]
+
+
+@pytest.mark.parametrize("load_kwargs", [{},
+                                         {"use_snapshot": True},
+                                         {"max_workers": 2}])
+def test_resource_data_loader_reload(tmp_path, load_kwargs) -> None:
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    resource_path = maintenance_path.joinpath("resource.yaml")
+    resource_yaml = Path(__file__).parent.joinpath(
+        "testdata", "maintenance", "resource.yaml").read_text()
+    resource_path.write_text(
+        resource_yaml +
+        resource_yaml.replace("regions:\n", "", 1).replace("ap-east-1", "us-east-1") +
+        resource_yaml.replace("regions:\n", "", 1).replace("ap-east-1", "eu-west-1"))
+    if load_kwargs.get("use_snapshot"):
+        # Load from the snapshot instead of resource.yaml
+        ResourceDataLoader.load_from_file(
+            data_path=tmp_path, maintenance_id="maintenance", **load_kwargs)
+    aws_regions = ResourceDataLoader.load_from_file(
+        data_path=tmp_path, maintenance_id="maintenance", **load_kwargs)
+    if not load_kwargs.get("use_snapshot"):
+        # The content of the regions is not recorded without a snapshot,
+        # so the first reload rebuilds them all
+        assert not any(region in cloudmaintenance._region_digests
+                       for region in aws_regions.values())
+        reloaded = ResourceDataLoader.reload_from_file(
+            data_path=tmp_path,
+            maintenance_id="maintenance",
+            aws_regions=aws_regions)
+        assert all(reloaded[name] is not aws_regions[name] for name in aws_regions)
+        aws_regions = reloaded
+
+    # Change a replica count in us-east-1 and remove eu-west-1
+    us_east_start = resource_path.read_text().index("  us-east-1:")
+    eu_west_start = resource_path.read_text().index("  eu-west-1:")
+    resource_text = resource_path.read_text()
+    resource_path.write_text(
+        resource_text[:us_east_start] +
+        resource_text[us_east_start:eu_west_start].replace("replicas: 8", "replicas: 7"))
+
+    reloaded = ResourceDataLoader.reload_from_file(
+        data_path=tmp_path,
+        maintenance_id="maintenance",
+        aws_regions=aws_regions)
+
+    assert list(reloaded.keys()) == ["ap-east-1", "us-east-1"]
+    assert reloaded["ap-east-1"] is aws_regions["ap-east-1"]
+    assert reloaded["us-east-1"] is not aws_regions["us-east-1"]
+    assert reloaded["us-east-1"].eks_cluster("p-main").namespace(
+        "p-general").statefulset("psql-sync-service").replicas == 7
+
+    # Nothing changed since the last reload
+    assert ResourceDataLoader.reload_from_file(
+        data_path=tmp_path,
+        maintenance_id="maintenance",
+        aws_regions=reloaded) == reloaded
+
+
+def test_resource_data_loader_reload_lazily(tmp_path) -> None:
+    maintenance_path = tmp_path.joinpath("maintenance")
+    maintenance_path.mkdir()
+    resource_path = maintenance_path.joinpath("resource.yaml")
+    resource_yaml = Path(__file__).parent.joinpath(
+        "testdata", "maintenance", "resource.yaml").read_text()
+    resource_path.write_text(
+        resource_yaml +
+        resource_yaml.replace("regions:\n", "", 1).replace("ap-east-1", "us-east-1") +
+        resource_yaml.replace("regions:\n", "", 1).replace("ap-east-1", "eu-west-1"))
+    aws_regions = ResourceDataLoader.load_lazily_from_file(
+        data_path=tmp_path, maintenance_id="maintenance")
+    ap_east = aws_regions["ap-east-1"]
+    us_east = aws_regions["us-east-1"]
+
+    # Change a replica count in us-east-1
+    resource_text = resource_path.read_text()
+    us_east_start = resource_text.index("  us-east-1:")
+    eu_west_start = resource_text.index("  eu-west-1:")
+    resource_path.write_text(
+        resource_text[:us_east_start] +
+        resource_text[us_east_start:eu_west_start].replace("replicas: 8", "replicas: 7") +
+        resource_text[eu_west_start:])
+    reloaded = ResourceDataLoader.reload_from_file(
+        data_path=tmp_path,
+        maintenance_id="maintenance",
+        aws_regions=aws_regions)
+
+    assert isinstance(reloaded, LazyAWSRegions)
+    assert list(reloaded) == ["ap-east-1", "us-east-1", "eu-west-1"]
+    # Only the regions which have been built and are unchanged are reused,
+    # and no region is built to be compared
+    assert reloaded.is_loaded("ap-east-1") and reloaded["ap-east-1"] is ap_east
+    assert not reloaded.is_loaded("us-east-1") and not reloaded.is_loaded("eu-west-1")
+    assert not aws_regions.is_loaded("eu-west-1")
+    assert reloaded["us-east-1"] is not us_east
+    assert reloaded["us-east-1"].eks_cluster("p-main").namespace(
+        "p-general").statefulset("psql-sync-service").replicas == 7
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+from axolpy.aws import AWSRegion
+from axolpy.cloudmaintenance import ResourceDataLoader
+from axolpy.cloudmaintenance.inventory import InventoryIndex
+
+pytest.importorskip("pyarrow")
+
+from axolpy.cloudmaintenance import columnar  # noqa: E402
+
+
+def _load_aws_regions() -> dict:
+    return ResourceDataLoader.load_from_file(
+        data_path=Path(__file__).parent.joinpath("testdata"),
+        maintenance_id="maintenance")
+
+
+def _assert_same_inventory(actual: dict, expected: dict) -> None:
+    assert list(actual.keys()) == list(expected.keys())
+    actual_index, expected_index = InventoryIndex(actual), InventoryIndex(expected)
+    assert list(actual_index.paths()) == list(expected_index.paths())
+    for path in expected_index.paths():
+        actual_resource, expected_resource = actual_index[path], expected_index[path]
+        assert str(actual_resource) == str(expected_resource)
+        if hasattr(expected_resource, "patch"):
+            assert str(actual_resource.patch) == str(expected_resource.patch)
+        if hasattr(expected_resource, "properties"):
+            assert dict(actual_resource.properties) == dict(expected_resource.properties)
+
+
+def test_to_tables() -> None:
+    aws_regions = _load_aws_regions()
+    aws_regions["us-east-1"] = AWSRegion(name="us-east-1")
+
+    tables = columnar.to_tables(aws_regions)
+
+    assert set(tables.keys()) == set(columnar.SCHEMAS.keys())
+    assert tables[columnar.TABLE_REGION].column("name").to_pylist() == \
+        ["ap-east-1", "us-east-1"]
+    index = InventoryIndex(aws_regions)
+    for kind, table in tables.items():
+        if kind != columnar.TABLE_REGION:
+            assert table.num_rows == len(index.by_kind(kind))
+            assert table.schema == columnar.SCHEMAS[kind]
+
+    # The tables can be used for analytics directly
+    statefulsets = tables["statefulset"]
+    assert sum(statefulsets.column("replicas").to_pylist()) == \
+        sum(s.replicas for s in index.by_kind("statefulset"))
+
+    _assert_same_inventory(columnar.from_tables(tables), aws_regions)
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_write_and_read_inventory(tmp_path, format) -> None:
+    aws_regions = _load_aws_regions()
+
+    filepaths = columnar.write_inventory(aws_regions, tmp_path, format=format)
+
+    assert sorted(filepath.name for filepath in filepaths) == \
+        sorted(f"{table_name}.{format}" for table_name in columnar.SCHEMAS)
+    _assert_same_inventory(columnar.read_inventory(tmp_path, format=format),
+                           aws_regions)
@@ -0,0 +1,150 @@
+from pathlib import Path
+
+from axolpy.aws import AWSRegion, ECSCluster, ECSService
+from axolpy.cloudmaintenance import Operator
+from axolpy.cloudmaintenance.executor import (FakeCommandRunner, StepExecutor,
+                                              SubprocessCommandRunner)
+from axolpy.cloudmaintenance.steps import (ACTION_ECS_UPDATE_SERVICE,
+                                           ACTION_KUBECTL_SCALE,
+                                           QueryDatabaseStatus,
+                                           RestartECSService,
+                                           RestartK8sDeployment, StepCommand,
+                                           UpdateECSTaskCount)
+
+_data_path = Path(__file__).parent.joinpath("testdata")
+
+
+def test_step_commands(operators) -> None:
+    step = RestartK8sDeployment(step_no=0,
+                                operator=operators["operator2"],
+                                dist_path=_data_path)
+
+    commands = list(step.commands())
+
+    assert [command.line for command in commands] == \
+        _data_path.joinpath("maintenance", "dist-verify",
+                            step.filename()).read_text().splitlines()[2:]
+    assert commands[0].command == \
+        "kubectl rollout restart -n p-general deployment/p-audit-log-api"
+    assert commands[0].commented
+    assert (commands[0].region, commands[0].cluster) == ("ap-east-1", "p-main")
+    assert commands[0].resource is commands[1].resource
+
+
+def test_execute_dry_run(tmp_path, operators) -> None:
+    operator = operators["operator1"]
+    steps = [UpdateECSTaskCount(step_no=0, operator=operator, dist_path=tmp_path,
+                                zeroinfy=True),
+             RestartK8sDeployment(step_no=0, operator=operator, dist_path=tmp_path),
+             QueryDatabaseStatus(step_no=0, operator=operator, dist_path=tmp_path)]
+    executor = StepExecutor()
+
+    summary = executor.execute(steps)
+
+    # Nothing is run by default, and the commented commands are left out
+    assert isinstance(executor.runner, FakeCommandRunner)
+    assert summary.succeeded
+    assert [result.command.command for result in summary.results] == \
+        [command.command for command in steps[2].commands()]
+
+    executor = StepExecutor(dry_run=True, execute_commented=True)
+    summary = executor.execute(steps)
+
+    assert summary.succeeded
+    # RestartK8sDeployment is not eligible for operator1
+    expected = [command.command for step in (steps[0], steps[2])
+                for command in step.commands()]
+    assert [result.command.command for result in summary.results] == expected
+    assert sorted(command.command for command in executor.runner.commands) == \
+        sorted(expected)
+    assert not list(tmp_path.iterdir())
+
+
+def test_execute_with_limits(tmp_path) -> None:
+    operator = Operator(id="operator")
+    for region_name in ("us-east-1", "us-west-2"):
+        region = AWSRegion(name=region_name)
+        for cluster_name in ("blue", "green"):
+            cluster = ECSCluster(name=cluster_name, region=region)
+            for i in range(4):
+                operator.add_ecs_service(ECSService(name=f"svc-{i}",
+                                                    cluster=cluster,
+                                                    restart_after_upgrade=True))
+    runner = FakeCommandRunner(delay=0.02)
+
+    summary = StepExecutor(runner=runner,
+                           max_workers=16,
+                           max_per_region=3,
+                           max_per_cluster=1,
+                           execute_commented=True).execute(
+        [RestartECSService(step_no=0, operator=operator, dist_path=tmp_path)])
+
+    assert len(summary.results) == 16
+    assert summary.succeeded
+    # 2 regions with at most 3 commands each, but only 2 clusters each
+    # with at most 1 command
+    assert 1 < runner.max_running <= 4
+
+
+def test_execute_on_clusters_of_the_same_name() -> None:
+    commands = [StepCommand(line="aws ecs update-service --cluster main",
+                            region="ap-east-1",
+                            cluster="main",
+                            action=ACTION_ECS_UPDATE_SERVICE),
+                StepCommand(line="kubectl scale -n general deployment/web",
+                            region="ap-east-1",
+                            cluster="main",
+                            action=ACTION_KUBECTL_SCALE)]
+    assert [command.cluster_kind for command in commands] == ["ecs", "eks"]
+    assert StepCommand(line="echo").cluster_kind is None
+    runner = FakeCommandRunner(delay=0.05)
+
+    results = StepExecutor(runner=runner,
+                           max_workers=2,
+                           max_per_cluster=1).execute_commands(commands)
+
+    # The ECS cluster and the EKS cluster do not hold back each other
+    assert all(result.succeeded for result in results)
+    assert runner.max_running == 2
+
+
+def test_execute_with_failures(tmp_path, operators) -> None:
+    operator = operators["operator2"]
+    restart = "kubectl rollout restart -n p-general deployment/p-audit-log-api"
+    runner = FakeCommandRunner(responses={restart: (1, "", "forbidden")})
+    steps = [RestartK8sDeployment(step_no=0, operator=operator, dist_path=tmp_path),
+             QueryDatabaseStatus(step_no=0, operator=operator, dist_path=tmp_path)]
+
+    summary = StepExecutor(runner=runner, execute_commented=True).execute(steps)
+
+    # The scale after the failed restart is skipped, and the next step is
+    # not run
+    assert [(r.command.command, r.returncode) for r in summary.results] == \
+        [(restart, 1),
+         ("kubectl scale -n p-general deployment/p-audit-log-api --replicas=10", None)]
+    assert summary.failures[0].stderr == "forbidden"
+    assert str(summary) == "ExecutionSummary(2 commands, 1 failures, 1 skipped)"
+    assert not summary.succeeded
+
+    summary = StepExecutor(runner=runner,
+                           stop_on_failure=False,
+                           execute_commented=True).execute(steps)
+    assert len(summary.results) == 2 + len(list(steps[1].commands()))
+
+
+def test_subprocess_command_runner() -> None:
+    runner = SubprocessCommandRunner()
+
+    result = runner.run(StepCommand(line="echo hello && echo oops >&2"))
+    assert (result.returncode, result.stdout, result.stderr) == (0, "hello\n", "oops\n")
+
+    result = runner.run(StepCommand(line="# exit 3"))
+    assert result.returncode == 3 and not result.succeeded
+
+    # A command which runs for too long is stopped
+    result = SubprocessCommandRunner(timeout=0.1).run(StepCommand(line="sleep 5"))
+    assert result.returncode == -1 and result.stderr == "timed out after 0.1s"
+
+    # A command reading its input gets none rather than waiting for it
+    result = SubprocessCommandRunner(timeout=5).run(StepCommand(line="cat"))
+    assert (result.returncode, result.stdout) == (0, "")
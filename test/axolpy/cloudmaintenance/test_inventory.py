@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+from axolpy.aws import AWSRegion
+from axolpy.cloudmaintenance import ResourceDataLoader
+from axolpy.cloudmaintenance.inventory import (KIND_DEPLOYMENT,
+                                               KIND_ECS_CLUSTER,
+                                               KIND_ECS_SERVICE,
+                                               KIND_EKS_CLUSTER,
+                                               KIND_NAMESPACE,
+                                               KIND_RDS_DATABASE,
+                                               KIND_STATEFULSET,
+                                               InventoryIndex, resource_path)
+from axolpy.kubernetes import Cluster
+
+
+@pytest.fixture
+def aws_regions():
+    """
+    Fixture for some AWS regions.
+
+    :return: A dictionary of AWSRegions.
+    :rtype: Dict[str, :class:`AWSRegion`]
+    """
+
+    return ResourceDataLoader.load_from_file(
+        data_path=Path(__file__).parent.joinpath("testdata"),
+        maintenance_id="maintenance")
+
+
+def test_inventory_index(aws_regions) -> None:
+    index = InventoryIndex(aws_regions)
+    region = aws_regions["ap-east-1"]
+
+    assert index.aws_regions is aws_regions
+    assert len(index) == 6 + 1 + 6 + 1 + 2 + 3 + 5
+    assert str(index) == "InventoryIndex(1 regions, 24 resources)"
+
+    deployment = region.eks_cluster("p-main").namespace(
+        "p-general").deployment("p-audit-log-api")
+    assert index["ap-east-1/eks/p-main/p-general/deployment/p-audit-log-api"] is deployment
+    assert index["ap-east-1/eks/p-main/p-general/statefulset/redis-sync-service"] is \
+        region.eks_cluster("p-main").namespace("p-general").statefulset(
+            "redis-sync-service")
+    assert index["ap-east-1/eks/p-main/p-authentication"] is \
+        region.eks_cluster("p-main").namespace("p-authentication")
+    assert index["ap-east-1/eks/p-main"] is region.eks_cluster("p-main")
+    assert index["ap-east-1/ecs/Production"] is region.ecs_cluster("Production")
+    assert index["ap-east-1/ecs/Production/service/p-address-api"] is \
+        region.ecs_cluster("Production").service("p-address-api")
+    assert index["ap-east-1/rds/favorite"] is region.rds_database("favorite")
+    assert "ap-east-1/rds/unknown" not in index
+    assert index.get("ap-east-1/rds/unknown") is None
+    with pytest.raises(KeyError):
+        index["ap-east-1/rds/unknown"]
+
+    for path in index.paths():
+        assert resource_path(index[path]) == path
+
+
+def test_inventory_index_secondary_indexes(aws_regions) -> None:
+    index = InventoryIndex(aws_regions)
+
+    assert [db.id for db in index.by_kind(KIND_RDS_DATABASE)] == \
+        ["user", "address", "audit_log", "subcription", "favorite", "bookmark"]
+    assert len(index.by_kind(KIND_ECS_CLUSTER)) == 1
+    assert len(index.by_kind(KIND_ECS_SERVICE)) == 6
+    assert len(index.by_kind(KIND_EKS_CLUSTER)) == 1
+    assert len(index.by_kind(KIND_NAMESPACE)) == 2
+    assert len(index.by_kind(KIND_STATEFULSET)) == 3
+    assert len(index.by_kind(KIND_DEPLOYMENT)) == 5
+
+    assert [db.id for db in index.by_engine_type("mysql")] == \
+        ["favorite", "bookmark"]
+    assert len(index.by_engine_type("postgresql")) == 4
+    assert list(index.by_engine_type("oracle")) == []
+
+    assert [w.name for w in index.by_restart_after_upgrade()] == \
+        ["p-db-housekeeping-monthly", "p-process-pending-txn-api",
+         "redis-sync-service", "p-audit-log-api", "p-db-housekeeping-monthly"]
+    assert len(index.by_restart_after_upgrade(False)) == 14 - 5
+
+
+def test_resource_path() -> None:
+    region = AWSRegion(name="us-east-1")
+    assert resource_path(region) == "us-east-1"
+
+    with pytest.raises(ValueError):
+        resource_path(Cluster(name="standalone"))
+    with pytest.raises(TypeError):
+        resource_path("us-east-1")
@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+
+import pytest
+from axolpy.cloudmaintenance import jsonplan
+from axolpy.cloudmaintenance.inventory import InventoryIndex
+from axolpy.cloudmaintenance.jsonplan import (dumps_plan, plan_records,
+                                              write_plan)
+from axolpy.cloudmaintenance.pacing import (API_ECS_UPDATE_SERVICE,
+                                            PacingScheduler, RateLimit)
+from axolpy.cloudmaintenance.steps import (DumpMysqlTableStatus,
+                                           QueryECSTaskStatus,
+                                           RestartK8sDeployment,
+                                           UpdateECSTaskCount)
+
+
+def _steps(operators, dist_path: Path):
+    pacing = PacingScheduler(limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=0.5)})
+    return [UpdateECSTaskCount(step_no=0, operator=operator, dist_path=dist_path,
+                               zeroinfy=True, pacing=pacing)
+            for operator in operators.values()] + \
+        [RestartK8sDeployment(step_no=1, operator=operator, dist_path=dist_path)
+         for operator in operators.values()] + \
+        [QueryECSTaskStatus(step_no=2, operator=operators["operator1"], dist_path=dist_path),
+         DumpMysqlTableStatus(step_no=2, operator=operators["operator1"], dist_path=dist_path)]
+
+
+def test_step_records(tmp_path, operators) -> None:
+    step = UpdateECSTaskCount(step_no=0,
+                              operator=operators["operator1"],
+                              dist_path=tmp_path,
+                              zeroinfy=True,
+                              pacing=PacingScheduler(
+                                  limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=0.5)}))
+
+    records = list(step.records())
+
+    assert [command.command for command in step.commands()] == \
+        [record["command"] for record in records]
+    assert records[1] == {
+        "operator": "operator1",
+        "step_no": 0,
+        "step": "UpdateECSTaskCount",
+        "filename": "operator1-0-update-ecs-task-count-ZERO.sh",
+        "index": 1,
+        "action": "ecs:update-service",
+        "resource": "ap-east-1/ecs/Production/service/p-payproxy-api",
+        "region": "ap-east-1",
+        "cluster": "Production",
+        "arguments": {"region": "ap-east-1",
+                      "cluster": "Production",
+                      "name": "p-payproxy-api",
+                      "count": 0},
+        "command": "aws ecs update-service --region ap-east-1 --cluster Production"
+                   " --service p-payproxy-api --desired-count 0",
+        "commented": True,
+        "pacing": {"api": "ecs:UpdateService", "rate": 0.5, "burst": 1, "delay": 2.0}}
+    # The waits are the sleeps of the script
+    assert "# sleep 2\n" in step.render()
+
+    step = RestartK8sDeployment(step_no=1, operator=operators["operator2"], dist_path=tmp_path)
+    records = list(step.records())
+    assert [record["action"] for record in records] == \
+        ["kubectl:rollout-restart", "kubectl:scale"]
+    assert records[0]["resource"] == "ap-east-1/eks/p-main/p-general/deployment/p-audit-log-api"
+    assert records[1]["arguments"]["replicas"] == 10
+    assert records[0]["pacing"] is None
+
+    step = QueryECSTaskStatus(step_no=2, operator=operators["operator1"], dist_path=tmp_path)
+    record = next(step.records())
+    assert record["resource"] is None
+    assert record["arguments"]["names"] == [
+        "p-authentication-api", "p-process-pending-txn-api", "p-payproxy-api"]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_plan(tmp_path, operators, monkeypatch, use_orjson) -> None:
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(jsonplan, "orjson", None)
+    steps = _steps(operators, tmp_path)
+
+    content = dumps_plan(steps)
+
+    records = json.loads(content)
+    assert records == json.loads(json.dumps(list(plan_records(steps))))
+    assert b"\n" not in content
+    assert json.loads(dumps_plan(steps, indent=True)) == records
+    # Steps which are not eligible have no records
+    assert "operator1" not in {record["operator"] for record in records
+                               if record["step"] == "RestartK8sDeployment"}
+
+
+def test_record_resources_in_inventory(tmp_path, aws_regions, operators) -> None:
+    index = InventoryIndex(aws_regions)
+
+    paths = [record["resource"] for record in plan_records(_steps(operators, tmp_path))
+             if record["resource"] is not None]
+
+    assert paths
+    assert all(path in index for path in paths)
+
+
+def test_write_plan(tmp_path, operators) -> None:
+    steps = _steps(operators, tmp_path)
+    records = json.loads(dumps_plan(steps))
+
+    filepath = tmp_path.joinpath("plan", "plan.json")
+    assert write_plan(steps, filepath) == len(records)
+    assert json.loads(filepath.read_text()) == records
+
+    filepath = tmp_path.joinpath("plan", "plan.jsonl")
+    assert write_plan(steps, filepath, json_lines=True) == len(records)
+    assert [json.loads(line) for line in filepath.read_text().splitlines()] == records
+    assert sorted(p.name for p in filepath.parent.iterdir()) == ["plan.json", "plan.jsonl"]
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+from axolpy.cloudmaintenance import Operator, ResourceDataLoader
+from axolpy.cloudmaintenance.manifest import StepManifest, content_digest
+from axolpy.cloudmaintenance.steps import QueryDatabaseStatus
+
+
+def _operator() -> Operator:
+    data_path = Path(__file__).parent.joinpath("testdata")
+    aws_regions = ResourceDataLoader.load_from_file(data_path=data_path,
+                                                    maintenance_id="maintenance")
+    operator = Operator(id="operator1")
+    operator.data_loader.load_from_file(data_path=data_path,
+                                        maintenance_id="maintenance",
+                                        aws_regions=aws_regions)
+
+    return operator
+
+
+def test_step_manifest(tmp_path) -> None:
+    step = QueryDatabaseStatus(step_no=0, operator=_operator(), dist_path=tmp_path)
+    filepath = step.output_filepath()
+
+    manifest = StepManifest.load(tmp_path)
+    assert len(manifest) == 0
+    assert step.write_file(manifest=manifest)
+    assert manifest.digest(filepath.name) == content_digest(step.render())
+    manifest.save()
+
+    # An unchanged script is not written again
+    manifest = StepManifest.load(tmp_path)
+    assert list(manifest) == [filepath.name]
+    mtime_ns = filepath.stat().st_mtime_ns
+    assert not step.write_file(manifest=manifest)
+    assert filepath.stat().st_mtime_ns == mtime_ns
+
+    # A script edited or removed by hand is written again
+    filepath.write_text("#!/bin/bash\n")
+    assert step.write_file(manifest=manifest)
+    assert filepath.read_text() == step.render()
+    filepath.unlink()
+    assert step.write_file(manifest=manifest)
+    assert filepath.exists()
+
+    # The manifest is not a script in the directory
+    assert sorted(f.name for f in tmp_path.iterdir()) == \
+        sorted([filepath.name, StepManifest.FILENAME])
+
+
+def test_step_manifest_prune(tmp_path) -> None:
+    step = QueryDatabaseStatus(step_no=0, operator=_operator(), dist_path=tmp_path)
+    filename = step.output_filepath().name
+    manifest = StepManifest(dist_path=tmp_path)
+    step.write_file(manifest=manifest)
+    tmp_path.joinpath("old.sh").write_text("#!/bin/bash\n")
+    manifest.record(filename="old.sh", digest=content_digest("#!/bin/bash\n"))
+    manifest.save()
+
+    # An unchanged script is kept, while a script which is not rendered
+    # again is dropped from the manifest but left on disk
+    manifest = StepManifest.load(tmp_path)
+    assert manifest.orphaned == sorted([filename, "old.sh"])
+    assert not step.write_file(manifest=manifest)
+    assert manifest.orphaned == ["old.sh"]
+    manifest.keep(filename="missing.sh")
+    manifest.save()
+
+    assert list(StepManifest.load(tmp_path)) == [filename]
+    assert tmp_path.joinpath("old.sh").exists()
+
+
+def test_step_manifest_unreadable(tmp_path) -> None:
+    tmp_path.joinpath(StepManifest.FILENAME).write_text("{not json")
+
+    assert len(StepManifest.load(tmp_path)) == 0
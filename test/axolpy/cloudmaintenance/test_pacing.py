@@ -0,0 +1,153 @@
+import pickle
+
+from axolpy.aws import AWSRegion, ECSCluster, ECSService
+from axolpy.cloudmaintenance import Operator
+from axolpy.cloudmaintenance.executor import FakeCommandRunner, StepExecutor
+from axolpy.cloudmaintenance.pacing import (API_ECS_UPDATE_SERVICE,
+                                            API_RDS_MODIFY_DB_INSTANCE,
+                                            DEFAULT_RATE_LIMITS,
+                                            PacingScheduler, RateLimit,
+                                            TokenBucket, format_delay)
+from axolpy.cloudmaintenance.steps import RestartECSService
+
+
+class _Clock(object):
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = list()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket() -> None:
+    clock = _Clock()
+    bucket = TokenBucket(limit=RateLimit(rate=2.0, burst=2), clock=clock, sleep=clock.sleep)
+
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 0.5]
+    assert clock.now == 1.0
+
+    # Tokens are refilled up to the burst while idle
+    clock.now += 10
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.5]
+    # A reserved token makes the next caller wait longer
+    assert bucket.reserve() == 1.0
+
+
+def test_pacing_scheduler() -> None:
+    clock = _Clock()
+    pacing = PacingScheduler(limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=1.0),
+                                     (API_ECS_UPDATE_SERVICE, "us-east-1"): RateLimit(rate=4.0)},
+                             clock=clock,
+                             sleep=clock.sleep)
+
+    assert pacing.limit(API_RDS_MODIFY_DB_INSTANCE, "ap-east-1") == \
+        DEFAULT_RATE_LIMITS[API_RDS_MODIFY_DB_INSTANCE]
+    assert pacing.limit("ecs:DescribeServices", "ap-east-1") is None
+    assert pacing.acquire(api=None, region="ap-east-1") == 0.0
+    assert pacing.acquire(api="ecs:DescribeServices", region="ap-east-1") == 0.0
+
+    # Every region has its own bucket
+    assert pacing.bucket(API_ECS_UPDATE_SERVICE, "ap-east-1") is \
+        pacing.bucket(API_ECS_UPDATE_SERVICE, "ap-east-1")
+    assert [pacing.acquire(API_ECS_UPDATE_SERVICE, "ap-east-1") for _ in range(2)] == [0.0, 1.0]
+    assert [pacing.acquire(API_ECS_UPDATE_SERVICE, "us-east-1") for _ in range(2)] == [0.0, 0.25]
+
+    # A simulation starts with full buckets and does not wait
+    simulation = pacing.simulate()
+    assert [simulation.acquire(API_ECS_UPDATE_SERVICE, "ap-east-1") for _ in range(3)] == \
+        [0.0, 1.0, 1.0]
+    assert clock.sleeps == [1.0, 0.25]
+
+    copy = pickle.loads(pickle.dumps(pacing))
+    assert copy.limit(API_ECS_UPDATE_SERVICE, "us-east-1") == RateLimit(rate=4.0)
+
+    assert format_delay(0.25) == "0.25"
+    assert format_delay(1 / 3) == "0.334"
+    assert format_delay(2.0) == "2"
+
+
+def _operator(id: str = "operator") -> Operator:
+    operator = Operator(id=id)
+    hongkong = ECSCluster(name="Production", region=AWSRegion(name="ap-east-1"))
+    tokyo = ECSCluster(name="Production", region=AWSRegion(name="ap-northeast-1"))
+    for i in range(4):
+        for cluster in (hongkong, tokyo):
+            service = ECSService(name=f"service{i}", cluster=cluster)
+            service.add_property(name="restart_after_upgrade", value=True)
+            operator.add_ecs_service(service)
+
+    return operator
+
+
+def test_paced_script(tmp_path) -> None:
+    pacing = PacingScheduler(limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=2.0, burst=2)})
+    step = RestartECSService(step_no=0,
+                             operator=_operator(),
+                             dist_path=tmp_path,
+                             pacing=pacing)
+
+    lines = [line.split("--region ")[1].split()[0] if "--region" in line else line
+             for line in step.render().splitlines()[2:]]
+    assert lines == ["ap-east-1", "ap-northeast-1",
+                     "ap-east-1", "ap-northeast-1",
+                     "# sleep 0.5", "ap-east-1", "ap-northeast-1",
+                     "# sleep 0.5", "ap-east-1", "ap-northeast-1"]
+
+    # The default rate limits let a few services be updated at once
+    step = RestartECSService(step_no=0, operator=_operator(), dist_path=tmp_path)
+    assert "sleep" not in step.render()
+
+
+def test_shared_script_schedule(tmp_path) -> None:
+    pacing = PacingScheduler(limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=2.0, burst=2)})
+
+    def _sleeps(step_no: int, operator: Operator) -> list:
+        step = RestartECSService(step_no=step_no,
+                                 operator=operator,
+                                 dist_path=tmp_path,
+                                 pacing=pacing)
+        return [line for line in step.render().splitlines() if "sleep" in line]
+
+    first, second = _operator(id="first"), _operator(id="second")
+    assert _sleeps(0, first) == ["# sleep 0.5", "# sleep 0.5"]
+    # The script of another operator runs side by side with the first, so
+    # it continues the schedule rather than starting with full buckets
+    assert _sleeps(0, second) == ["# sleep 1.5", "# sleep 0.5",
+                                  "# sleep 0.5", "# sleep 0.5"]
+    # Rendering a script again gives the same sleeps
+    assert _sleeps(0, first) == ["# sleep 0.5", "# sleep 0.5"]
+    # The steps of another number do not run at the same time
+    assert _sleeps(1, first) == ["# sleep 0.5", "# sleep 0.5"]
+
+    copy = pickle.loads(pickle.dumps(pacing))
+    assert copy.scripts is not pacing.scripts
+    step = RestartECSService(step_no=0, operator=second, dist_path=tmp_path, pacing=copy)
+    assert [line for line in step.render().splitlines() if "sleep" in line] == \
+        ["# sleep 1.5", "# sleep 0.5", "# sleep 0.5", "# sleep 0.5"]
+
+
+def test_paced_execution(tmp_path) -> None:
+    clock = _Clock()
+    pacing = PacingScheduler(limits={API_ECS_UPDATE_SERVICE: RateLimit(rate=2.0, burst=2)},
+                             clock=clock,
+                             sleep=clock.sleep)
+    operator = _operator()
+    step = RestartECSService(step_no=0, operator=operator, dist_path=tmp_path)
+    executor = StepExecutor(runner=FakeCommandRunner(),
+                            max_workers=1,
+                            pacing=pacing,
+                            execute_commented=True)
+
+    summary = executor.execute([step])
+
+    assert summary.succeeded
+    assert len(summary.results) == 8
+    # The third service of each region waits, and the wait refills the
+    # bucket of the other region
+    assert clock.sleeps == [0.5, 0.5]
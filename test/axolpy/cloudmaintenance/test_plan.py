@@ -0,0 +1,122 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from axolpy.cloudmaintenance.executor import FakeCommandRunner, StepExecutor
+from axolpy.cloudmaintenance.plan import MaintenancePlan, PlanScheduler
+from axolpy.cloudmaintenance.steps import (DumpMysqlTableStatus, DumpPgstats,
+                                           ModifyDatabaseEngineVersion,
+                                           QueryDatabaseStatus,
+                                           QueryECSTaskStatus,
+                                           RestartECSService,
+                                           RestartK8sDeployment)
+
+
+def _plan(operator, dist_path: Path) -> MaintenancePlan:
+    plan = MaintenancePlan()
+    pgstats = plan.add(DumpPgstats(step_no=0, operator=operator, dist_path=dist_path))
+    mysql = plan.add(DumpMysqlTableStatus(step_no=0, operator=operator, dist_path=dist_path))
+    upgrade = plan.add(ModifyDatabaseEngineVersion(step_no=1,
+                                                   operator=operator,
+                                                   dist_path=dist_path),
+                       after=[pgstats, mysql])
+    plan.add(RestartECSService(step_no=2, operator=operator, dist_path=dist_path),
+             after=[upgrade], name="restart-ecs")
+    plan.add(RestartK8sDeployment(step_no=2, operator=operator, dist_path=dist_path),
+             after=[upgrade], name="restart-eks")
+    plan.add(QueryDatabaseStatus(step_no=3, operator=operator, dist_path=dist_path),
+             after=["restart-ecs", "restart-eks"], name="query")
+
+    return plan
+
+
+def test_maintenance_plan(tmp_path, operators) -> None:
+    plan = _plan(operators["operator1"], tmp_path)
+
+    assert len(plan) == 6
+    assert "restart-ecs" in plan
+    assert [node.name for node in plan.dependents(plan.nodes[2])] == \
+        ["restart-ecs", "restart-eks"]
+    with pytest.raises(AssertionError):
+        plan.add(QueryECSTaskStatus(step_no=3, operator=operators["operator1"],
+                                    dist_path=tmp_path),
+                 after=["unknown"])
+
+    durations = {node.name: 1.0 for node in plan}
+    durations["operator1-0-dump-mysqltablestatus.sh"] = 2.0
+    durations["restart-eks"] = 3.0
+    path, length = plan.critical_path(durations)
+    assert [node.name for node in path] == ["operator1-0-dump-mysqltablestatus.sh",
+                                            "operator1-1-modify-database-engineversion.sh",
+                                            "restart-eks",
+                                            "query"]
+    assert length == 7.0
+
+
+def test_plan_from_steps(tmp_path, operators) -> None:
+    steps = [QueryDatabaseStatus(step_no=step_no, operator=operator, dist_path=tmp_path)
+             for operator in operators.values()
+             for step_no in (1, 0)]
+    steps.append(QueryECSTaskStatus(step_no=0,
+                                    operator=operators["operator1"],
+                                    dist_path=tmp_path))
+
+    plan = MaintenancePlan.from_steps(steps)
+
+    dependencies = {node.name: sorted(d.name for d in node.dependencies) for node in plan}
+    assert dependencies["operator1-0-query-database-status.sh"] == []
+    assert dependencies["operator1-1-query-database-status.sh"] == \
+        ["operator1-0-query-database-status.sh", "operator1-0-query-ecs-task-status.sh"]
+    assert dependencies["operator2-1-query-database-status.sh"] == \
+        ["operator2-0-query-database-status.sh"]
+
+
+def test_schedule_plan(tmp_path, operators) -> None:
+    plan = _plan(operators["operator1"], tmp_path)
+    lock = threading.Lock()
+    finished = list()
+    running = [0, 0]
+
+    def _run_step(step):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+            # Every dependency has finished before a step starts
+            node = next(node for node in plan if node.step is step)
+            assert all(d.name in finished for d in node.dependencies)
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+            finished.append(node.name)
+
+    summary = PlanScheduler(run_step=_run_step).run(plan)
+
+    assert summary.succeeded
+    assert finished[-1] == "query"
+    # Independent steps run at the same time
+    assert running[1] == 2
+    path, length = summary.critical_path()
+    assert len(path) == 4 and path[-1].name == "query"
+    assert length <= summary.elapsed
+    assert summary.report().splitlines()[0].startswith("6 steps in ")
+
+    # The default is a dry run
+    summary = PlanScheduler().run(plan)
+    assert summary.succeeded
+
+
+def test_schedule_plan_failure(tmp_path, operators) -> None:
+    plan = _plan(operators["operator1"], tmp_path)
+    restart = "aws ecs update-service --force-new-deployment --region ap-east-1" + \
+        " --cluster Production --service p-process-pending-txn-api"
+    executor = StepExecutor(runner=FakeCommandRunner(responses={restart: (1, "", "denied")}),
+                            execute_commented=True)
+
+    summary = PlanScheduler(run_step=lambda step: executor.execute([step])).run(plan)
+
+    assert not summary.succeeded
+    assert [r.node.name for r in summary.failures] == ["restart-ecs"]
+    assert summary.failures[0].error == "1 commands failed"
+    assert [r.node.name for r in summary.skipped] == ["query"]
+    assert not summary.result("restart-eks").failed
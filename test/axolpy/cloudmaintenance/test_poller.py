@@ -0,0 +1,205 @@
+import asyncio
+
+import pytest
+from axolpy.aws import AWSRegion, ECSCluster, ECSService, RDSDatabase
+from axolpy.cloudmaintenance import Operator
+from axolpy.cloudmaintenance.poller import (DeploymentStatus,
+                                            ECSServiceStatus,
+                                            FakeStatusClient,
+                                            RDSDatabaseStatus,
+                                            StabilityPoller, StatusClient,
+                                            step_resources)
+from axolpy.cloudmaintenance.steps import (DumpPgstats,
+                                           ModifyDatabaseEngineVersion,
+                                           QueryECSTaskStatus,
+                                           RestartECSService,
+                                           UpdateK8sDeploymentReplicas,
+                                           UpdateK8sStatefulSetReplicas)
+from axolpy.kubernetes import Cluster, Deployment, Namespace, StatefulSet
+
+
+class _Clock(object):
+    """
+    A clock which moves only when the poller sleeps.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = list()
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def _resources():
+    region = AWSRegion(name="ap-east-1")
+    service = ECSService(name="api", cluster=ECSCluster(name="Production", region=region))
+    database = RDSDatabase(id="user", region=region, type="instance", host="user.example.com")
+    deployment = Deployment(name="web",
+                            namespace=Namespace(name="general", cluster=Cluster(name="main")),
+                            replicas=2)
+
+    return service, database, deployment
+
+
+def test_statuses() -> None:
+    assert ECSServiceStatus(desired_count=2, running_count=2).stable
+    assert not ECSServiceStatus(desired_count=2, running_count=1).stable
+    assert RDSDatabaseStatus(status="available").stable
+    assert not RDSDatabaseStatus(status="upgrading").stable
+    assert DeploymentStatus(replicas=2, ready_replicas=2).stable
+    assert not DeploymentStatus(replicas=2, ready_replicas=2, updated_replicas=1).stable
+    assert RDSDatabaseStatus(status="upgrading") == RDSDatabaseStatus(status="upgrading")
+    assert RDSDatabaseStatus(status="upgrading") != ECSServiceStatus(1, 1)
+
+
+def test_wait_until_stable() -> None:
+    service, database, deployment = _resources()
+    upgrading = RDSDatabaseStatus(status="upgrading")
+    client = FakeStatusClient({
+        service: [ECSServiceStatus(2, 0), ECSServiceStatus(2, 1), ECSServiceStatus(2, 2)],
+        database: [upgrading] * 4 + [RDSDatabaseStatus(status="available")],
+        deployment: [DeploymentStatus(replicas=2, ready_replicas=2)]})
+    clock = _Clock()
+    poller = StabilityPoller(client=client,
+                             initial_interval=1.0,
+                             max_interval=4.0,
+                             settle_time=0.0,
+                             clock=clock,
+                             sleep=clock.sleep)
+
+    summary = poller.poll([service, database, deployment])
+
+    assert summary.stable
+    assert [r.polls for r in summary.results] == [3, 5, 1]
+    assert client.calls(database) == 5
+    # The interval grows while the database is upgrading, and is reset
+    # whenever the service makes progress
+    assert sorted(clock.sleeps) == sorted([1.0, 1.0] + [1.0, 2.0, 4.0, 4.0])
+
+
+def test_wait_until_settled() -> None:
+    service, database, _ = _resources()
+    available = RDSDatabaseStatus(status="available")
+    client = FakeStatusClient({
+        service: [ECSServiceStatus(2, 2)],
+        database: [available, available, RDSDatabaseStatus(status="modifying"), available]})
+
+    def _poll(resource):
+        clock = _Clock()
+        poller = StabilityPoller(client=client,
+                                 initial_interval=1.0,
+                                 max_interval=4.0,
+                                 settle_time=5.0,
+                                 clock=clock,
+                                 sleep=clock.sleep)
+        return poller.poll([resource]).results[0]
+
+    # The service has not been seen unstable, so it is polled until it
+    # has stayed stable for the settle time
+    result = _poll(service)
+    assert result.stable and (result.polls, result.elapsed) == (4, 5.0)
+    # The database is stable once its modification has started and
+    # finished
+    result = _poll(database)
+    assert result.stable and (result.polls, result.elapsed) == (4, 4.0)
+
+
+def test_wait_until_timeout() -> None:
+    service, database, _ = _resources()
+    client = FakeStatusClient({service: [ECSServiceStatus(2, 2)],
+                               database: [RDSDatabaseStatus(status="modifying")]})
+    clock = _Clock()
+    poller = StabilityPoller(client=client,
+                             initial_interval=1.0,
+                             max_interval=8.0,
+                             timeout=10.0,
+                             settle_time=0.0,
+                             clock=clock,
+                             sleep=clock.sleep)
+
+    summary = poller.poll([service, database])
+
+    assert not summary.stable
+    assert [r.resource for r in summary.unstable] == [database]
+    assert summary.unstable[0].status.status == "modifying"
+    assert summary.elapsed == 10.0
+
+    with pytest.raises(AssertionError):
+        poller.poll([service.cluster])
+
+
+def test_client_errors() -> None:
+    service, _, _ = _resources()
+
+    class _FlakyClient(FakeStatusClient):
+
+        async def ecs_service_status(self, service):
+            if self.calls(service) == 0:
+                self._calls[service] = 1
+                raise ConnectionError("throttled")
+            return await super().ecs_service_status(service)
+
+    clock = _Clock()
+    poller = StabilityPoller(client=_FlakyClient({service: [ECSServiceStatus(1, 1)]}),
+                             initial_interval=1.0,
+                             settle_time=0.0,
+                             clock=clock,
+                             sleep=clock.sleep)
+
+    result = poller.poll([service]).results[0]
+
+    assert result.stable and result.polls == 2 and result.error is None
+    assert issubclass(FakeStatusClient, StatusClient)
+
+
+def test_step_resources(tmp_path) -> None:
+    service, database, deployment = _resources()
+    service.add_property(name="restart_after_upgrade", value=True)
+    operator = Operator(id="operator")
+    operator.add_ecs_service(service)
+    operator.add_rds_databases(database)
+    operator.add_eks_statefulset(StatefulSet(name="redis",
+                                             namespace=deployment.namespace,
+                                             replicas=1))
+    steps = [RestartECSService(step_no=0, operator=operator, dist_path=tmp_path),
+             RestartECSService(step_no=1, operator=operator, dist_path=tmp_path),
+             ModifyDatabaseEngineVersion(step_no=0, operator=operator, dist_path=tmp_path),
+             DumpPgstats(step_no=0, operator=operator, dist_path=tmp_path),
+             QueryECSTaskStatus(step_no=0, operator=operator, dist_path=tmp_path),
+             UpdateK8sStatefulSetReplicas(step_no=0, operator=operator, dist_path=tmp_path)]
+
+    # The database is not patched, so it is not modified, and it is only
+    # queried by the dump. The statefulset cannot be polled.
+    assert all(step.eligible() for step in steps[3:])
+    assert step_resources(steps) == [service]
+
+    # The resources of the steps can all be waited for
+    clock = _Clock()
+    client = FakeStatusClient({service: [ECSServiceStatus(1, 1)]})
+    poller = StabilityPoller(client=client, settle_time=0.0, clock=clock, sleep=clock.sleep)
+    assert poller.poll(step_resources(steps)).stable
+
+
+def test_step_resources_of_batched_commands(tmp_path) -> None:
+    _, _, deployment = _resources()
+    worker = Deployment(name="worker", namespace=deployment.namespace, replicas=2)
+    operator = Operator(id="operator")
+    operator.add_eks_deployment(deployment)
+    operator.add_eks_deployment(worker)
+    step = UpdateK8sDeploymentReplicas(step_no=0,
+                                       operator=operator,
+                                       dist_path=tmp_path,
+                                       batch=True)
+
+    # Both deployments are scaled by one command, and both are waited for
+    commands = list(step.commands())
+    assert len(commands) == 1
+    assert commands[0].resource is None
+    assert commands[0].resources == (deployment, worker)
+    assert step_resources([step]) == [deployment, worker]
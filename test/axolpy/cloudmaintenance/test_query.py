@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pytest
+from axolpy.cloudmaintenance import ResourceDataLoader
+from axolpy.cloudmaintenance.inventory import InventoryIndex
+from axolpy.cloudmaintenance.query import Query, QuerySyntaxError, select
+
+
+@pytest.fixture
+def index():
+    """
+    Fixture for an index of some AWS regions.
+
+    :return: The index.
+    :rtype: :class:`InventoryIndex`
+    """
+
+    return InventoryIndex(ResourceDataLoader.load_from_file(
+        data_path=Path(__file__).parent.joinpath("testdata"),
+        maintenance_id="maintenance"))
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [('kind == "rds_database" and engine_type == "postgresql" and match(region, "ap-*") and patch.class_type',
+      ["address", "audit_log", "subcription"]),
+     ('kind == "deployment" and replicas > 1 and restart_after_upgrade',
+      ["p-audit-log-api", "p-db-housekeeping-monthly"]),
+     ('kind in ["statefulset", "deployment"] and patch.replicas >= 4',
+      ["redis-sync-service", "p-audit-log-api"]),
+     ('engine_type == "mysql" and not patch.class_type == "db.m6g.small"',
+      ["favorite"]),
+     ('kind == "ecs_service" and (desired_count >= 10 or properties.restart_after_upgrade)',
+      ["p-audit-log-api", "p-db-housekeeping-monthly", "p-process-pending-txn-api"]),
+     ('namespace == "p-authentication"',
+      ["p-authentication", "p-authentication-api"]),
+     ('path == "ap-east-1/rds/user"',
+      ["user"]),
+     ('kind == "unknown"',
+      []),
+     ('kind == "ecs_cluster" and engine_type == None',
+      ["Production"]),
+     ('engine_type in [None, "mysql"] and namespace == "p-authentication"',
+      ["p-authentication", "p-authentication-api"])])
+def test_query(index, expression, expected) -> None:
+    query = Query(expression)
+
+    names = [resource.id if hasattr(resource, "id") else resource.name
+             for resource in query.select(index)]
+
+    assert names == expected
+    assert str(query) == f"Query({expression})"
+
+
+def test_query_uses_indexes(index) -> None:
+    query = Query('engine_type == "mysql" and kind == "rds_database"')
+    assert [db.id for db in query._candidates(index)] == ["favorite", "bookmark"]
+
+    query = Query('restart_after_upgrade and kind in ["statefulset"]')
+    assert len(query._candidates(index)) == 3
+
+    # Conditions under "or" cannot use the indexes
+    query = Query('kind == "deployment" or engine_type == "mysql"')
+    assert query._candidates(index) is None
+
+
+def test_query_over_regions(index) -> None:
+    results = select('kind == "eks_cluster"', index.aws_regions)
+    assert next(results).name == "p-main"
+    with pytest.raises(StopIteration):
+        next(results)
+
+    assert Query.compile("replicas > 2") is Query.compile("replicas > 2")
+
+
+@pytest.mark.parametrize("expression",
+                         ["replicas >",
+                          "__import__('os')",
+                          "unknown_field == 1",
+                          "patch.unknown == 1",
+                          "1 < replicas < 3",
+                          "replicas is None",
+                          "match(name)",
+                          "name in [region]"])
+def test_query_syntax_error(expression) -> None:
+    with pytest.raises(QuerySyntaxError):
+        Query(expression)
@@ -0,0 +1,162 @@
+from pathlib import Path
+
+import pytest
+from axolpy.cloudmaintenance.pacing import (API_RDS_MODIFY_DB_INSTANCE,
+                                            PacingScheduler, RateLimit)
+from axolpy.cloudmaintenance.render import PlanStep, render_plan
+from axolpy.cloudmaintenance.steps import (DumpMysqlTableStatus, DumpPgstats,
+                                           ModifyDatabaseClassType,
+                                           ModifyDatabaseEngineVersion,
+                                           QueryDatabaseStatus,
+                                           QueryECSTaskStatus,
+                                           QueryK8sDeploymentStatus,
+                                           RestartECSService,
+                                           RestartK8sDeployment,
+                                           UpdateECSTaskCount,
+                                           UpdateK8sDeploymentReplicas,
+                                           UpdateK8sStatefulSetReplicas)
+
+_data_path = Path(__file__).parent.joinpath("testdata")
+_dist_verify_path = _data_path.joinpath("maintenance", "dist-verify")
+
+
+class BrokenStep(QueryDatabaseStatus):
+    """
+    A step which fails to write its script.
+    """
+
+    _file_step_name: str = "broken"
+
+    def _write_file_content(self, file) -> None:
+        raise RuntimeError("cannot render")
+
+
+def _plan_steps() -> list:
+    plan_steps = [PlanStep(0, step_class) for step_class in (
+        DumpPgstats, DumpMysqlTableStatus, ModifyDatabaseEngineVersion,
+        ModifyDatabaseClassType, QueryDatabaseStatus, RestartK8sDeployment,
+        RestartECSService, QueryK8sDeploymentStatus, QueryECSTaskStatus)]
+    for step_class in (UpdateECSTaskCount,
+                       UpdateK8sStatefulSetReplicas,
+                       UpdateK8sDeploymentReplicas):
+        plan_steps.append(PlanStep(0, step_class, zeroinfy=True))
+        plan_steps.append(PlanStep(1, step_class))
+
+    return plan_steps
+
+
+@pytest.mark.parametrize("max_workers,use_processes",
+                         [(1, False), (4, False), (2, True)])
+def test_render_plan(tmp_path, operators, max_workers, use_processes) -> None:
+    dist_path = tmp_path.joinpath("dist")
+    plan_steps = _plan_steps()
+
+    # The scripts of the two operators may together exceed the rate limits
+    with pytest.warns(UserWarning, match="without a shared PacingScheduler"):
+        summary = render_plan(operators=operators,
+                              plan_steps=plan_steps,
+                              dist_path=dist_path,
+                              max_workers=max_workers,
+                              use_processes=use_processes)
+
+    assert summary.failures == []
+    assert len(summary.results) == len(operators) * len(plan_steps)
+    assert sorted(filepath.name for filepath in summary.written) == \
+        sorted(filepath.name for filepath in _dist_verify_path.iterdir())
+    for filepath in summary.written:
+        assert filepath.read_text() == \
+            _dist_verify_path.joinpath(filepath.name).read_text()
+    assert list(summary.timings().keys()) == [s.name for s in plan_steps]
+    assert "0-UpdateECSTaskCount(zeroinfy=True)" in summary.timings()
+
+
+@pytest.mark.parametrize("max_workers,use_processes", [(4, False), (2, True)])
+def test_render_plan_incrementally(tmp_path, operators, max_workers, use_processes) -> None:
+    plan_steps = _plan_steps()
+
+    def _render():
+        with pytest.warns(UserWarning):
+            return render_plan(operators=operators,
+                               plan_steps=plan_steps,
+                               dist_path=tmp_path,
+                               max_workers=max_workers,
+                               use_processes=use_processes,
+                               incremental=True)
+
+    first = _render()
+    assert len(first.written) == len(list(_dist_verify_path.iterdir()))
+    assert first.unchanged == []
+
+    # Only the scripts whose content changed are written again
+    operators["operator2"].rds_databases[0].patch = None
+    second = _render()
+    assert [filepath.name for filepath in second.written] == \
+        ["operator2-0-modify-database-classtype.sh"]
+    assert len(second.unchanged) == len(first.written) - 1
+
+    third = _render()
+    assert third.written == []
+    assert third.orphaned == []
+
+    # The scripts of a step removed from the plan are orphaned
+    plan_steps = [s for s in plan_steps if s.step_class is not ModifyDatabaseClassType]
+    fourth = _render()
+    assert fourth.written == []
+    assert [filepath.name for filepath in fourth.orphaned] == \
+        ["operator1-0-modify-database-classtype.sh",
+         "operator2-0-modify-database-classtype.sh"]
+    assert f"  ORPHANED {fourth.orphaned[0]}" in fourth.report()
+    assert _render().orphaned == []
+
+
+@pytest.mark.parametrize("max_workers,use_processes",
+                         [(1, False), (4, False), (2, True)])
+def test_render_plan_with_pacing(tmp_path, operators, max_workers, use_processes) -> None:
+    pacing = PacingScheduler(limits={API_RDS_MODIFY_DB_INSTANCE: RateLimit(rate=0.5, burst=2)})
+    plan_steps = [PlanStep(0, ModifyDatabaseClassType, pacing=pacing),
+                  PlanStep(1, ModifyDatabaseEngineVersion, pacing=pacing)]
+
+    summary = render_plan(operators=operators,
+                          plan_steps=plan_steps,
+                          dist_path=tmp_path,
+                          max_workers=max_workers,
+                          use_processes=use_processes)
+
+    # The scripts of the same step run side by side, so the script of the
+    # second operator continues the schedule of the first
+    scripts = {filepath.name: filepath.read_text().splitlines()
+               for filepath in summary.written}
+    first = scripts["operator1-0-modify-database-classtype.sh"]
+    second = scripts["operator2-0-modify-database-classtype.sh"]
+    assert sum(line.startswith("# aws rds") for line in first) == 3
+    assert [line for line in first if "sleep" in line] == ["# sleep 2"]
+    assert second[2] == "# sleep 4"
+    # The steps of another number do not run with them
+    assert "sleep" not in scripts["operator1-1-modify-database-engineversion.sh"][2]
+
+    # Rendering again gives the same sleeps
+    again = render_plan(operators=operators,
+                        plan_steps=plan_steps,
+                        dist_path=tmp_path,
+                        max_workers=max_workers,
+                        use_processes=use_processes)
+    for filepath in again.written:
+        assert filepath.read_text().splitlines() == scripts[filepath.name]
+
+
+def test_render_plan_with_failures(tmp_path, operators) -> None:
+    summary = render_plan(operators=operators,
+                          plan_steps=[PlanStep(0, BrokenStep),
+                                      PlanStep(0, DumpPgstats)],
+                          dist_path=tmp_path,
+                          max_workers=2)
+
+    # The failure of a step does not stop the others
+    assert [(r.operator_id, r.error) for r in summary.failures] == \
+        [("operator1", "RuntimeError: cannot render"),
+         ("operator2", "RuntimeError: cannot render")]
+    assert [filepath.name for filepath in summary.written] == \
+        ["operator1-0-dump-pgstats.sh", "operator2-0-dump-pgstats.sh"]
+    assert str(summary) == "RenderSummary(2 written, 0 unchanged, 2 failures)"
+    assert "FAILED operator2 0-BrokenStep: RuntimeError: cannot render" in \
+        summary.report()
@@ -1,3 +1,4 @@
+import io
 from pathlib import Path
 from typing import List, Type, TypeVar
 
@@ -15,6 +16,9 @@ from axolpy.cloudmaintenance.steps import (CloudMaintenanceStep,
                                            UpdateECSTaskCount,
                                            UpdateK8sDeploymentReplicas,
                                            UpdateK8sStatefulSetReplicas)
+from axolpy.aws import AWSRegion, ECSCluster, ECSService, RDSDatabase
+from axolpy.kubernetes import (Cluster, Deployment, DeploymentPatch, Namespace,
+                               StatefulSet)
 
 
 @pytest.fixture
@@ -373,3 +377,159 @@ class TestCloudMaintenanceStep(object):
             cloud_maintenance_step_class=QueryECSTaskStatus,
             operators=operators,
             expect_filenames=expect_filenames)
+
+
+class FailingQueryDatabaseStatus(QueryDatabaseStatus):
+    """
+    A step which fails halfway through its script.
+    """
+
+    def _write_file_content(self, file) -> None:
+        file.write("#!/bin/bash\n\n")
+        raise RuntimeError("interrupted")
+
+
+def test_write_file_atomically(tmp_path, operators) -> None:
+    """
+    Test that scripts are written completely or not at all.
+    """
+
+    dist_path = tmp_path.joinpath("dist")
+    step = QueryDatabaseStatus(step_no=0,
+                               operator=operators["operator1"],
+                               dist_path=dist_path)
+    step.write_file()
+
+    filepath = step.output_filepath()
+    assert filepath.read_text() == step.render() == Path(
+        TestCloudMaintenanceStep._dist_verify_path, filepath.name).read_text()
+    assert filepath.stat().st_mode & 0o777 == 0o755
+    assert [f.name for f in dist_path.iterdir()] == [filepath.name]
+
+    # The previous script is kept if the new one cannot be rendered
+    failing_step = FailingQueryDatabaseStatus(step_no=0,
+                                              operator=operators["operator1"],
+                                              dist_path=dist_path)
+    with pytest.raises(RuntimeError):
+        failing_step.write_file()
+    assert filepath.read_text() == step.render()
+    assert [f.name for f in dist_path.iterdir()] == [filepath.name]
+
+    # The directory is created again if it is removed
+    filepath.unlink()
+    dist_path.rmdir()
+    step.write_file()
+    assert filepath.read_text() == step.render()
+
+    # Writing directly gives the same script
+    filepath.unlink()
+    step.write_file(atomic=False)
+    assert filepath.read_text() == step.render()
+    assert filepath.stat().st_mode & 0o777 == 0o755
+
+
+def test_scale_in_batches(tmp_path) -> None:
+    """
+    Test scaling the workloads of a namespace with the same replica count
+    in one command.
+    """
+
+    operator = Operator(id="operator")
+    cluster = Cluster(name="main")
+    general = Namespace(name="general", cluster=cluster)
+    payment = Namespace(name="payment", cluster=cluster)
+    for name, namespace, replicas, patch in (("api", general, 2, None),
+                                             ("web", general, 1, 2),
+                                             ("cron", general, 3, None),
+                                             ("gateway", payment, 2, None),
+                                             ("worker", general, 2, None)):
+        operator.add_eks_deployment(Deployment(
+            name=name,
+            namespace=namespace,
+            replicas=replicas,
+            patch=DeploymentPatch(replicas=patch) if patch else None))
+        operator.add_eks_statefulset(StatefulSet(name=f"{name}-db",
+                                                 namespace=namespace,
+                                                 replicas=replicas))
+
+    step = UpdateK8sDeploymentReplicas(step_no=1,
+                                       operator=operator,
+                                       dist_path=tmp_path,
+                                       batch=True)
+    assert step.render().splitlines()[2:] == [
+        "# kubectl scale -n general deployment/api deployment/web deployment/worker --replicas=2",
+        "# kubectl scale -n general deployment/cron --replicas=3",
+        "# kubectl scale -n payment deployment/gateway --replicas=2"]
+    assert {command.cluster for command in step.commands()} == {"main"}
+
+    step = UpdateK8sStatefulSetReplicas(step_no=0,
+                                        operator=operator,
+                                        dist_path=tmp_path,
+                                        zeroinfy=True,
+                                        batch=True)
+    assert step.render().splitlines()[2:] == [
+        "# kubectl scale -n general statefulsets api-db web-db cron-db worker-db --replicas=0",
+        "# kubectl scale -n payment statefulsets gateway-db --replicas=0"]
+
+    # A namespace of the same name in another cluster is scaled separately
+    other = Namespace(name="general", cluster=Cluster(name="other"))
+    operator.add_eks_statefulset(StatefulSet(name="api-db", namespace=other, replicas=1))
+    assert len(list(step.commands())) == 3
+
+
+def test_query_status_in_chunks(tmp_path) -> None:
+    """
+    Test describing the databases and services of a region in chunks.
+    """
+
+    operator = Operator(id="operator")
+    hongkong = AWSRegion(name="ap-east-1")
+    tokyo = AWSRegion(name="ap-northeast-1")
+    for i in range(5):
+        operator.add_rds_databases(RDSDatabase(id=f"db{i}",
+                                               region=hongkong if i < 3 else tokyo,
+                                               type="instance",
+                                               host=f"db{i}.example.com"))
+    production = ECSCluster(name="Production", region=hongkong)
+    for i in range(23):
+        operator.add_ecs_service(ECSService(name=f"service{i}", cluster=production))
+    operator.add_ecs_service(ECSService(name="batch",
+                                        cluster=ECSCluster(name="Batch", region=hongkong)))
+
+    step = QueryDatabaseStatus(step_no=0, operator=operator, dist_path=tmp_path)
+    commands = list(step.commands())
+    assert [command.region for command in commands] == ["ap-east-1", "ap-northeast-1"]
+    assert "--filters Name=db-instance-id,Values=db0,db1,db2 " in commands[0].line
+    assert "--filters Name=db-instance-id,Values=db3,db4 " in commands[1].line
+    assert "sleep" not in step.render()
+
+    step._chunk_size = 2
+    assert len(list(step.commands())) == 3
+
+    step = QueryECSTaskStatus(step_no=0, operator=operator, dist_path=tmp_path)
+    commands = list(step.commands())
+    assert [(command.cluster, command.line.split("--services ")[1].split(" --query")[0])
+            for command in commands] == [
+        ("Production", " ".join(f"service{i}" for i in range(10))),
+        ("Production", " ".join(f"service{i}" for i in range(10, 20))),
+        ("Production", " ".join(f"service{i}" for i in range(20, 23))),
+        ("Batch", "batch")]
+
+
+def test_iter_lines(tmp_path, operators) -> None:
+    """
+    Test streaming the lines of scripts.
+    """
+
+    step = DumpPgstats(step_no=0, operator=operators["operator1"], dist_path=tmp_path)
+    lines = step.iter_lines()
+
+    assert next(lines) == "#!/bin/bash\n\n"
+    assert next(lines) == "echo \"database id: user\"\n"
+    assert "".join(step.iter_lines()) == step.render()
+
+    buffer = io.StringIO()
+    step.write_to(buffer)
+    assert buffer.getvalue() == step.render() == Path(
+        __file__).parent.joinpath("testdata", "maintenance", "dist-verify",
+                                  step.filename()).read_text()
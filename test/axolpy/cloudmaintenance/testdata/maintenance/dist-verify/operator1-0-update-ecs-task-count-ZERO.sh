@@ -1,5 +1,4 @@
 #!/bin/bash
 
 # aws ecs update-service --region ap-east-1 --cluster Production --service p-authentication-api --desired-count 0
-# sleep 2
 # aws ecs update-service --region ap-east-1 --cluster Production --service p-payproxy-api --desired-count 0
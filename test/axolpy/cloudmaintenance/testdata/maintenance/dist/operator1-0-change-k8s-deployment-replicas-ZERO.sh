@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# kubectl scale -n p-general deployment/p-address-api --replicas=0
@@ -0,0 +1,5 @@
+#!/bin/bash
+
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier address --db-instance-class db.t4g.small --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier favorite --db-instance-class db.m6g.large --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier bookmark --db-instance-class db.m6g.small --apply-immediately
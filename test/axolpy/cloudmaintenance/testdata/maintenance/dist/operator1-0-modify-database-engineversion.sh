@@ -0,0 +1,6 @@
+#!/bin/bash
+
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier user --engine-version 13.6 --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier address --engine-version 13.6 --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier favorite --engine-version 8.0.30 --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier bookmark --engine-version 8.0.30 --apply-immediately
@@ -0,0 +1,3 @@
+#!/bin/bash
+
+aws rds describe-db-instances --region ap-east-1 --filters Name=db-instance-id,Values=user,address,favorite,bookmark --query 'DBInstances[*].{DBInstanceIdentifier:DBInstanceIdentifier,DBInstanceClass:DBInstanceClass,Engine:Engine,DBInstanceStatus:DBInstanceStatus,DBName:DBName,Endpoint:Endpoint,EngineVersion:EngineVersion}'
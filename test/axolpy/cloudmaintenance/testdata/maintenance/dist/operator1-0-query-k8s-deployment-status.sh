@@ -0,0 +1,3 @@
+#!/bin/bash
+
+kubectl get deployments -n p-general p-address-api
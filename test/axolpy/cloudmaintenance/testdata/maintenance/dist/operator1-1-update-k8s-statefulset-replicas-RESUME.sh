@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# kubectl scale -n p-general statefulsets psql-sync-service --replicas=1
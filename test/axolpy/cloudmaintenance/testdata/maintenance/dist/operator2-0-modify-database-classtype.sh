@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier audit_log --db-instance-class db.m6g.2xlarge --apply-immediately
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier subcription --db-instance-class db.m6g.large --apply-immediately
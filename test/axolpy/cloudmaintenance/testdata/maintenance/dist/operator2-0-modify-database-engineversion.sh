@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# aws rds modify-db-instance --region ap-east-1 --db-instance-identifier subcription --engine-version 12.10 --apply-immediately
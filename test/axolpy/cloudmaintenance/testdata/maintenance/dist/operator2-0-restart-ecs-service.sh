@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# aws ecs update-service --force-new-deployment --region ap-east-1 --cluster Production --service p-db-housekeeping-monthly
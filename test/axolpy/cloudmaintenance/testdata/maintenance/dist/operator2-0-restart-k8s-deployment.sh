@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# kubectl rollout restart -n p-general deployment/p-audit-log-api
+# kubectl scale -n p-general deployment/p-audit-log-api --replicas=10
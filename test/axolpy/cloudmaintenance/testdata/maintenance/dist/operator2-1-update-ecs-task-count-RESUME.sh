@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# aws ecs update-service --region ap-east-1 --cluster Production --service p-address-api --desired-count 1
+# aws ecs update-service --region ap-east-1 --cluster Production --service p-audit-log-api --desired-count 11
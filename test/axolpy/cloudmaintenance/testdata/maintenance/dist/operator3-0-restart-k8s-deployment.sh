@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# kubectl rollout restart -n p-general deployment/p-db-housekeeping-monthly
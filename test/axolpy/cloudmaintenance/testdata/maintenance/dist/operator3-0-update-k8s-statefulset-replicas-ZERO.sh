@@ -0,0 +1,3 @@
+#!/bin/bash
+
+# kubectl scale -n p-general statefulsets database-sync-service --replicas=0
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# kubectl scale -n p-general deployment/p-aggregation-api --replicas=2
+# kubectl scale -n p-authentication deployment/p-authentication-api --replicas=5
@@ -99,6 +99,31 @@ class TestKubernetesModel(object):
             namespace) == f"{namespace.__class__.__name__}" + \
             f"(name: {namespace.name}, 1 statefulsets, 1 deployments)"
 
+    def test_read_only_views(self):
+        """
+        Test that the collections are read-only views of the resources.
+        """
+
+        cluster = pytest.test_kubernetes_model_cluster
+        namespace = pytest.test_kubernetes_model_namespace
+        deployments = namespace.deployments
+
+        with pytest.raises(TypeError):
+            deployments["new"] = None
+        with pytest.raises(TypeError):
+            cluster.namespaces["new"] = None
+        with pytest.raises(TypeError):
+            del namespace.statefulsets["redis"]
+        with pytest.raises(TypeError):
+            namespace.deployment("authentication").properties["foo"] = "baz"
+        assert dict(namespace.statefulset("profiler").properties) == \
+            {"foo": "bar", "priority": 2}
+
+        # The view reflects the resources added afterwards
+        Deployment(name="new", namespace=namespace, replicas=1)
+        assert deployments["new"] == namespace.deployment("new")
+        assert list(cluster.namespaces.values()) == [namespace]
+
 
 def test_aws_cluster_ref():
     """
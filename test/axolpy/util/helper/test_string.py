@@ -82,3 +82,14 @@ def test_generate_random_string() -> None:
         string.generate_random_string(length=5,
                                       characters="abc",
                                       allow_repeat=False)
+
+
+def test_intern_string() -> None:
+    """
+    Test to intern a string.
+    """
+
+    value = "".join(["intern", "-", "me"])
+    assert string.intern_string(value) is string.intern_string("intern-me")
+    assert string.intern_string(None) is None
+    assert string.intern_string(13.6) == 13.6